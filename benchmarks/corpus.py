@@ -0,0 +1,97 @@
+# Copyright (c) 2022-present, Ethan Henderson
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+"""Generates IRC traffic shaped like what Twitch sends to a busy chat."""
+
+from __future__ import annotations
+
+import random
+import uuid
+
+_BADGES = ("", "subscriber/12", "moderator/1,subscriber/24", "vip/1", "premium/1")
+_WORDS = ("Kappa", "PogChamp", "LUL", "gg", "nice", "what", "no", "way", "lol")
+
+
+def _privmsg(rng: random.Random, channel: str, room_id: str) -> str:
+    user_id = str(rng.randint(10_000, 900_000_000))
+    login = f"viewer{user_id}"
+    badges = rng.choice(_BADGES)
+    content = " ".join(rng.choice(_WORDS) for _ in range(rng.randint(1, 25)))
+    tags = {
+        "badge-info": f"subscriber/{rng.randint(1, 60)}" if badges else "",
+        "badges": badges,
+        "client-nonce": uuid.UUID(int=rng.getrandbits(128)).hex,
+        "color": f"#{rng.randint(0, 0xFFFFFF):06X}",
+        "display-name": login.capitalize(),
+        "emotes": "25:0-4,12-16/1902:6-10" if rng.random() < 0.3 else "",
+        "first-msg": "0",
+        "flags": "",
+        "id": str(uuid.UUID(int=rng.getrandbits(128))),
+        "mod": "1" if "moderator" in badges else "0",
+        "returning-chatter": "0",
+        "room-id": room_id,
+        "subscriber": "1" if "subscriber" in badges else "0",
+        "tmi-sent-ts": str(1_643_904_084_794 + rng.randint(0, 10_000_000)),
+        "turbo": "0",
+        "user-id": user_id,
+        "user-type": "mod" if "moderator" in badges else "",
+    }
+    raw_tags = ";".join(f"{k}={v}" for k, v in tags.items())
+    return (
+        f"@{raw_tags} :{login}!{login}@{login}.tmi.twitch.tv "
+        f"PRIVMSG #{channel} :{content}"
+    )
+
+
+def generate(count: int, *, channels: int = 50, seed: int = 0) -> list[bytes]:
+    """Generates `count` CRLF-terminated lines, mostly PRIVMSGs with the
+    occasional PING and CLEARCHAT mixed in."""
+
+    rng = random.Random(seed)
+    rooms = [(f"channel{i}", str(100_000 + i)) for i in range(channels)]
+    lines = []
+
+    for _ in range(count):
+        channel, room_id = rng.choice(rooms)
+        roll = rng.random()
+
+        if roll < 0.001:
+            line = "PING :tmi.twitch.tv"
+        elif roll < 0.005:
+            line = (
+                f"@room-id={room_id};target-user-id=87654321;"
+                f"tmi-sent-ts=1642715756806 :tmi.twitch.tv CLEARCHAT #{channel} "
+                ":ronni"
+            )
+        else:
+            line = _privmsg(rng, channel, room_id)
+
+        lines.append(f"{line}\r\n".encode())
+
+    return lines
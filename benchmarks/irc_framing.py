@@ -0,0 +1,93 @@
+# Copyright (c) 2022-present, Ethan Henderson
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+"""Compares reading IRC traffic in 1 KiB chunks against reading
+everything available at once.
+
+The traffic is fed into a `StreamReader` in 64 KiB chunks, which is
+roughly how the event loop's transport hands over data received from a
+busy socket. Each `read` call is a trip through the event loop and a
+pass of the decoder, so fewer of them means less CPU time per line.
+Usage:
+
+    python benchmarks/irc_framing.py [line count]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+from irctokens.stateful import StatefulDecoder
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import corpus  # noqa: E402
+
+TRANSPORT_CHUNK_SIZE = 65_536
+
+
+async def _run(payload: bytes, read_size: int) -> tuple[int, int, float]:
+    reader = asyncio.StreamReader(limit=2**16)
+    decoder = StatefulDecoder()
+    reads = lines = 0
+    cpu = time.process_time()
+
+    for i in range(0, len(payload), TRANSPORT_CHUNK_SIZE):
+        reader.feed_data(payload[i : i + TRANSPORT_CHUNK_SIZE])
+
+        while reader._buffer:  # type: ignore[attr-defined]
+            data = await reader.read(read_size)
+            reads += 1
+            lines += len(decoder.push(data) or ())
+
+    return reads, lines, time.process_time() - cpu
+
+
+async def main(count: int) -> None:
+    payload = b"".join(corpus.generate(count))
+    print(
+        f"{count:,} lines, {len(payload):,} bytes "
+        f"(average line {len(payload) // count} bytes)\n"
+    )
+
+    for read_size in (1_024, 4_096, 65_536):
+        reads, lines, cpu = await _run(payload, read_size)
+        print(
+            f"read({read_size:>6,}): {reads:>7,} reads, "
+            f"{reads / lines:5.2f} reads/line, "
+            f"{lines / cpu:>9,.0f} lines/s, "
+            f"{cpu / lines * 1_000_000:5.1f}us/line"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000))
@@ -0,0 +1,108 @@
+# Copyright (c) 2022-present, Ethan Henderson
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+"""Compares `irctokens.StatefulDecoder` against `kasai.irc.Decoder`.
+
+Both decoders are fed the same generated Twitch traffic in 64 KiB
+chunks. For every PRIVMSG, the tags Kasai reads when building a message
+are accessed, so the cost of tag parsing is included. Usage:
+
+    python benchmarks/irc_parsing.py [line count] [rounds]
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+import typing as t
+from pathlib import Path
+
+from irctokens.stateful import StatefulDecoder
+
+from kasai import irc
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import corpus  # noqa: E402
+
+CHUNK_SIZE = 65_536
+READ_TAGS = (
+    "user-id",
+    "display-name",
+    "color",
+    "mod",
+    "subscriber",
+    "turbo",
+    "badges",
+    "room-id",
+    "id",
+    "tmi-sent-ts",
+)
+
+
+def _run(payload: bytes, decoder: t.Any) -> float:
+    start = time.perf_counter()
+
+    for i in range(0, len(payload), CHUNK_SIZE):
+        for line in decoder.push(payload[i : i + CHUNK_SIZE]) or ():
+            if line.command == "PRIVMSG":
+                tags = line.tags
+                for key in READ_TAGS:
+                    tags[key]
+                line.hostmask.nickname
+
+    return time.perf_counter() - start
+
+
+def main(count: int, rounds: int) -> None:
+    payload = b"".join(corpus.generate(count))
+    print(f"{count:,} lines, {len(payload):,} bytes, best of {rounds}\n")
+    results = {}
+
+    for name, factory in (
+        ("irctokens.StatefulDecoder", StatefulDecoder),
+        ("kasai.irc.Decoder", irc.Decoder),
+    ):
+        best = min(_run(payload, factory()) for _ in range(rounds))
+        results[name] = best
+        print(
+            f"{name:<26} {best * 1_000:8.1f}ms "
+            f"{best / count * 1_000_000:6.2f}us/line "
+            f"{count / best:>10,.0f} lines/s"
+        )
+
+    base, fast = results.values()
+    print(f"\nspeedup: {base / fast:.2f}x")
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 50_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 5,
+    )
@@ -54,13 +54,20 @@ if readme.is_file():
         + readme.read_text()[9:]
     )
 
+from kasai.auth import *
+from kasai.batching import *
 from kasai.bot import *
 from kasai.channels import *
+from kasai.config import *
+from kasai.connection import *
 from kasai.errors import *
 from kasai.events import *
 from kasai.games import *
+from kasai.membership import *
 from kasai.messages import *
+from kasai.ratelimits import *
 from kasai.streams import *
 from kasai.traits import *
 from kasai.twitch import *
 from kasai.users import *
+from kasai.workers import *
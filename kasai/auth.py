@@ -0,0 +1,274 @@
+# Copyright (c) 2022-present, Ethan Henderson
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+from __future__ import annotations
+
+__all__ = ("AppToken", "Credential")
+
+import asyncio
+import logging
+import typing as t
+
+from hikari.internal import time as time_
+from hikari.internal.data_binding import JSONObject
+
+from kasai import ratelimits
+
+_log = logging.getLogger(__name__)
+
+
+class AppToken:
+    """A class representing a Twitch app access token, which is
+    refreshed in the background shortly before it expires.
+
+    Concurrent refreshes share a single token request, so a burst of
+    requests rejected with the same stale token only fetches one new
+    token between them.
+
+    Parameters
+    ----------
+    fetch : Callable[[], Awaitable[JSONObject]]
+        The coroutine function used to fetch a new token. It should
+        return Twitch's token response, containing "access_token" and
+        "expires_in" fields.
+
+    Other Parameters
+    ----------------
+    margin : float
+        The number of seconds before the token expires to refresh it.
+        Defaults to `300.0`.
+    retry_delay : float
+        The number of seconds to wait before trying again if a
+        background refresh fails. Defaults to `30.0`.
+
+    .. versionadded:: 0.11a
+    """
+
+    __slots__ = (
+        "_fetch",
+        "_margin",
+        "_retry_delay",
+        "_token",
+        "_expires_at",
+        "_refreshing",
+        "_task",
+    )
+
+    def __init__(
+        self,
+        fetch: t.Callable[[], t.Awaitable[JSONObject]],
+        *,
+        margin: float = 300.0,
+        retry_delay: float = 30.0,
+    ) -> None:
+        self._fetch = fetch
+        self._margin = margin
+        self._retry_delay = retry_delay
+        self._token: str | None = None
+        self._expires_at: float | None = None
+        self._refreshing: asyncio.Future[str] | None = None
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def token(self) -> str | None:
+        """The current token, or `None` if one hasn't been fetched
+        yet."""
+
+        return self._token
+
+    @property
+    def expires_in(self) -> float | None:
+        """The number of seconds until the current token expires, or
+        `None` if Twitch didn't say."""
+
+        if self._expires_at is None:
+            return None
+
+        return max(self._expires_at - time_.monotonic(), 0.0)
+
+    def start(self) -> None:
+        """Starts refreshing the token before it expires. This must be
+        called from within a running event loop.
+
+        Returns
+        -------
+        None
+        """
+
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stops refreshing the token.
+
+        Returns
+        -------
+        None
+        """
+
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def refresh(self, stale: str | None = None) -> str:
+        """Fetches a new token. If a refresh is already in progress,
+        this waits for that one instead.
+
+        Parameters
+        ----------
+        stale : str | None
+            The token that was found to be invalid. If the current token
+            is different, it has already been refreshed, and is returned
+            without fetching another. Defaults to `None`.
+
+        Returns
+        -------
+        str
+            The new token.
+        """
+
+        if stale is not None and self._token not in (None, stale):
+            return t.cast(str, self._token)
+
+        if self._refreshing is None:
+            self._refreshing = fut = asyncio.ensure_future(self._refresh())
+
+            def cleanup(fut: asyncio.Future[str]) -> None:
+                self._refreshing = None
+                # Mark the exception as retrieved in case every caller
+                # was cancelled before the refresh finished.
+                if not fut.cancelled():
+                    fut.exception()
+
+            fut.add_done_callback(cleanup)
+
+        return await asyncio.shield(self._refreshing)
+
+    async def _refresh(self) -> str:
+        payload = await self._fetch()
+        self._token = token = t.cast(str, payload["access_token"])
+
+        if expires_in := payload.get("expires_in"):
+            self._expires_at = time_.monotonic() + expires_in
+            _log.debug(f"fetched app access token (expires in {expires_in:,}s)")
+        else:
+            self._expires_at = None
+
+        return token
+
+    async def _run(self) -> None:
+        while (expires_in := self.expires_in) is not None:
+            # If the token is refreshed some other way in the meantime,
+            # this one is stale, and the refresh below is skipped.
+            token = self._token
+            await asyncio.sleep(max(expires_in - self._margin, 0.0))
+
+            try:
+                await self.refresh(token)
+            except Exception:
+                _log.exception("failed to refresh app access token")
+                await asyncio.sleep(self._retry_delay)
+
+
+class Credential:
+    """A class representing a Twitch application's credentials, along
+    with the app access token and Helix rate limit bucket that belong
+    to them.
+
+    Parameters
+    ----------
+    client_id : str
+        The application's client ID.
+    client_secret : str
+        The application's client secret.
+    fetch : Callable[[Credential], Awaitable[JSONObject]]
+        The coroutine function used to fetch a new token for these
+        credentials.
+
+    Other Parameters
+    ----------------
+    margin : float
+        The number of seconds before the token expires to refresh it.
+        Defaults to `300.0`.
+    background_share : float
+        The fraction of the rate limit reserved for background requests
+        while interactive requests are also waiting. Defaults to `0.1`.
+
+    .. versionadded:: 0.11a
+    """
+
+    __slots__ = ("_client_id", "_client_secret", "_token", "_bucket")
+
+    def __init__(
+        self,
+        client_id: str,
+        client_secret: str,
+        fetch: t.Callable[[Credential], t.Awaitable[JSONObject]],
+        *,
+        margin: float = 300.0,
+        background_share: float = 0.1,
+    ) -> None:
+        self._client_id = client_id
+        self._client_secret = client_secret
+        self._token = AppToken(lambda: fetch(self), margin=margin)
+        self._bucket = ratelimits.HelixBucket(background_share=background_share)
+
+    def __repr__(self) -> str:
+        return f"Credential(client_id={self._client_id!r})"
+
+    @property
+    def client_id(self) -> str:
+        """The application's client ID."""
+
+        return self._client_id
+
+    @property
+    def client_secret(self) -> str:
+        """The application's client secret."""
+
+        return self._client_secret
+
+    @property
+    def token(self) -> AppToken:
+        """The app access token for these credentials."""
+
+        return self._token
+
+    @property
+    def bucket(self) -> ratelimits.HelixBucket:
+        """The Helix rate limit bucket for these credentials."""
+
+        return self._bucket
+
+    @property
+    def utilization(self) -> float:
+        """The fraction of the rate limit bucket currently used, from
+        `0.0` to `1.0`."""
+
+        return 1 - self._bucket.remaining / self._bucket.limit
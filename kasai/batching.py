@@ -0,0 +1,163 @@
+# Copyright (c) 2022-present, Ethan Henderson
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+from __future__ import annotations
+
+__all__ = ("Batcher", "BulkResult")
+
+import asyncio
+import logging
+import typing as t
+
+import attr
+
+_log = logging.getLogger(__name__)
+_T = t.TypeVar("_T")
+
+
+class Batcher(t.Generic[_T]):
+    """A class which collects individual lookups over a short window and
+    performs them together.
+
+    Parameters
+    ----------
+    fetch : Callable[[list[str]], Awaitable[dict[str, Any]]]
+        The coroutine function used to perform a batch of lookups. It
+        receives a list of keys, and should return a mapping of keys to
+        results. Keys missing from the mapping resolve to `None`.
+    window : float
+        The number of seconds to collect lookups for before performing
+        them.
+
+    Other Parameters
+    ----------------
+    max_size : int
+        The maximum number of keys to look up at once. If this many keys
+        are collected before the window ends, they are looked up
+        immediately. Defaults to `100`.
+
+    .. versionadded:: 0.11a
+    """
+
+    __slots__ = ("_fetch", "_window", "_max_size", "_pending", "_handle", "_tasks")
+
+    def __init__(
+        self,
+        fetch: t.Callable[[list[str]], t.Awaitable[dict[str, _T]]],
+        window: float,
+        *,
+        max_size: int = 100,
+    ) -> None:
+        self._fetch = fetch
+        self._window = window
+        self._max_size = max_size
+        self._pending: dict[str, list[asyncio.Future[_T | None]]] = {}
+        self._handle: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    @property
+    def pending(self) -> int:
+        """The number of distinct keys waiting to be looked up."""
+
+        return len(self._pending)
+
+    async def get(self, key: str) -> _T | None:
+        """Looks up a key as part of the next batch.
+
+        Parameters
+        ----------
+        key : str
+            The key to look up.
+
+        Returns
+        -------
+        Any | None
+            The result for the key, or `None` if there was no result.
+        """
+
+        loop = asyncio.get_running_loop()
+        fut: asyncio.Future[_T | None] = loop.create_future()
+        self._pending.setdefault(key, []).append(fut)
+
+        if len(self._pending) >= self._max_size:
+            self._flush()
+        elif self._handle is None:
+            self._handle = loop.call_later(self._window, self._flush)
+
+        return await fut
+
+    def _flush(self) -> None:
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, {}
+        task = asyncio.get_running_loop().create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: dict[str, list[asyncio.Future[_T | None]]]) -> None:
+        _log.debug(f"performing batched lookup of {len(batch)} key(s)")
+
+        try:
+            results = await self._fetch(list(batch.keys()))
+        except Exception as exc:
+            for futs in batch.values():
+                for fut in futs:
+                    if not fut.done():
+                        fut.set_exception(exc)
+            return
+
+        for key, futs in batch.items():
+            for fut in futs:
+                if not fut.done():
+                    fut.set_result(results.get(key))
+
+
+@attr.define(kw_only=True, weakref_slot=False)
+class BulkResult(t.Generic[_T]):
+    """A class representing the results of a bulk fetch.
+
+    .. versionadded:: 0.11a
+    """
+
+    results: dict[str, _T] = attr.field()
+    """The fetched objects, keyed by ID."""
+
+    missing: list[str] = attr.field()
+    """The IDs or login usernames that were requested but not found."""
+
+    def __len__(self) -> int:
+        return len(self.results)
+
+    def __getitem__(self, key: str) -> _T:
+        return self.results[key]
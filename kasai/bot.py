@@ -39,6 +39,9 @@ import hikari
 import kasai
 from kasai import entity_factory, traits
 
+if t.TYPE_CHECKING:
+    import aiohttp
+
 _log = logging.getLogger(__name__)
 
 
@@ -76,6 +79,22 @@ class GatewayBot(hikari.GatewayBot, traits.TwitchAware):
     banner : str
         The banner to be displayed on boot (this is passed directly to
         the superclass initialiser). This defaults to "kasai".
+    twitch_settings : kasai.TwitchSettings | None
+        The settings to use for the Twitch client. If this is `None`,
+        the default settings are used. Defaults to `None`.
+
+        .. versionadded:: 0.11a
+    twitch_credentials : Iterable[tuple[str, str]]
+        Additional Twitch client ID and client secret pairs to spread
+        Helix requests across. Defaults to an empty tuple.
+
+        .. versionadded:: 0.11a
+    twitch_session : aiohttp.ClientSession | None
+        The HTTP session the Twitch client should make API requests
+        with. If this is `None`, one is created using the connection
+        settings in `twitch_settings`. Defaults to `None`.
+
+        .. versionadded:: 0.11a
     **kwargs : Any
         Additional keyword arguments to be passed to the superclasses.
     """
@@ -88,13 +107,24 @@ class GatewayBot(hikari.GatewayBot, traits.TwitchAware):
         client_secret: str,
         *,
         banner: str = "kasai",
+        twitch_settings: kasai.TwitchSettings | None = None,
+        twitch_credentials: t.Iterable[tuple[str, str]] = (),
+        twitch_session: aiohttp.ClientSession | None = None,
         **kwargs: t.Any,
     ) -> None:
         super().__init__(token, banner=banner, **kwargs)
         self._entity_factory: entity_factory.TwitchEntityFactoryImpl
 
         self._entity_factory = entity_factory.TwitchEntityFactoryImpl(self)
-        self._twitch = kasai.TwitchClient(self, irc_token, client_id, client_secret)
+        self._twitch = kasai.TwitchClient(
+            self,
+            irc_token,
+            client_id,
+            client_secret,
+            settings=twitch_settings,
+            credentials=twitch_credentials,
+            session=twitch_session,
+        )
 
     @property
     def entity_factory(self) -> entity_factory.TwitchEntityFactory:
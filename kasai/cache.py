@@ -0,0 +1,293 @@
+# Copyright (c) 2022-present, Ethan Henderson
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+from __future__ import annotations
+
+__all__ = ("TTLCache", "UserCache")
+
+import math
+import typing as t
+from collections import OrderedDict
+
+from hikari.internal import time as time_
+from hikari.internal.data_binding import JSONObject
+
+_KT = t.TypeVar("_KT")
+_VT = t.TypeVar("_VT")
+
+
+class TTLCache(t.Generic[_KT, _VT]):
+    """A class representing an in-memory cache with least-recently-used
+    eviction and per-entry expiry.
+
+    Parameters
+    ----------
+    max_size : int | None
+        The maximum number of entries this cache can hold. If this is
+        `None`, the cache is unbounded. If this is `0`, nothing is ever
+        cached.
+    ttl : float | None
+        The number of seconds entries stay valid for. If this is
+        `None`, entries never expire.
+
+    .. versionadded:: 0.11a
+    """
+
+    __slots__ = ("_max_size", "_ttl", "_data", "_hits", "_misses")
+
+    def __init__(self, max_size: int | None, ttl: float | None) -> None:
+        self._max_size = max_size
+        self._ttl = ttl
+        self._data: OrderedDict[_KT, tuple[float, _VT]] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: object) -> bool:
+        item = self._data.get(t.cast(_KT, key))
+        return item is not None and item[0] > time_.monotonic()
+
+    @property
+    def max_size(self) -> int | None:
+        """The maximum number of entries this cache can hold."""
+
+        return self._max_size
+
+    @property
+    def ttl(self) -> float | None:
+        """The number of seconds entries stay valid for."""
+
+        return self._ttl
+
+    @property
+    def hits(self) -> int:
+        """The number of lookups that were served from this cache."""
+
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        """The number of lookups that could not be served from this
+        cache."""
+
+        return self._misses
+
+    def _on_evict(self, key: _KT, value: _VT) -> None:
+        ...
+
+    def get(self, key: _KT) -> _VT | None:
+        """Gets an entry from this cache.
+
+        Parameters
+        ----------
+        key : Any
+            The key of the entry to get.
+
+        Returns
+        -------
+        Any | None
+            The cached value, or `None` if it is not cached or has
+            expired.
+        """
+
+        item = self._data.get(key)
+
+        if item is None:
+            self._misses += 1
+            return None
+
+        if item[0] <= time_.monotonic():
+            del self._data[key]
+            self._on_evict(key, item[1])
+            self._misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self._hits += 1
+        return item[1]
+
+    def peek(self, key: _KT) -> _VT | None:
+        """Gets an entry from this cache without counting it as a hit or
+        miss, or marking it as recently used.
+
+        Parameters
+        ----------
+        key : Any
+            The key of the entry to get.
+
+        Returns
+        -------
+        Any | None
+            The cached value, or `None` if it is not cached or has
+            expired.
+        """
+
+        item = self._data.get(key)
+
+        if item is None or item[0] <= time_.monotonic():
+            return None
+
+        return item[1]
+
+    def set(self, key: _KT, value: _VT) -> None:
+        """Adds or replaces an entry in this cache. If this causes the
+        cache to exceed its maximum size, the least recently used entry
+        is evicted.
+
+        Parameters
+        ----------
+        key : Any
+            The key of the entry.
+        value : Any
+            The value to cache.
+
+        Returns
+        -------
+        None
+        """
+
+        if self._max_size == 0:
+            return
+
+        expires = math.inf if self._ttl is None else time_.monotonic() + self._ttl
+        self._data[key] = (expires, value)
+        self._data.move_to_end(key)
+
+        if self._max_size is None:
+            return
+
+        while len(self._data) > self._max_size:
+            old_key, (_, old_value) = self._data.popitem(last=False)
+            self._on_evict(old_key, old_value)
+
+    def invalidate(self, key: _KT) -> None:
+        """Removes an entry from this cache, if present.
+
+        Parameters
+        ----------
+        key : Any
+            The key of the entry to remove.
+
+        Returns
+        -------
+        None
+        """
+
+        item = self._data.pop(key, None)
+
+        if item is not None:
+            self._on_evict(key, item[1])
+
+    def clear(self) -> None:
+        """Removes all entries from this cache. This does not reset the
+        hit and miss counters.
+
+        Returns
+        -------
+        None
+        """
+
+        for key, (_, value) in self._data.items():
+            self._on_evict(key, value)
+
+        self._data.clear()
+
+
+class UserCache(TTLCache[str, JSONObject]):
+    """A class representing a cache of Twitch Helix user payloads.
+
+    Entries are stored by user ID, but can be looked up using either the
+    user's ID or login username.
+
+    .. versionadded:: 0.11a
+    """
+
+    __slots__ = ("_logins",)
+
+    def __init__(self, max_size: int | None, ttl: float | None) -> None:
+        super().__init__(max_size, ttl)
+        self._logins: dict[str, str] = {}
+
+    def _resolve(self, user: str) -> str | None:
+        if user.isdigit():
+            return user
+
+        return self._logins.get(user.lower())
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and super().__contains__(self._resolve(key))
+
+    def _on_evict(self, key: str, value: JSONObject) -> None:
+        if self._logins.get(value["login"]) == key:
+            del self._logins[value["login"]]
+
+    def get(self, key: str) -> JSONObject | None:
+        user_id = self._resolve(key)
+
+        if user_id is None:
+            self._misses += 1
+            return None
+
+        return super().get(user_id)
+
+    def peek(self, key: str) -> JSONObject | None:
+        user_id = self._resolve(key)
+        return None if user_id is None else super().peek(user_id)
+
+    def add(self, payload: JSONObject) -> None:
+        """Adds a user payload to this cache.
+
+        Parameters
+        ----------
+        payload : hikari.internal.data_binding.JSONObject
+            The user payload, as returned by the Twitch Helix API.
+
+        Returns
+        -------
+        None
+        """
+
+        if self._max_size == 0:
+            return
+
+        if (old := self._data.get(payload["id"])) is not None:
+            # The user may have renamed, in which case the old login
+            # shouldn't resolve to them anymore.
+            self._on_evict(payload["id"], old[1])
+
+        self._logins[payload["login"]] = payload["id"]
+        self.set(payload["id"], payload)
+
+    def invalidate(self, key: str) -> None:
+        user_id = self._resolve(key)
+
+        if user_id is not None:
+            super().invalidate(user_id)
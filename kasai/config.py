@@ -0,0 +1,259 @@
+# Copyright (c) 2022-present, Ethan Henderson
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+from __future__ import annotations
+
+__all__ = ("TwitchSettings",)
+
+import typing as t
+
+import attr
+
+from kasai import workers
+
+
+@attr.define(kw_only=True, weakref_slot=False)
+class TwitchSettings:
+    """A class containing settings which control how the Twitch client
+    behaves.
+
+    Example
+    -------
+    ```py
+    bot = kasai.GatewayBot(
+        ...,
+        twitch_settings=kasai.TwitchSettings(partial_viewers=True),
+    )
+    ```
+
+    .. versionadded:: 0.11a
+    """
+
+    partial_viewers: bool = attr.field(default=False)
+    """Whether to build message authors purely from IRC tags rather than
+    fetching them from the Twitch Helix API. Profile information (such
+    as descriptions and profile images) is then only fetched when
+    `kasai.Viewer.fetch_profile` is called. Defaults to `False`."""
+
+    user_cache_size: int = attr.field(default=1_000)
+    """The maximum number of users to keep in the user cache. Set this
+    to `0` to disable user caching. Defaults to `1_000`."""
+
+    user_cache_ttl: float = attr.field(default=300.0)
+    """The number of seconds users stay in the user cache for before
+    being fetched again. Defaults to `300.0`."""
+
+    channel_refresh_interval: float = attr.field(default=600.0)
+    """The number of seconds a joined channel's information is reused
+    for before being fetched again. Channel information is also
+    refreshed whenever Twitch sends ROOMSTATE information. Defaults to
+    `600.0`."""
+
+    coalesce_requests: bool = attr.field(default=True)
+    """Whether concurrent, identical GET requests to the Twitch Helix
+    API should share a single HTTP request. Defaults to `True`."""
+
+    connection_limit: int = attr.field(default=100)
+    """The maximum number of simultaneous HTTP connections to the
+    Twitch APIs. `0` means there is no limit. Defaults to `100`."""
+
+    connection_limit_per_host: int = attr.field(default=0)
+    """The maximum number of simultaneous HTTP connections to each host.
+    `0` means there is no limit. Defaults to `0`."""
+
+    keepalive_timeout: float = attr.field(default=30.0)
+    """The number of seconds an idle HTTP connection is kept open to be
+    reused. Defaults to `30.0`."""
+
+    dns_cache_ttl: int | None = attr.field(default=300)
+    """The number of seconds to cache DNS lookups for. If this is
+    `None`, lookups are cached forever. Defaults to `300`."""
+
+    connect_timeout: float | None = attr.field(default=10.0)
+    """The number of seconds to wait for an HTTP connection to be made,
+    including waiting for a free connection from the pool. If this is
+    `None`, there is no timeout. Defaults to `10.0`."""
+
+    read_timeout: float | None = attr.field(default=30.0)
+    """The number of seconds to wait for data from the Twitch APIs. If
+    this is `None`, there is no timeout. Defaults to `30.0`."""
+
+    request_timeout: float | None = attr.field(default=60.0)
+    """The total number of seconds a single HTTP request may take. If
+    this is `None`, there is no timeout. Defaults to `60.0`."""
+
+    api_retries: int = attr.field(default=3)
+    """The number of times to retry a Twitch Helix API request that was
+    rate limited. Retries wait until the rate limit resets. Defaults to
+    `3`."""
+
+    token_refresh_margin: float = attr.field(default=300.0)
+    """The number of seconds before the app access token expires to
+    refresh it. Defaults to `300.0`."""
+
+    api_background_share: float = attr.field(default=0.1)
+    """The share of the Twitch Helix API rate limit reserved for
+    background requests (see `kasai.Priority`) while interactive
+    requests are also waiting, so background work is never fully
+    starved. Defaults to `0.1`."""
+
+    user_batch_window: float = attr.field(default=0.0)
+    """The number of seconds to collect user lookups for before fetching
+    them from the Twitch Helix API in a single request (up to 100 users
+    at a time). Values between `0.005` and `0.02` work well for busy
+    chats. Set this to `0` to disable batching. Defaults to `0.0`."""
+
+    bulk_concurrency: int = attr.field(default=4)
+    """The maximum number of requests a single bulk fetch (such as
+    `kasai.TwitchClient.fetch_users`) can make at once. Each request
+    fetches up to 100 objects. Defaults to `4`."""
+
+    worker_count: int = attr.field(default=4)
+    """The number of worker lanes used to process received IRC lines.
+    Lines from the same channel always share a lane, so they are
+    processed in order, while different channels are processed
+    concurrently. Defaults to `4`."""
+
+    queue_size: int = attr.field(default=1_000)
+    """The maximum number of received IRC lines that can wait to be
+    processed in each worker lane. Defaults to `1_000`."""
+
+    backpressure_policy: workers.BackpressurePolicy = attr.field(
+        default=workers.BackpressurePolicy.BLOCK
+    )
+    """What to do when the queue of received IRC lines is full. Defaults
+    to `kasai.BackpressurePolicy.BLOCK`."""
+
+    read_buffer_size: int = attr.field(default=65_536)
+    """The maximum number of bytes to read from the IRC socket at once.
+    Larger values mean bursts of messages are framed and decoded in
+    fewer passes. Defaults to `65_536`."""
+
+    fast_irc_parser: bool = attr.field(default=False)
+    """Whether to parse IRC lines using Kasai's own Twitch-specific
+    parser (`kasai.irc.Decoder`) rather than `irctokens`. This parser
+    only unescapes tags when they are first accessed. Defaults to
+    `False`."""
+
+    message_limit: int = attr.field(default=20)
+    """The number of messages that can be sent per period to channels
+    where the client is not a moderator, VIP, or the broadcaster.
+    Defaults to `20`, which is Twitch's limit for regular users."""
+
+    elevated_message_limit: int = attr.field(default=100)
+    """The total number of messages that can be sent per period.
+    Messages to channels where the client is a moderator, VIP, or the
+    broadcaster only count towards this limit. The client works this
+    out from the badges Twitch reports for it in each channel. Defaults
+    to `100`."""
+
+    message_period: float = attr.field(default=30.0)
+    """The length of the message rate limit window in seconds. Defaults
+    to `30.0`."""
+
+    message_channel_gap: float = attr.field(default=1.0)
+    """The minimum number of seconds between messages to the same
+    channel where the client is not a moderator, VIP, or the
+    broadcaster. Defaults to `1.0`."""
+
+    message_backoff: float = attr.field(default=2.0)
+    """The number of seconds to stop sending messages for when Twitch
+    says the message rate limit was exceeded. This doubles each time it
+    happens in a row, up to `message_period`. Messages Twitch rejects
+    because of rate limits, slow mode, or duplicate content are always
+    sent again. Defaults to `2.0`."""
+
+    write_interval: float = attr.field(default=0.0)
+    """The number of seconds to collect outgoing IRC lines for before
+    writing them to the socket together. If this is `0`, lines queued
+    at the same time (such as when messaging many channels at once) are
+    still written together. Defaults to `0.0`."""
+
+    write_buffer_size: int = attr.field(default=65_536)
+    """The number of bytes of outgoing IRC lines after which they are
+    written to the socket straight away, regardless of
+    `write_interval`. Defaults to `65_536`."""
+
+    join_limit: int = attr.field(default=20)
+    """The number of channels that can be joined per period. Defaults
+    to `20`, which is Twitch's limit for regular accounts. Verified bots
+    can set this to `2_000`."""
+
+    join_period: float = attr.field(default=10.0)
+    """The length of the join rate limit window in seconds. Defaults to
+    `10.0`."""
+
+    join_timeout: float = attr.field(default=30.0)
+    """The number of seconds to wait for Twitch to confirm a join or
+    part before treating it as failed. Defaults to `30.0`."""
+
+    reconcile_interval: float = attr.field(default=60.0)
+    """The number of seconds between checks that the client is in the
+    channels it should be in. Channels that failed to join are tried
+    again at this interval. Defaults to `60.0`."""
+
+    channel_source: t.Callable[
+        [], t.Iterable[str] | t.Awaitable[t.Iterable[str]]
+    ] | None = attr.field(default=None)
+    """A function (or coroutine function) which returns the channels
+    the client should be in. If this is given, it's called every
+    `reconcile_interval` seconds, and the client joins and parts
+    channels to match. Defaults to `None`."""
+
+    shard_count: int = attr.field(default=1)
+    """The number of IRC connections to spread joined channels across.
+    Each connection has its own socket and listener, so more shards
+    means more throughput, and a disconnect only affects some channels.
+    Defaults to `1`."""
+
+    channels_per_shard: int | None = attr.field(default=None)
+    """The maximum number of channels to join on each IRC connection.
+    If this is set, `shard_count` is ignored, and shards are added as
+    they're needed. Defaults to `None`."""
+
+    reconnect_delay: float = attr.field(default=1.0)
+    """The base number of seconds to wait before reconnecting to IRC.
+    This doubles with each failed attempt, and a random amount of it is
+    used so clients don't all reconnect at once. Defaults to `1.0`."""
+
+    max_reconnect_delay: float = attr.field(default=60.0)
+    """The maximum number of seconds to wait before reconnecting to
+    IRC. Defaults to `60.0`."""
+
+    idle_timeout: float = attr.field(default=360.0)
+    """The number of seconds without receiving anything after which an
+    IRC connection is treated as dead and reconnected. Twitch sends a
+    PING roughly every five minutes. Defaults to `360.0`."""
+
+    anonymous_reads: bool = attr.field(default=False)
+    """Whether to read chat through anonymous ("justinfan") IRC
+    connections. Joined channels are then spread across anonymous
+    shards, which don't count towards the bot account's limits, while
+    messages are sent through a separate connection logged in as the
+    bot. Defaults to `False`."""
@@ -0,0 +1,751 @@
+# Copyright (c) 2022-present, Ethan Henderson
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+from __future__ import annotations
+
+__all__ = ("LineWriter", "Shard", "ShardHealth")
+
+import asyncio
+import logging
+import random
+import typing as t
+
+import attr
+import irctokens
+from hikari.internal import time as time_
+from hikari.internal.ux import TRACE
+
+from kasai import config, errors, irc, ratelimits, ux
+
+_log = logging.getLogger(__name__)
+_Line = t.Union[irc.Line, irctokens.line.Line]
+_Connection = t.Tuple[asyncio.StreamReader, asyncio.StreamWriter, "LineWriter"]
+_Decoder = t.Union[irc.Decoder, irctokens.stateful.StatefulDecoder]
+
+
+class LineWriter:
+    """A class representing a buffered writer for outgoing IRC lines.
+
+    Lines are collected and written to the stream in batches, with a
+    single drain per batch. A batch is written once `interval` seconds
+    have passed since its first line, or as soon as it reaches
+    `max_size` bytes, whichever comes first.
+
+    Parameters
+    ----------
+    writer : asyncio.StreamWriter
+        The stream to write lines to.
+
+    Other Parameters
+    ----------------
+    interval : float
+        The number of seconds to collect lines for before writing them.
+        If this is `0`, lines queued during the same iteration of the
+        event loop are written together. Defaults to `0.0`.
+    max_size : int
+        The number of bytes after which a batch is written straight
+        away. Defaults to `65_536`.
+
+    .. versionadded:: 0.11a
+    """
+
+    __slots__ = (
+        "_writer",
+        "_interval",
+        "_max_size",
+        "_lines",
+        "_futures",
+        "_size",
+        "_event",
+        "_task",
+        "_batches",
+        "_written",
+    )
+
+    def __init__(
+        self,
+        writer: asyncio.StreamWriter,
+        *,
+        interval: float = 0.0,
+        max_size: int = 65_536,
+    ) -> None:
+        self._writer = writer
+        self._interval = interval
+        self._max_size = max_size
+        self._lines: list[bytes] = []
+        self._futures: list[asyncio.Future[None]] = []
+        self._size = 0
+        self._event = ux.LazyEvent()
+        self._task: asyncio.Task[None] | None = None
+        self._batches = 0
+        self._written = 0
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the writer task is running."""
+
+        return self._task is not None
+
+    @property
+    def pending(self) -> int:
+        """The number of lines waiting to be written."""
+
+        return len(self._lines)
+
+    @property
+    def batches(self) -> int:
+        """The number of batches that have been written."""
+
+        return self._batches
+
+    @property
+    def written(self) -> int:
+        """The number of lines that have been written."""
+
+        return self._written
+
+    def start(self) -> None:
+        """Starts the writer task. This must be called from within a
+        running event loop.
+
+        Returns
+        -------
+        None
+        """
+
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def close(self) -> None:
+        """Stops the writer task, after writing any lines that are still
+        waiting.
+
+        Returns
+        -------
+        None
+        """
+
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+        if self._lines:
+            await self._flush()
+
+    def write(self, line: bytes) -> asyncio.Future[None]:
+        """Queues a line to be written.
+
+        Parameters
+        ----------
+        line : bytes
+            The raw line, including the trailing CRLF.
+
+        Returns
+        -------
+        asyncio.Future[None]
+            A future which completes once the line has been written and
+            drained. This can be ignored if confirmation isn't needed.
+        """
+
+        fut: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._lines.append(line)
+        self._futures.append(fut)
+        self._size += len(line)
+
+        if len(self._lines) == 1 or self._size >= self._max_size:
+            self._event.set()
+
+        return fut
+
+    async def send(self, line: bytes) -> None:
+        """Queues a line to be written, and waits for it to be written.
+
+        Parameters
+        ----------
+        line : bytes
+            The raw line, including the trailing CRLF.
+
+        Returns
+        -------
+        None
+        """
+
+        await self.write(line)
+
+    async def _run(self) -> None:
+        event = self._event
+
+        while True:
+            await event.wait()
+            event.clear()
+
+            if self._interval <= 0:
+                # Let everything else due this iteration queue its lines.
+                await asyncio.sleep(0)
+            elif self._size < self._max_size:
+                try:
+                    # This is woken early if the batch fills up.
+                    await asyncio.wait_for(event.wait(), self._interval)
+                except asyncio.TimeoutError:
+                    ...
+                event.clear()
+
+            if self._lines:
+                await self._flush()
+
+    async def _flush(self) -> None:
+        lines, futures = self._lines, self._futures
+        self._lines, self._futures, self._size = [], [], 0
+
+        try:
+            self._writer.writelines(lines)
+            await self._writer.drain()
+        except asyncio.CancelledError:
+            for fut in futures:
+                fut.cancel()
+            raise
+        except Exception as exc:
+            _log.error(f"failed to write {len(lines)} line(s) to IRC", exc_info=exc)
+
+            for fut in futures:
+                if not fut.done():
+                    fut.set_exception(exc)
+            return
+
+        self._batches += 1
+        self._written += len(lines)
+
+        for fut in futures:
+            if not fut.done():
+                fut.set_result(None)
+
+
+@attr.define(kw_only=True, weakref_slot=False)
+class ShardHealth:
+    """A class representing the health of a shard.
+
+    .. versionadded:: 0.11a
+    """
+
+    id: int = attr.field()
+    """The shard's ID."""
+
+    is_connected: bool = attr.field()
+    """Whether the shard is connected."""
+
+    channels: int = attr.field()
+    """The number of channels assigned to the shard."""
+
+    lines_received: int = attr.field()
+    """The number of lines the shard has received."""
+
+    last_received: float | None = attr.field()
+    """The number of seconds since the shard last received a line, or
+    `None` if it never has. Twitch sends a PING every five minutes or
+    so, so anything much higher than that suggests a dead connection."""
+
+    pending_writes: int = attr.field()
+    """The number of lines waiting to be written."""
+
+    join_progress: ratelimits.JoinProgress = attr.field()
+    """The progress of the shard's queued joins and parts."""
+
+    reconnects: int = attr.field()
+    """The number of times the shard has reconnected."""
+
+
+class Shard:
+    """A class representing a single connection to Twitch's IRC servers.
+
+    Each shard has its own socket, decoder, writer, and listener, and
+    joins its own channels. Lines it receives (including PINGs, which it
+    answers itself) are passed to `on_line`.
+
+    Parameters
+    ----------
+    id : int
+        The shard's ID.
+    token : str | None
+        The IRC access token to log in with. If this is `None`, the
+        shard logs in anonymously, and can only read chat. In that case,
+        `nickname` should be of the form "justinfan12345".
+    nickname : str
+        The nickname to log in with.
+    on_line : Callable[[Line], Awaitable[None]]
+        The coroutine function each received line is passed to.
+
+    Other Parameters
+    ----------------
+    settings : kasai.TwitchSettings | None
+        The settings to use. Defaults to `None`, which uses the default
+        settings.
+    join_limiter : kasai.WindowLimiter | None
+        The join rate limit to use. Shards logged in with the same
+        account should share one. Defaults to `None`.
+    on_connect : Callable[[Shard, float | None], None] | None
+        A function called whenever the shard connects. It receives the
+        shard, and the number of seconds it was disconnected for (or
+        `None` the first time it connects). Defaults to `None`.
+    on_disconnect : Callable[[Shard, bool], None] | None
+        A function called whenever the shard disconnects. It receives
+        the shard, and whether Twitch asked it to reconnect. Defaults to
+        `None`.
+
+    .. versionadded:: 0.11a
+    """
+
+    __slots__ = (
+        "_id",
+        "_token",
+        "_nickname",
+        "_on_line",
+        "_on_connect",
+        "_on_disconnect",
+        "_settings",
+        "_channels",
+        "_joins",
+        "_reader",
+        "_writer",
+        "_out",
+        "_d",
+        "_task",
+        "_handover",
+        "_connected",
+        "_rejoined",
+        "_lines_received",
+        "_last_received",
+        "_reconnects",
+    )
+
+    def __init__(
+        self,
+        id: int,
+        token: str | None,
+        nickname: str,
+        on_line: t.Callable[[_Line], t.Awaitable[None]],
+        *,
+        settings: config.TwitchSettings | None = None,
+        join_limiter: ratelimits.WindowLimiter | None = None,
+        on_connect: t.Callable[[Shard, float | None], None] | None = None,
+        on_disconnect: t.Callable[[Shard, bool], None] | None = None,
+    ) -> None:
+        self._id = id
+        self._token = token
+        self._nickname = nickname
+        self._on_line = on_line
+        self._on_connect = on_connect
+        self._on_disconnect = on_disconnect
+        self._settings = settings or config.TwitchSettings()
+        self._channels: set[str] = set()
+        self._joins = ratelimits.JoinScheduler(
+            self.send,
+            limit=self._settings.join_limit,
+            period=self._settings.join_period,
+            timeout=self._settings.join_timeout,
+            limiter=join_limiter,
+        )
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._out: LineWriter | None = None
+        self._d = self._new_decoder()
+        self._task: asyncio.Task[None] | None = None
+        self._handover: asyncio.Task[None] | None = None
+        self._connected: asyncio.Future[None] | None = None
+        self._rejoined: set[str] = set()
+        self._lines_received = 0
+        self._last_received: float | None = None
+        self._reconnects = 0
+
+    def __repr__(self) -> str:
+        return f"Shard(id={self._id}, channels={len(self._channels)})"
+
+    @property
+    def id(self) -> int:
+        """The shard's ID."""
+
+        return self._id
+
+    @property
+    def is_anonymous(self) -> bool:
+        """Whether the shard is logged in anonymously, and so can only
+        read chat."""
+
+        return self._token is None
+
+    @property
+    def channels(self) -> set[str]:
+        """The channels assigned to this shard. This is updated by the
+        client."""
+
+        return self._channels
+
+    @property
+    def joins(self) -> ratelimits.JoinScheduler:
+        """The scheduler this shard's joins and parts go through."""
+
+        return self._joins
+
+    @property
+    def is_connected(self) -> bool:
+        """Whether the shard is connected."""
+
+        return self._writer is not None and not self._writer.is_closing()
+
+    @property
+    def health(self) -> ShardHealth:
+        """The shard's current health."""
+
+        return ShardHealth(
+            id=self._id,
+            is_connected=self.is_connected,
+            channels=len(self._channels),
+            lines_received=self._lines_received,
+            last_received=(
+                None
+                if self._last_received is None
+                else time_.monotonic() - self._last_received
+            ),
+            pending_writes=self._out.pending if self._out else 0,
+            join_progress=self._joins.progress,
+            reconnects=self._reconnects,
+        )
+
+    async def connect(self) -> None:
+        """Connects to Twitch's IRC servers and logs in. The shard then
+        reconnects by itself until `Shard.close` is called.
+
+        Returns
+        -------
+        None
+        """
+
+        conn = await self._open()
+        self._task = asyncio.get_running_loop().create_task(self._supervise(conn))
+        self._task.add_done_callback(ux.log_failure(_log, "shard supervisor failed"))
+
+    async def close(self, *, part: t.Iterable[str] = ()) -> None:
+        """Closes the connection.
+
+        Other Parameters
+        ----------------
+        part : Iterable[str]
+            The login usernames of channels to part before closing.
+            Defaults to an empty tuple.
+
+        Returns
+        -------
+        None
+        """
+
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+        if self._handover:
+            self._handover.cancel()
+            await asyncio.gather(self._handover, return_exceptions=True)
+
+        await self._joins.stop()
+
+        if self._out is not None:
+            # There's no rate limit on parting, so everything is parted
+            # in one go rather than through the scheduler.
+            for line in ratelimits.build_lines("PART", part):
+                self._out.write(line)
+
+        await self._close_connection()
+        _log.info(f"shard {self._id} closed")
+
+    def write(self, line: bytes) -> asyncio.Future[None]:
+        """Queues a line to be written.
+
+        Parameters
+        ----------
+        line : bytes
+            The raw line, including the trailing CRLF.
+
+        Returns
+        -------
+        asyncio.Future[None]
+            A future which completes once the line has been written.
+        """
+
+        if self._out is None:
+            raise errors.NotAlive(f"shard {self._id} is not connected")
+
+        return self._out.write(line)
+
+    async def send(self, line: bytes) -> None:
+        """Queues a line to be written, and waits for it to be written.
+
+        Parameters
+        ----------
+        line : bytes
+            The raw line, including the trailing CRLF.
+
+        Returns
+        -------
+        None
+        """
+
+        await self.write(line)
+
+    def _new_decoder(self) -> _Decoder:
+        if self._settings.fast_irc_parser:
+            return irc.Decoder()
+
+        return irctokens.stateful.StatefulDecoder()
+
+    def _backoff(self, attempt: int) -> float:
+        # "Full jitter" spreads reconnects out, so shards (and other
+        # clients) that dropped at the same time don't retry together.
+        cap = min(
+            self._settings.max_reconnect_delay,
+            self._settings.reconnect_delay * 2**attempt,
+        )
+        return random.uniform(0, cap)  # nosec: B311
+
+    async def _open(self) -> _Connection:
+        reader, writer = await asyncio.open_connection(
+            "irc.chat.twitch.tv",
+            6667,
+            limit=max(self._settings.read_buffer_size, 2**16),
+        )
+        _log.debug(f"shard {self._id} connected to {writer.get_extra_info('peername')}")
+        out = LineWriter(
+            writer,
+            interval=self._settings.write_interval,
+            max_size=self._settings.write_buffer_size,
+        )
+        out.start()
+        login = f"PASS {self._token}\r\n" if self._token else ""
+        await out.send(
+            (
+                f"{login}NICK {self._nickname}\r\n"
+                "CAP REQ :twitch.tv/commands twitch.tv/tags\r\n"
+            ).encode(),
+        )
+        return reader, writer, out
+
+    async def _close_connection(self, conn: _Connection | None = None) -> None:
+        if conn is None:
+            if self._reader is None or self._writer is None or self._out is None:
+                return
+
+            conn = (self._reader, self._writer, self._out)
+            self._reader, self._writer, self._out = None, None, None
+
+        _, writer, out = conn
+
+        try:
+            await out.close()
+            writer.close()
+            await writer.wait_closed()
+        except OSError:
+            # The connection is likely already dead.
+            ...
+        except Exception:
+            _log.exception(f"shard {self._id} failed to close a connection")
+
+    async def _supervise(self, conn: _Connection | None) -> None:
+        attempt = 0
+        disconnected_at: float | None = None
+
+        while True:
+            if conn is None:
+                delay = self._backoff(attempt)
+                attempt += 1
+                _log.warning(
+                    f"shard {self._id} reconnecting in {delay:,.2f}s "
+                    f"(attempt {attempt})"
+                )
+                await asyncio.sleep(delay)
+
+                try:
+                    conn = await self._open()
+                except Exception as exc:
+                    _log.warning(f"shard {self._id} failed to reconnect: {exc}")
+                    continue
+
+            self._reader, self._writer, self._out = conn
+            self._d = self._new_decoder()
+            attempt = 0
+
+            if disconnected_at is not None:
+                self._reconnects += 1
+
+            if self._on_connect:
+                try:
+                    self._on_connect(
+                        self,
+                        None
+                        if disconnected_at is None
+                        else time_.monotonic() - disconnected_at,
+                    )
+                except Exception:
+                    _log.exception(f"shard {self._id} connect callback failed")
+
+            self._joins.start()
+            _log.info(f"shard {self._id} is ready")
+
+            if self._connected and not self._connected.done():
+                self._connected.set_result(None)
+
+            try:
+                requested = await self._listen()
+            except Exception:
+                # Anything unexpected is treated as a dropped connection,
+                # so the shard doesn't stay dead.
+                _log.exception(f"shard {self._id} listener failed")
+                requested = False
+
+            disconnected_at = time_.monotonic()
+
+            # Joins that weren't confirmed are sent again once the shard
+            # is back.
+            await self._joins.reset()
+            old, conn = conn, None
+            self._reader, self._writer, self._out = None, None, None
+
+            if self._on_disconnect:
+                try:
+                    self._on_disconnect(self, requested)
+                except Exception:
+                    _log.exception(f"shard {self._id} disconnect callback failed")
+
+            if not requested:
+                await self._close_connection(old)
+                continue
+
+            # Twitch asks for a reconnect ahead of closing the
+            # connection, so the old connection is still read until the
+            # new one has rejoined its channels.
+            if self._handover:
+                self._handover.cancel()
+                await asyncio.gather(self._handover, return_exceptions=True)
+
+            self._rejoined.clear()
+            self._connected = asyncio.get_running_loop().create_future()
+            self._handover = asyncio.ensure_future(
+                self._hand_over(old, self._d, self._connected)
+            )
+
+            try:
+                conn = await self._open()
+            except Exception as exc:
+                _log.warning(f"shard {self._id} failed to reconnect: {exc}")
+
+    async def _hand_over(
+        self, old: _Connection, d: _Decoder, connected: asyncio.Future[None]
+    ) -> None:
+        async def rejoin() -> None:
+            await connected
+            await self._joins.wait()
+
+        tasks: tuple[asyncio.Future[t.Any], ...] = (
+            asyncio.ensure_future(self._listen(old, d)),
+            asyncio.ensure_future(rejoin()),
+        )
+
+        try:
+            # This finishes early if Twitch closes the old connection.
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await self._close_connection(old)
+            self._handover = None
+            _log.debug(f"shard {self._id} closed its old connection")
+
+    async def _listen(
+        self, drain: _Connection | None = None, d: _Decoder | None = None
+    ) -> bool:
+        # This returns whether Twitch asked for a reconnect. If `drain`
+        # is given, that (old) connection is read instead of the current
+        # one, skipping channels the new connection has rejoined.
+        reader, out = (drain[0], drain[2]) if drain else (self._reader, self._out)
+        d = d or self._d
+        assert reader
+        assert out
+        _log.debug(f"starting IRC listener for shard {self._id}...")
+
+        while True:
+            # Read everything that's available in one go, rather than in
+            # small chunks, so bursts of tag-heavy lines are split and
+            # decoded in as few passes as possible.
+            try:
+                payload = await asyncio.wait_for(
+                    reader.read(self._settings.read_buffer_size),
+                    self._settings.idle_timeout,
+                )
+            except asyncio.TimeoutError:
+                _log.warning(f"shard {self._id} received nothing, reconnecting...")
+                return False
+            except OSError as exc:
+                _log.warning(f"shard {self._id} connection failed: {exc}")
+                return False
+
+            _log.log(
+                TRACE, f"received IRC payload with size {len(payload)}\n    {payload!r}"
+            )
+
+            if not payload:
+                _log.warning(f"shard {self._id} socket closed unexpectedly")
+                return False
+
+            self._last_received = time_.monotonic()
+
+            # This is empty if the payload didn't complete a line.
+            for line in d.push(payload) or ():
+                self._lines_received += 1
+                channel = line.params[0][1:] if line.params else ""
+
+                if drain and channel in self._rejoined:
+                    # The new connection is passing these on already.
+                    continue
+
+                if line.command == "JOIN" and not drain and self._handover:
+                    self._rejoined.add(channel)
+
+                if line.command == "PING":
+                    # PINGs are answered here rather than by the workers
+                    # so the connection stays alive even when they are
+                    # backed up. There's no need to wait for the PONG to
+                    # be written.
+                    out.write(b"PONG :tmi.twitch.tv\r\n")
+                    _log.log(TRACE, "received PING, returned PONG")
+
+                elif line.command == "RECONNECT":
+                    _log.info(f"shard {self._id} was asked to reconnect")
+                    return True
+
+                await self._on_line(line)
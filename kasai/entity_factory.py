@@ -51,7 +51,13 @@ class TwitchEntityFactory(EntityFactory, abc.ABC):
 
     @abc.abstractmethod
     def deserialize_twitch_viewer(
-        self, payload: data_binding.JSONObject, tags: dict[str, str]
+        self, payload: data_binding.JSONObject, tags: t.Mapping[str, str]
+    ) -> users.Viewer:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def deserialize_twitch_partial_viewer(
+        self, username: str, tags: t.Mapping[str, str]
     ) -> users.Viewer:
         raise NotImplementedError
 
@@ -65,7 +71,7 @@ class TwitchEntityFactory(EntityFactory, abc.ABC):
     def deserialize_twitch_message(
         self,
         message: str,
-        tags: dict[str, str],
+        tags: t.Mapping[str, str],
         viewer: users.Viewer,
         channel: channels.Channel,
     ) -> messages.Message:
@@ -100,7 +106,7 @@ class TwitchEntityFactoryImpl(EntityFactoryImpl, TwitchEntityFactory):
         )
 
     def deserialize_twitch_viewer(
-        self, payload: data_binding.JSONObject, tags: dict[str, str]
+        self, payload: data_binding.JSONObject, tags: t.Mapping[str, str]
     ) -> users.Viewer:
         return users.ViewerImpl(
             app=self._app,
@@ -120,6 +126,21 @@ class TwitchEntityFactoryImpl(EntityFactoryImpl, TwitchEntityFactory):
             is_broadcaster="broadcaster" in tags["badges"],
         )
 
+    def deserialize_twitch_partial_viewer(
+        self, username: str, tags: t.Mapping[str, str]
+    ) -> users.Viewer:
+        return users.PartialViewerImpl(
+            app=self._app,
+            display_name=tags["display-name"] or username,
+            id=tags["user-id"],
+            username=username,
+            color=int((tags["color"] or "#0")[1:], base=16),
+            is_mod=bool(int(tags["mod"])),
+            is_subscriber=bool(int(tags["subscriber"])),
+            is_turbo=bool(int(tags["turbo"])),
+            is_broadcaster="broadcaster" in tags["badges"],
+        )
+
     def deserialize_twitch_channel(
         self, payload: data_binding.JSONObject
     ) -> channels.Channel:
@@ -137,7 +158,7 @@ class TwitchEntityFactoryImpl(EntityFactoryImpl, TwitchEntityFactory):
     def deserialize_twitch_message(
         self,
         content: str,
-        tags: dict[str, str],
+        tags: t.Mapping[str, str],
         viewer: users.Viewer,
         channel: channels.Channel,
     ) -> messages.Message:
@@ -149,6 +170,7 @@ class TwitchEntityFactoryImpl(EntityFactoryImpl, TwitchEntityFactory):
             created_at=dt.datetime.fromtimestamp(int(tags["tmi-sent-ts"]) / 1000),
             bits=int(tags.get("bits", 0)),
             content=content,
+            tags=tags,
         )
 
     def deserialize_twitch_stream(
@@ -34,6 +34,7 @@ __all__ = (
     "RequestFailed",
     "IrcError",
     "NotJoined",
+    "NotLoaded",
 )
 
 
@@ -51,6 +52,14 @@ class IsAlive(KasaiError):
     shouldn't be."""
 
 
+class NotLoaded(KasaiError):
+    """Exception thrown when accessing information that has not been
+    loaded yet.
+
+    .. versionadded:: 0.11a
+    """
+
+
 class HelixError(KasaiError):
     """Exception thrown when something goes wrong regarding the Twitch
     Helix API."""
@@ -34,6 +34,8 @@ __all__ = (
     "PingEvent",
     "JoinEvent",
     "PartEvent",
+    "ShardConnectEvent",
+    "ShardDisconnectEvent",
     "JoinRoomstateEvent",
     "ModActionEvent",
     "ClearEvent",
@@ -43,6 +45,7 @@ __all__ = (
 
 import abc
 import datetime as dt
+import typing as t
 
 import attr
 from hikari import Event
@@ -111,6 +114,14 @@ class MessageCreateEvent(KasaiEvent):
         """The text content of the message."""
         return self.message.content
 
+    @property
+    def tags(self) -> t.Mapping[str, str]:
+        """The IRC tags the message was sent with.
+
+        .. versionadded:: 0.11a
+        """
+        return self.message.tags
+
 
 @attr.define(kw_only=True, weakref_slot=False)
 class PingEvent(KasaiEvent):
@@ -162,6 +173,53 @@ class PartEvent(KasaiEvent):
     )
 
 
+@attr.define(kw_only=True, weakref_slot=False)
+class ShardConnectEvent(KasaiEvent):
+    """Event fired when an IRC connection connects or reconnects.
+
+    .. versionadded:: 0.11a
+    """
+
+    shard_id: int = attr.field()
+    """The ID of the shard that connected."""
+
+    downtime: float | None = attr.field()
+    """The number of seconds the shard was disconnected for, or `None`
+    if this is its first connection."""
+
+    app: kasai.TwitchAware = attr.field(
+        repr=False,
+        eq=False,
+        hash=False,
+        metadata={attr_extensions.SKIP_DEEP_COPY: True},
+    )
+    """The base client application."""
+
+
+@attr.define(kw_only=True, weakref_slot=False)
+class ShardDisconnectEvent(KasaiEvent):
+    """Event fired when an IRC connection disconnects. The shard
+    reconnects by itself, and its channels are joined again.
+
+    .. versionadded:: 0.11a
+    """
+
+    shard_id: int = attr.field()
+    """The ID of the shard that disconnected."""
+
+    requested: bool = attr.field()
+    """Whether Twitch asked the shard to reconnect, rather than the
+    connection being lost."""
+
+    app: kasai.TwitchAware = attr.field(
+        repr=False,
+        eq=False,
+        hash=False,
+        metadata={attr_extensions.SKIP_DEEP_COPY: True},
+    )
+    """The base client application."""
+
+
 @attr.define(kw_only=True, weakref_slot=False)
 class JoinRoomstateEvent(KasaiEvent):
     """Event fired when the client receives ROOMSTATE information after
@@ -221,6 +279,12 @@ class ModActionEvent(KasaiEvent):
     created_at: dt.datetime = attr.field()
     """The date and time the mod action was executed."""
 
+    tags: t.Mapping[str, str] = attr.field(factory=dict, repr=False)
+    """The IRC tags the mod action was sent with.
+
+    .. versionadded:: 0.11a
+    """
+
     @property
     def channel_id(self) -> str:
         """The ID of the channel."""
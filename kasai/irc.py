@@ -0,0 +1,293 @@
+# Copyright (c) 2022-present, Ethan Henderson
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+from __future__ import annotations
+
+__all__ = ("Tags", "Line", "Decoder", "parse_badges", "unescape_tag")
+
+import re
+import typing as t
+
+from irctokens.hostmask import Hostmask
+from irctokens.hostmask import hostmask as parse_hostmask
+
+_ESCAPE_PATTERN = re.compile(r"\\(.?)", re.DOTALL)
+_ESCAPES = {":": ";", "s": " ", "\\": "\\", "r": "\r", "n": "\n"}
+
+
+def _unescape(match: t.Match[str]) -> str:
+    char = match.group(1)
+    return _ESCAPES.get(char, char)
+
+
+def unescape_tag(value: str) -> str:
+    """Unescapes an IRCv3 tag value.
+
+    Parameters
+    ----------
+    value : str
+        The raw tag value.
+
+    Returns
+    -------
+    str
+        The unescaped tag value.
+
+    .. versionadded:: 0.11a
+    """
+
+    if "\\" not in value:
+        return value
+
+    return _ESCAPE_PATTERN.sub(_unescape, value)
+
+
+def parse_badges(value: str) -> dict[str, str]:
+    """Parses the value of a "badges" tag into a mapping of badge names
+    to versions.
+
+    Example
+    -------
+    ```py
+    >>> kasai.irc.parse_badges("moderator/1,subscriber/12")
+    {'moderator': '1', 'subscriber': '12'}
+    ```
+
+    Parameters
+    ----------
+    value : str
+        The tag value.
+
+    Returns
+    -------
+    dict[str, str]
+        The badges.
+
+    .. versionadded:: 0.11a
+    """
+
+    if not value:
+        return {}
+
+    return dict(b.partition("/")[::2] for b in value.split(","))
+
+
+class Tags(t.Mapping[str, str]):
+    """A class representing a read-only mapping of IRCv3 tags.
+
+    The raw tag segment is kept as-is until a tag is first accessed, at
+    which point it is split in a single pass. Values are only unescaped
+    when they are accessed.
+
+    Parameters
+    ----------
+    raw : str
+        The raw tag segment, without the leading "@".
+
+    .. versionadded:: 0.11a
+    """
+
+    __slots__ = ("_raw", "_values")
+
+    def __init__(self, raw: str) -> None:
+        self._raw = raw
+        self._values: dict[str, str] | None = None
+
+    def __repr__(self) -> str:
+        return f"Tags({self._raw!r})"
+
+    def __getitem__(self, key: str) -> str:
+        value = self._split()[key]
+        return unescape_tag(value) if "\\" in value else value
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._split()
+
+    def __iter__(self) -> t.Iterator[str]:
+        return iter(self._split())
+
+    def __len__(self) -> int:
+        return len(self._split())
+
+    def _split(self) -> dict[str, str]:
+        # Finding each tag individually is slower than one split once
+        # more than a few tags are read, which is almost always.
+        if self._values is None:
+            values = {}
+
+            for tag in self._raw.split(";"):
+                key, _, value = tag.partition("=")
+                values[key] = value
+
+            self._values = values
+
+        return self._values
+
+
+class Line:
+    """A class representing a single line received from Twitch IRC.
+
+    This is a lightweight alternative to `irctokens.Line`. Tags are held
+    in a `Tags` mapping, so each one is only parsed when it is first
+    accessed.
+
+    .. versionadded:: 0.11a
+    """
+
+    __slots__ = ("_raw_tags", "_tags", "source", "command", "params")
+
+    def __init__(
+        self, raw_tags: str | None, source: str | None, command: str, params: list[str]
+    ) -> None:
+        self._raw_tags = raw_tags
+        self._tags: Tags | None = None
+        self.source = source
+        """The source of this line, if any."""
+        self.command = command
+        """This line's command."""
+        self.params = params
+        """This line's parameters, including the trailing parameter."""
+
+    def __repr__(self) -> str:
+        return (
+            f"Line(tags={self.tags!r}, source={self.source!r}, "
+            f"command={self.command!r}, params={self.params!r})"
+        )
+
+    @property
+    def tags(self) -> Tags | None:
+        """This line's tags, if any."""
+
+        if self._tags is None and self._raw_tags is not None:
+            self._tags = Tags(self._raw_tags)
+
+        return self._tags
+
+    @property
+    def hostmask(self) -> Hostmask:
+        """The parsed source of this line."""
+
+        if self.source is None:
+            raise ValueError("cannot parse hostmask from null source")
+
+        return parse_hostmask(self.source)
+
+    @classmethod
+    def parse(cls, line: str) -> Line:
+        """Parses a single line of IRC.
+
+        Parameters
+        ----------
+        line : str
+            The line to parse, without its line ending.
+
+        Returns
+        -------
+        kasai.irc.Line
+            The parsed line.
+        """
+
+        raw_tags = source = None
+
+        # Slices are used so lines without a command don't fail here.
+        if line[:1] == "@":
+            raw_tags, _, line = line.partition(" ")
+            raw_tags = raw_tags[1:]
+
+        if line[:1] == ":":
+            source, _, line = line.partition(" ")
+            source = source[1:]
+
+        command, _, line = line.partition(" ")
+
+        if line[:1] == ":":
+            params = [line[1:]]
+        else:
+            middle, sep, trailing = line.partition(" :")
+            params = middle.split()
+
+            if sep:
+                params.append(trailing)
+
+        return cls(raw_tags, source, command.upper(), params)
+
+
+class Decoder:
+    """A class which splits a stream of bytes from Twitch IRC into
+    lines, and parses them.
+
+    This can be used in place of `irctokens.StatefulDecoder`.
+
+    .. versionadded:: 0.11a
+    """
+
+    __slots__ = ("_buffer",)
+
+    def __init__(self) -> None:
+        self._buffer = b""
+
+    def pending(self) -> bytes:
+        """The bytes of the current, incomplete line."""
+
+        return self._buffer
+
+    def push(self, data: bytes) -> list[Line] | None:
+        """Pushes received bytes into the decoder.
+
+        Parameters
+        ----------
+        data : bytes
+            The received bytes.
+
+        Returns
+        -------
+        list[kasai.irc.Line] | None
+            The lines completed by these bytes, or `None` if no bytes
+            were pushed.
+        """
+
+        if not data:
+            return None
+
+        # Like irctokens, lines are split on LF, with the CR optional.
+        *raw_lines, self._buffer = (self._buffer + data).split(b"\n")
+        lines = []
+
+        for raw in raw_lines:
+            if not (raw := raw.rstrip(b"\r")):
+                continue
+
+            try:
+                line = raw.decode("utf-8")
+            except UnicodeDecodeError:
+                line = raw.decode("latin-1")
+
+            lines.append(Line.parse(line))
+
+        return lines
@@ -0,0 +1,329 @@
+# Copyright (c) 2022-present, Ethan Henderson
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+from __future__ import annotations
+
+__all__ = ("ChannelReconciler",)
+
+import asyncio
+import functools
+import inspect
+import logging
+import typing as t
+
+_log = logging.getLogger(__name__)
+_Schedule = t.Callable[[t.Iterable[str]], t.List["asyncio.Future[bool]"]]
+_Source = t.Callable[[], t.Union[t.Iterable[str], t.Awaitable[t.Iterable[str]]]]
+
+
+class ChannelReconciler:
+    """A class which keeps the channels a client has joined in line with
+    the channels it should be in.
+
+    The channels the client should be in (the target) can be changed at
+    any time. Only the differences between the target and the joined
+    channels are joined or parted, and channels that failed to join are
+    tried again on the next pass. Passes happen whenever the target
+    changes, and every `interval` seconds.
+
+    Parameters
+    ----------
+    join : Callable[[Iterable[str]], list[asyncio.Future[bool]]]
+        The function used to queue joins. It should return a future for
+        each channel, which completes with whether the join succeeded.
+    part : Callable[[Iterable[str]], list[asyncio.Future[bool]]]
+        The function used to queue parts, in the same way.
+
+    Other Parameters
+    ----------------
+    interval : float
+        The number of seconds between passes. Defaults to `60.0`.
+    source : Callable[[], Iterable[str] | Awaitable[...]] | None
+        A function (or coroutine function) which returns the target
+        channels as an iterable of login usernames. If this is given,
+        the target is replaced with its result at the start of every
+        pass. Defaults to `None`.
+
+    .. versionadded:: 0.11a
+    """
+
+    __slots__ = (
+        "_join",
+        "_part",
+        "_interval",
+        "_source",
+        "_target",
+        "_joined",
+        "_pending",
+        "_failed",
+        "_event",
+        "_task",
+    )
+
+    def __init__(
+        self,
+        join: _Schedule,
+        part: _Schedule,
+        *,
+        interval: float = 60.0,
+        source: _Source | None = None,
+    ) -> None:
+        self._join = join
+        self._part = part
+        self._interval = interval
+        self._source = source
+        self._target: set[str] = set()
+        self._joined: set[str] = set()
+        self._pending: dict[str, tuple[str, asyncio.Future[bool]]] = {}
+        self._failed: set[str] = set()
+        self._event: asyncio.Event | None = None
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the reconciler is running."""
+
+        return self._task is not None
+
+    @property
+    def target(self) -> frozenset[str]:
+        """The channels the client should be in."""
+
+        return frozenset(self._target)
+
+    @property
+    def joined(self) -> frozenset[str]:
+        """The channels the client is in."""
+
+        return frozenset(self._joined)
+
+    @property
+    def pending(self) -> frozenset[str]:
+        """The channels waiting to be joined or parted."""
+
+        return frozenset(self._pending)
+
+    @property
+    def failed(self) -> frozenset[str]:
+        """The channels that failed to join the last time they were
+        tried."""
+
+        return frozenset(self._failed)
+
+    def __contains__(self, channel: object) -> bool:
+        return channel in self._joined
+
+    def start(self) -> None:
+        """Starts reconciling. This must be called from within a running
+        event loop.
+
+        Returns
+        -------
+        None
+        """
+
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stops reconciling.
+
+        Returns
+        -------
+        None
+        """
+
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def set_target(self, channels: t.Iterable[str]) -> None:
+        """Replaces the channels the client should be in.
+
+        Parameters
+        ----------
+        channels : Iterable[str]
+            The login usernames of the channels.
+
+        Returns
+        -------
+        None
+        """
+
+        self._target = {c.strip("#") for c in channels}
+        self._wake()
+
+    def add(self, channels: t.Iterable[str]) -> list[asyncio.Future[bool]]:
+        """Adds channels to the target, and joins them straight away.
+
+        Parameters
+        ----------
+        channels : Iterable[str]
+            The login usernames of the channels.
+
+        Returns
+        -------
+        list[asyncio.Future[bool]]
+            A future for each channel that wasn't already joined, which
+            completes with whether it was joined.
+        """
+
+        channels = {c.strip("#") for c in channels}
+        self._target |= channels
+        return self._schedule("JOIN", channels - self._joined)
+
+    def remove(self, channels: t.Iterable[str]) -> list[asyncio.Future[bool]]:
+        """Removes channels from the target, and parts them right away.
+
+        Parameters
+        ----------
+        channels : Iterable[str]
+            The login usernames of the channels.
+
+        Returns
+        -------
+        list[asyncio.Future[bool]]
+            A future for each channel that was joined, which completes
+            with whether it was parted.
+        """
+
+        channels = {c.strip("#") for c in channels}
+        self._target -= channels
+        return self._schedule("PART", channels & self._joined)
+
+    def mark_joined(self, channel: str) -> None:
+        """Records that the client joined a channel.
+
+        Parameters
+        ----------
+        channel : str
+            The login username of the channel.
+
+        Returns
+        -------
+        None
+        """
+
+        self._joined.add(channel)
+        self._failed.discard(channel)
+
+    def mark_parted(self, channel: str) -> None:
+        """Records that the client parted a channel.
+
+        Parameters
+        ----------
+        channel : str
+            The login username of the channel.
+
+        Returns
+        -------
+        None
+        """
+
+        self._joined.discard(channel)
+
+    def reconcile(self) -> None:
+        """Joins and parts channels so the joined channels match the
+        target. Channels already waiting to be joined or parted are left
+        alone.
+
+        Returns
+        -------
+        None
+        """
+
+        self._schedule("JOIN", self._target - self._joined)
+        self._schedule("PART", self._joined - self._target)
+
+    def _schedule(
+        self, command: str, channels: t.Iterable[str]
+    ) -> list[asyncio.Future[bool]]:
+        # Channels already waiting on the same command share its future,
+        # so callers still wait for it to finish.
+        waiting: list[asyncio.Future[bool]] = []
+        new: list[str] = []
+
+        for channel in channels:
+            if (pending := self._pending.get(channel)) and pending[0] == command:
+                waiting.append(pending[1])
+            else:
+                new.append(channel)
+
+        if not new:
+            return waiting
+
+        futs = (self._join if command == "JOIN" else self._part)(new)
+
+        for channel, fut in zip(new, futs):
+            self._pending[channel] = (command, fut)
+            fut.add_done_callback(functools.partial(self._on_done, channel, command))
+
+        return waiting + futs
+
+    def _on_done(self, channel: str, command: str, fut: asyncio.Future[bool]) -> None:
+        if (pending := self._pending.get(channel)) and pending[0] == command:
+            del self._pending[channel]
+
+        if command == "JOIN" and (fut.cancelled() or not fut.result()):
+            self._failed.add(channel)
+
+    def _wake(self) -> None:
+        if self._event:
+            self._event.set()
+
+    async def _refresh(self) -> None:
+        if self._source is None:
+            return
+
+        try:
+            channels = self._source()
+
+            if inspect.isawaitable(channels):
+                channels = await channels
+
+            self.set_target(t.cast(t.Iterable[str], channels))
+        except Exception:
+            _log.exception("failed to refresh target channels")
+
+    async def _run(self) -> None:
+        self._event = event = asyncio.Event()
+
+        while True:
+            event.clear()
+            await self._refresh()
+            event.clear()
+            self.reconcile()
+
+            if self._failed:
+                _log.info(f"{len(self._failed):,} channel(s) failed to join")
+
+            try:
+                await asyncio.wait_for(event.wait(), self._interval)
+            except asyncio.TimeoutError:
+                ...
@@ -31,6 +31,7 @@ from __future__ import annotations
 __all__ = ("Message",)
 
 import datetime as dt
+import typing as t
 
 import attr
 from hikari.internal import attr_extensions
@@ -70,6 +71,15 @@ class Message:
     content: str = attr.field(eq=False, hash=False, repr=True)
     """The text content of this message."""
 
+    tags: t.Mapping[str, str] = attr.field(
+        factory=dict, eq=False, hash=False, repr=False
+    )
+    """The IRC tags this message was sent with. Depending on the parser
+    in use, values may only be unescaped when they are first accessed.
+
+    .. versionadded:: 0.11a
+    """
+
     async def respond(self, content: str, *, reply: bool = False) -> None:
         """Sends a message to this channel this message was sent to.
 
@@ -0,0 +1,1230 @@
+# Copyright (c) 2022-present, Ethan Henderson
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+from __future__ import annotations
+
+__all__ = (
+    "HelixBucket",
+    "JoinProgress",
+    "JoinScheduler",
+    "MessageScheduler",
+    "Priority",
+    "WindowLimiter",
+    "build_lines",
+)
+
+import asyncio
+import collections
+import enum
+import functools
+import logging
+import typing as t
+
+import attr
+from hikari.internal import time as time_
+
+from kasai import errors, ux
+
+_log = logging.getLogger(__name__)
+_Pending = t.Tuple[bytes, "asyncio.Future[float]", float]
+_RETRYABLE = frozenset(("msg_ratelimit", "msg_slowmode", "msg_duplicate"))
+_VARIATION = " \U000e0000".encode()
+_MAX_LINE_SIZE = 512
+
+
+def _vary(payload: bytes) -> bytes:
+    # Toggling the suffix means alternate retries still differ.
+    body = payload[:-2]
+
+    if body.endswith(_VARIATION):
+        return body[: -len(_VARIATION)] + b"\r\n"
+
+    return body + _VARIATION + b"\r\n"
+
+
+def build_lines(
+    command: str, channels: t.Iterable[str], *, max_size: int = _MAX_LINE_SIZE
+) -> list[bytes]:
+    """Builds as few JOIN or PART lines as possible for the given
+    channels, without any line exceeding IRC's line length limit.
+
+    Example
+    -------
+    ```py
+    >>> kasai.build_lines("JOIN", ("twitch", "twitchdev"))
+    [b'JOIN #twitch,#twitchdev\\r\\n']
+    ```
+
+    Parameters
+    ----------
+    command : str
+        The command to use, such as "JOIN" or "PART".
+    channels : Iterable[str]
+        The login usernames of the channels.
+
+    Other Parameters
+    ----------------
+    max_size : int
+        The maximum size of each line in bytes, including the trailing
+        CRLF. Defaults to `512`.
+
+    Returns
+    -------
+    list[bytes]
+        The lines.
+
+    .. versionadded:: 0.11a
+    """
+
+    lines: list[bytes] = []
+    prefix = f"{command} ".encode()
+    line = b""
+
+    for channel in channels:
+        target = f"#{channel}".encode()
+
+        if line and len(prefix) + len(line) + len(target) + 3 > max_size:
+            lines.append(prefix + line + b"\r\n")
+            line = b""
+
+        line = line + b"," + target if line else target
+
+    if line:
+        lines.append(prefix + line + b"\r\n")
+
+    return lines
+
+
+class WindowLimiter:
+    """A class representing a sliding window rate limit, allowing at
+    most `limit` hits in any `period` seconds.
+
+    Unlike a refilling token bucket, this never allows a burst to spill
+    over into the next window, which is how Twitch counts its limits.
+
+    Parameters
+    ----------
+    limit : int
+        The maximum number of hits allowed within the window.
+    period : float
+        The length of the window in seconds.
+
+    .. versionadded:: 0.11a
+    """
+
+    __slots__ = ("_limit", "_period", "_hits")
+
+    def __init__(self, limit: int, period: float) -> None:
+        self._limit = limit
+        self._period = period
+        self._hits: collections.deque[float] = collections.deque()
+
+    @property
+    def limit(self) -> int:
+        """The maximum number of hits allowed within the window."""
+
+        return self._limit
+
+    @property
+    def period(self) -> float:
+        """The length of the window in seconds."""
+
+        return self._period
+
+    def _expire(self, now: float) -> None:
+        while self._hits and self._hits[0] + self._period <= now:
+            self._hits.popleft()
+
+    def remaining(self, now: float | None = None) -> int:
+        """Returns the number of hits left in the current window.
+
+        Parameters
+        ----------
+        now : float | None
+            The current monotonic time. Defaults to `None`, which uses
+            the real monotonic time.
+
+        Returns
+        -------
+        int
+        """
+
+        self._expire(time_.monotonic() if now is None else now)
+        return max(self._limit - len(self._hits), 0)
+
+    def delay(self, now: float | None = None) -> float:
+        """Returns the number of seconds until another hit is allowed.
+
+        Parameters
+        ----------
+        now : float | None
+            The current monotonic time. Defaults to `None`, which uses
+            the real monotonic time.
+
+        Returns
+        -------
+        float
+        """
+
+        now = time_.monotonic() if now is None else now
+        self._expire(now)
+
+        if len(self._hits) < self._limit:
+            return 0.0
+
+        return self._hits[-self._limit] + self._period - now
+
+    def hit(self, now: float | None = None) -> None:
+        """Records a hit. This does not check whether the hit was
+        allowed.
+
+        Parameters
+        ----------
+        now : float | None
+            The current monotonic time. Defaults to `None`, which uses
+            the real monotonic time.
+
+        Returns
+        -------
+        None
+        """
+
+        self._hits.append(time_.monotonic() if now is None else now)
+
+
+class MessageScheduler:
+    """A class representing a queue of outgoing chat messages, which
+    sends them as fast as Twitch's rate limits allow.
+
+    Messages are queued per channel and sent in order. Messages to
+    channels where the client is elevated (a moderator, VIP, or the
+    broadcaster) count towards the higher limit and are not subject to
+    the per-channel gap. All messages count towards the higher limit,
+    so elevated channels can never push the total over it.
+
+    Sent messages are remembered until Twitch confirms them (see
+    `MessageScheduler.confirm`). If Twitch rejects one instead (see
+    `MessageScheduler.reject`), it is put back at the front of its
+    channel's queue and sent again once the scheduler has backed off.
+
+    Parameters
+    ----------
+    send : Callable[[str, bytes], Awaitable[None]]
+        The function used to send each payload. It receives the channel
+        and the payload. The scheduler doesn't wait for one payload to
+        be sent before handing over the next.
+
+    Other Parameters
+    ----------------
+    limit : int
+        The number of messages that can be sent to channels where the
+        client is not elevated per period. Defaults to `20`.
+    elevated_limit : int
+        The number of messages that can be sent in total per period.
+        Defaults to `100`.
+    period : float
+        The length of the rate limit window in seconds. Defaults to
+        `30.0`.
+    channel_gap : float
+        The minimum number of seconds between messages to the same
+        channel where the client is not elevated. Defaults to `1.0`.
+    is_elevated : Callable[[str], bool] | None
+        A function which returns whether the client is elevated in the
+        given channel. Defaults to `None`, in which case the client is
+        never treated as elevated.
+    backoff : float
+        The number of seconds to pause sending for when Twitch says the
+        rate limit was exceeded. This doubles each time it happens in a
+        row, up to `period`. Defaults to `2.0`.
+
+    .. versionadded:: 0.11a
+    """
+
+    __slots__ = (
+        "_send",
+        "_is_elevated",
+        "_normal",
+        "_elevated",
+        "_channel_gap",
+        "_queues",
+        "_requeued",
+        "_next",
+        "_slow",
+        "_unconfirmed",
+        "_base_backoff",
+        "_backoff",
+        "_paused_until",
+        "_retries",
+        "_event",
+        "_task",
+        "_sending",
+        "_sent",
+        "_total_wait",
+        "_max_wait",
+    )
+
+    def __init__(
+        self,
+        send: t.Callable[[str, bytes], t.Awaitable[None]],
+        *,
+        limit: int = 20,
+        elevated_limit: int = 100,
+        period: float = 30.0,
+        channel_gap: float = 1.0,
+        is_elevated: t.Callable[[str], bool] | None = None,
+        backoff: float = 2.0,
+    ) -> None:
+        self._send = send
+        self._is_elevated = is_elevated or (lambda _: False)
+        self._normal = WindowLimiter(limit, period)
+        self._elevated = WindowLimiter(elevated_limit, period)
+        self._channel_gap = channel_gap
+        self._queues: dict[str, collections.deque[_Pending]] = {}
+        self._requeued: dict[str, int] = {}
+        self._next: dict[str, float] = {}
+        self._slow: dict[str, float] = {}
+        self._unconfirmed: dict[str, collections.deque[tuple[bytes, float]]] = {}
+        self._base_backoff = backoff
+        self._backoff = 0.0
+        self._paused_until = 0.0
+        self._retries = 0
+        self._event = ux.LazyEvent()
+        self._task: asyncio.Task[None] | None = None
+        self._sending: set[asyncio.Future[None]] = set()
+        self._sent = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the scheduler is running."""
+
+        return self._task is not None
+
+    @property
+    def depth(self) -> int:
+        """The number of messages waiting to be sent."""
+
+        return sum(len(q) for q in self._queues.values())
+
+    @property
+    def sent(self) -> int:
+        """The number of messages that have been sent."""
+
+        return self._sent
+
+    @property
+    def retries(self) -> int:
+        """The number of messages that have been sent again after Twitch
+        rejected them."""
+
+        return self._retries
+
+    @property
+    def average_wait(self) -> float:
+        """The average number of seconds messages spent queued before
+        being sent."""
+
+        return self._total_wait / self._sent if self._sent else 0.0
+
+    @property
+    def max_wait(self) -> float:
+        """The longest number of seconds a message spent queued before
+        being sent."""
+
+        return self._max_wait
+
+    def start(self) -> None:
+        """Starts sending queued messages. This must be called from
+        within a running event loop.
+
+        Returns
+        -------
+        None
+        """
+
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stops sending messages. Messages that were still queued fail
+        with `kasai.NotAlive`.
+
+        Returns
+        -------
+        None
+        """
+
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+        # Messages that were already handed over are left to finish.
+        await asyncio.gather(*self._sending, return_exceptions=True)
+
+        for queue in self._queues.values():
+            for _, fut, _ in queue:
+                if not fut.done():
+                    fut.set_exception(
+                        errors.NotAlive("the client closed before sending")
+                    )
+
+        self._queues.clear()
+        self._requeued.clear()
+
+    async def send(self, channel: str, payload: bytes) -> float:
+        """Queues a payload to be sent to a channel, and waits for it to
+        be sent.
+
+        Parameters
+        ----------
+        channel : str
+            The login username of the channel the payload is for.
+        payload : bytes
+            The raw payload to send.
+
+        Returns
+        -------
+        float
+            The number of seconds the payload was queued for.
+        """
+
+        fut: asyncio.Future[float] = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(channel, collections.deque()).append(
+            (payload, fut, time_.monotonic())
+        )
+        self._event.set()
+        return await fut
+
+    def set_slow_mode(self, channel: str, delay: float) -> None:
+        """Sets a channel's slow mode delay. Messages to the channel are
+        then spaced at least this far apart, unless the client is
+        elevated in it.
+
+        Parameters
+        ----------
+        channel : str
+            The login username of the channel.
+        delay : float
+            The slow mode delay in seconds. Set this to `0` when slow
+            mode is turned off.
+
+        Returns
+        -------
+        None
+        """
+
+        if delay > 0:
+            self._slow[channel] = delay
+        else:
+            self._slow.pop(channel, None)
+
+    def confirm(self, channel: str) -> None:
+        """Marks the oldest unconfirmed message sent to a channel as
+        accepted by Twitch.
+
+        Parameters
+        ----------
+        channel : str
+            The login username of the channel.
+
+        Returns
+        -------
+        None
+        """
+
+        if self._pop_unconfirmed(channel) is not None:
+            self._backoff = 0.0
+
+    def reject(
+        self, channel: str, reason: str, *, retry_after: float | None = None
+    ) -> bool:
+        """Marks the oldest unconfirmed message sent to a channel as
+        rejected by Twitch, and queues it to be sent again if the
+        rejection can be retried.
+
+        Parameters
+        ----------
+        channel : str
+            The login username of the channel.
+        reason : str
+            The "msg-id" of the NOTICE Twitch rejected the message
+            with. Only "msg_ratelimit", "msg_slowmode", and
+            "msg_duplicate" are retried.
+
+        Other Parameters
+        ----------------
+        retry_after : float | None
+            The number of seconds Twitch said to wait before sending to
+            the channel again. Defaults to `None`.
+
+        Returns
+        -------
+        bool
+            Whether the message will be sent again.
+        """
+
+        # The message is popped whatever the reason, otherwise later
+        # notices would be matched against the wrong message.
+        if (pending := self._pop_unconfirmed(channel)) is None or (
+            reason not in _RETRYABLE
+        ):
+            return False
+
+        payload, sent_at = pending
+        now = time_.monotonic()
+
+        if reason == "msg_ratelimit":
+            self._backoff = min(
+                max(self._backoff * 2, self._base_backoff), self._normal.period
+            )
+            self._paused_until = now + self._backoff
+            _log.warning(
+                f"message rate limit exceeded, backing off for {self._backoff}s"
+            )
+        elif reason == "msg_slowmode":
+            delay = (
+                self._slow.get(channel, self._channel_gap)
+                if retry_after is None
+                else retry_after
+            )
+            self._next[channel] = max(self._next.get(channel, 0.0), now + delay)
+        else:
+            # Twitch drops messages identical to the previous one sent
+            # within 30 seconds, so make this one differ invisibly.
+            payload = _vary(payload)
+
+        # Retries go ahead of new messages, but behind any retries that
+        # are already queued, so they're resent in the order they were
+        # first sent.
+        fut: asyncio.Future[float] = asyncio.get_running_loop().create_future()
+        index = self._requeued.get(channel, 0)
+        self._queues.setdefault(channel, collections.deque()).insert(
+            index, (payload, fut, sent_at)
+        )
+        self._requeued[channel] = index + 1
+        self._retries += 1
+        self._event.set()
+        return True
+
+    def _pop_unconfirmed(self, channel: str) -> tuple[bytes, float] | None:
+        if not (unconfirmed := self._unconfirmed.get(channel)):
+            return None
+
+        # Twitch answers within a second or so, so anything older than
+        # the rate limit period was never going to be answered.
+        cutoff = time_.monotonic() - self._normal.period
+
+        while unconfirmed and unconfirmed[0][1] < cutoff:
+            unconfirmed.popleft()
+
+        pending = unconfirmed.popleft() if unconfirmed else None
+
+        if not unconfirmed:
+            del self._unconfirmed[channel]
+
+        return pending
+
+    def _ready_at(self, channel: str, now: float) -> float:
+        if self._is_elevated(channel):
+            return max(now + self._elevated.delay(now), self._paused_until)
+
+        return max(
+            self._paused_until,
+            now + self._normal.delay(now),
+            now + self._elevated.delay(now),
+            self._next.get(channel, 0.0),
+        )
+
+    def _pick(self, now: float) -> tuple[str, float]:
+        # Ties go to the channel that has been waiting longest, so busy
+        # channels can't starve quiet ones.
+        return min(
+            ((c, self._ready_at(c, now)) for c in self._queues),
+            key=lambda x: (x[1], self._queues[x[0]][0][2]),
+        )
+
+    async def _run(self) -> None:
+        event = self._event
+
+        while True:
+            if not self._queues:
+                event.clear()
+                await event.wait()
+                continue
+
+            now = time_.monotonic()
+            channel, ready_at = self._pick(now)
+
+            if ready_at > now:
+                # New messages may be sendable sooner, so wake up for
+                # them too.
+                event.clear()
+                try:
+                    await asyncio.wait_for(event.wait(), ready_at - now)
+                except asyncio.TimeoutError:
+                    ...
+                continue
+
+            queue = self._queues[channel]
+            payload, fut, queued_at = queue.popleft()
+
+            if (requeued := self._requeued.pop(channel, 0)) > 1:
+                self._requeued[channel] = requeued - 1
+
+            if not queue:
+                del self._queues[channel]
+
+            if fut.done():
+                # The caller gave up waiting.
+                continue
+
+            if not self._is_elevated(channel):
+                self._normal.hit(now)
+                self._next[channel] = now + max(
+                    self._channel_gap, self._slow.get(channel, 0.0)
+                )
+
+            self._elevated.hit(now)
+            self._unconfirmed.setdefault(channel, collections.deque()).append(
+                (payload, now)
+            )
+
+            # Payloads aren't waited on here, so everything that's ready
+            # can be handed over (and written) together.
+            sending = asyncio.ensure_future(self._send(channel, payload))
+            sending.add_done_callback(
+                functools.partial(self._on_sent, fut, now - queued_at)
+            )
+            self._sending.add(sending)
+
+    def _on_sent(
+        self, fut: asyncio.Future[float], wait: float, sending: asyncio.Future[None]
+    ) -> None:
+        self._sending.discard(sending)
+
+        if fut.done():
+            return
+
+        if sending.cancelled():
+            fut.set_exception(errors.NotAlive("the client closed before sending"))
+            return
+
+        if exc := sending.exception():
+            fut.set_exception(exc)
+            return
+
+        self._sent += 1
+        self._total_wait += wait
+        self._max_wait = max(self._max_wait, wait)
+        fut.set_result(wait)
+
+
+@attr.define(kw_only=True, weakref_slot=False)
+class JoinProgress:
+    """A class representing the progress of a join scheduler.
+
+    .. versionadded:: 0.11a
+    """
+
+    queued: int = attr.field()
+    """The number of channels waiting to be joined or parted."""
+
+    pending: int = attr.field()
+    """The number of channels that have been joined or parted, but that
+    Twitch hasn't confirmed yet."""
+
+    confirmed: int = attr.field()
+    """The number of joins and parts Twitch has confirmed."""
+
+    failed: int = attr.field()
+    """The number of joins and parts Twitch never confirmed."""
+
+
+class JoinScheduler:
+    """A class representing a queue of channels to join and part, which
+    sends them as fast as Twitch's join rate limit allows.
+
+    Channels are grouped into as few lines as possible, and are joined
+    and parted in the order they were queued. Only joins count towards
+    the rate limit.
+
+    Parameters
+    ----------
+    send : Callable[[bytes], Awaitable[None]]
+        The coroutine function used to send each line.
+
+    Other Parameters
+    ----------------
+    limit : int
+        The number of channels that can be joined per period. Defaults
+        to `20`.
+    period : float
+        The length of the rate limit window in seconds. Defaults to
+        `10.0`.
+    timeout : float
+        The number of seconds to wait for Twitch to confirm a join or
+        part before treating it as failed. Defaults to `30.0`.
+    limiter : WindowLimiter | None
+        The rate limit to use. Schedulers for connections using the
+        same account should share one, in which case `limit` and
+        `period` are ignored. Defaults to `None`.
+
+    .. versionadded:: 0.11a
+    """
+
+    __slots__ = (
+        "_send",
+        "_limiter",
+        "_timeout",
+        "_queue",
+        "_pending",
+        "_event",
+        "_task",
+        "_confirmed",
+        "_failed",
+    )
+
+    def __init__(
+        self,
+        send: t.Callable[[bytes], t.Awaitable[None]],
+        *,
+        limit: int = 20,
+        period: float = 10.0,
+        timeout: float = 30.0,
+        limiter: WindowLimiter | None = None,
+    ) -> None:
+        self._send = send
+        self._limiter = limiter or WindowLimiter(limit, period)
+        self._timeout = timeout
+        self._queue: collections.deque[tuple[str, str]] = collections.deque()
+        self._pending: dict[
+            tuple[str, str], tuple[asyncio.Future[bool], asyncio.TimerHandle | None]
+        ] = {}
+        self._event = ux.LazyEvent()
+        self._task: asyncio.Task[None] | None = None
+        self._confirmed = 0
+        self._failed = 0
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the scheduler is running."""
+
+        return self._task is not None
+
+    @property
+    def progress(self) -> JoinProgress:
+        """The scheduler's current progress."""
+
+        # Keys resolved while queued stay in the queue until they're
+        # skipped, so they aren't counted.
+        queued = sum(k in self._pending for k in self._queue)
+        return JoinProgress(
+            queued=queued,
+            pending=len(self._pending) - queued,
+            confirmed=self._confirmed,
+            failed=self._failed,
+        )
+
+    def start(self) -> None:
+        """Starts joining and parting queued channels. This must be
+        called from within a running event loop.
+
+        Returns
+        -------
+        None
+        """
+
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stops joining and parting channels. Anything still queued or
+        waiting for confirmation is treated as failed.
+
+        Returns
+        -------
+        None
+        """
+
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+        for key in tuple(self._pending):
+            self._resolve(key, False)
+
+        self._queue.clear()
+
+    async def reset(self) -> None:
+        """Stops joining and parting channels, ready for a new
+        connection. Joins that were sent but not confirmed are queued
+        again, and parts are treated as confirmed, as a new connection
+        isn't in any channels. Call `JoinScheduler.start` to resume.
+
+        Returns
+        -------
+        None
+        """
+
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+        sent = []
+
+        for key, (fut, handle) in tuple(self._pending.items()):
+            if key[0] == "PART":
+                self._resolve(key, True)
+            elif handle:
+                handle.cancel()
+                self._pending[key] = (fut, None)
+                sent.append(key)
+
+        self._queue = collections.deque(
+            sent + [k for k in self._queue if k in self._pending]
+        )
+
+    async def wait(self) -> None:
+        """Waits until every queued join and part has been confirmed, or
+        has failed.
+
+        Returns
+        -------
+        None
+        """
+
+        while self._pending:
+            await asyncio.wait([fut for fut, _ in self._pending.values()])
+
+    def join(self, channels: t.Iterable[str]) -> list[asyncio.Future[bool]]:
+        """Queues channels to be joined.
+
+        Parameters
+        ----------
+        channels : Iterable[str]
+            The login usernames of the channels to join.
+
+        Returns
+        -------
+        list[asyncio.Future[bool]]
+            A future for each channel, which completes with whether
+            Twitch confirmed the join.
+        """
+
+        return [self._add("JOIN", c) for c in channels]
+
+    def part(self, channels: t.Iterable[str]) -> list[asyncio.Future[bool]]:
+        """Queues channels to be parted.
+
+        Parameters
+        ----------
+        channels : Iterable[str]
+            The login usernames of the channels to part.
+
+        Returns
+        -------
+        list[asyncio.Future[bool]]
+            A future for each channel, which completes with whether
+            Twitch confirmed the part.
+        """
+
+        return [self._add("PART", c) for c in channels]
+
+    def confirm(self, command: str, channel: str) -> None:
+        """Marks a join or part as confirmed by Twitch.
+
+        Parameters
+        ----------
+        command : str
+            Either "JOIN" or "PART".
+        channel : str
+            The login username of the channel.
+
+        Returns
+        -------
+        None
+        """
+
+        if self._resolve((command, channel), True):
+            self._confirmed += 1
+
+    def _add(self, command: str, channel: str) -> asyncio.Future[bool]:
+        key = (command, channel)
+
+        if key in self._pending:
+            return self._pending[key][0]
+
+        fut: asyncio.Future[bool] = asyncio.get_running_loop().create_future()
+        self._pending[key] = (fut, None)
+        self._queue.append(key)
+        self._event.set()
+        return fut
+
+    def _resolve(self, key: tuple[str, str], result: bool) -> bool:
+        if (pending := self._pending.pop(key, None)) is None:
+            return False
+
+        fut, handle = pending
+
+        if handle:
+            handle.cancel()
+
+        if not fut.done():
+            fut.set_result(result)
+
+        return True
+
+    def _expire(self, key: tuple[str, str]) -> None:
+        if self._resolve(key, False):
+            self._failed += 1
+            _log.warning(f"Twitch did not confirm {key[0]} #{key[1]}")
+
+    def _take(self, command: str, budget: float) -> list[tuple[str, str]]:
+        keys: list[tuple[str, str]] = []
+
+        while self._queue and self._queue[0][0] == command and len(keys) < budget:
+            # Anything resolved while it was queued doesn't need sending.
+            if (key := self._queue.popleft()) in self._pending:
+                keys.append(key)
+
+        return keys
+
+    async def _run(self) -> None:
+        event = self._event
+        loop = asyncio.get_running_loop()
+
+        while True:
+            if not self._queue:
+                event.clear()
+                await event.wait()
+                continue
+
+            command = self._queue[0][0]
+            budget: float = float("inf")
+
+            if command == "JOIN":
+                if (delay := self._limiter.delay()) > 0:
+                    await asyncio.sleep(delay)
+                    continue
+
+                budget = self._limiter.remaining()
+
+            keys = self._take(command, budget)
+
+            for key in keys:
+                if command == "JOIN":
+                    self._limiter.hit()
+
+                fut, _ = self._pending[key]
+                self._pending[key] = (
+                    fut,
+                    loop.call_later(self._timeout, self._expire, key),
+                )
+
+            for line in build_lines(command, (c for _, c in keys)):
+                try:
+                    await self._send(line)
+                except Exception:
+                    _log.exception(f"failed to send {command} line")
+
+
+class Priority(enum.Enum):
+    """An enum representing how urgently a Twitch Helix API request
+    should be sent.
+
+    .. versionadded:: 0.11a
+    """
+
+    INTERACTIVE = "interactive"
+    """The request is latency-sensitive, such as a lookup needed to
+    reply to a command. These are sent before background requests."""
+
+    BACKGROUND = "background"
+    """The request is part of bulk or periodic work, such as polling
+    many channels. These are sent once no interactive requests are
+    waiting, except for a reserved share of the budget."""
+
+
+class HelixBucket:
+    """A class representing the Twitch Helix API's rate limit bucket,
+    tracked from the `Ratelimit-*` headers of each response.
+
+    Requests acquire a point from the bucket before they're sent. Once
+    the bucket is empty, requests queue until the reset time Twitch
+    gave, or until a response shows there are points left again.
+    Queued interactive requests are let through before background ones,
+    though background requests are still given `background_share` of
+    the points while both are waiting.
+
+    Other Parameters
+    ----------------
+    limit : int
+        The size of the bucket before any response has been seen.
+        Defaults to `800`, which is Twitch's default for app tokens.
+    background_share : float
+        The fraction of points reserved for background requests while
+        interactive requests are also waiting. Defaults to `0.1`.
+
+    .. versionadded:: 0.11a
+    """
+
+    __slots__ = (
+        "_limit",
+        "_remaining",
+        "_reset",
+        "_inflight",
+        "_waiters",
+        "_timer",
+        "_retries",
+        "_background_share",
+        "_contended",
+        "_background_served",
+    )
+
+    def __init__(self, *, limit: int = 800, background_share: float = 0.1) -> None:
+        self._limit = limit
+        self._remaining = limit
+        self._reset = 0.0
+        self._inflight = 0
+        self._waiters: dict[Priority, collections.deque[asyncio.Future[None]]] = {
+            p: collections.deque() for p in Priority
+        }
+        self._timer: asyncio.TimerHandle | None = None
+        self._retries = 0
+        self._background_share = background_share
+        self._contended = 0
+        self._background_served = 0
+
+    @property
+    def limit(self) -> int:
+        """The size of the bucket."""
+
+        return self._limit
+
+    @property
+    def remaining(self) -> int:
+        """The number of points left in the bucket, less any taken by
+        requests still in flight."""
+
+        self._refill(time_.monotonic())
+        return self._remaining
+
+    @property
+    def reset_after(self) -> float:
+        """The number of seconds until the bucket is full again."""
+
+        return max(self._reset - time_.monotonic(), 0.0)
+
+    @property
+    def depth(self) -> int:
+        """The number of requests waiting for a point."""
+
+        return sum(self.queued(p) for p in Priority)
+
+    def queued(self, priority: Priority) -> int:
+        """Returns the number of requests of a priority waiting for a
+        point.
+
+        Parameters
+        ----------
+        priority : kasai.Priority
+            The priority to count.
+
+        Returns
+        -------
+        int
+        """
+
+        return sum(not fut.done() for fut in self._waiters[priority])
+
+    @property
+    def retries(self) -> int:
+        """The number of requests that were retried after being rate
+        limited."""
+
+        return self._retries
+
+    def _refill(self, now: float) -> None:
+        if self._remaining <= 0 and now >= self._reset:
+            self._remaining = max(self._limit - self._inflight, 0)
+
+    def _take(self) -> bool:
+        self._refill(time_.monotonic())
+
+        if self._remaining <= 0:
+            return False
+
+        self._remaining -= 1
+        self._inflight += 1
+        return True
+
+    def _next(self) -> collections.deque[asyncio.Future[None]] | None:
+        for queue in self._waiters.values():
+            # Drop callers that were cancelled.
+            while queue and queue[0].done():
+                queue.popleft()
+
+        interactive = self._waiters[Priority.INTERACTIVE]
+        background = self._waiters[Priority.BACKGROUND]
+
+        if not (interactive and background):
+            return interactive or background or None
+
+        self._contended += 1
+
+        # Interactive requests go first, with background ones only taking
+        # their share once it's been earned.
+        if self._background_served + 1 <= self._background_share * self._contended:
+            self._background_served += 1
+            return background
+
+        return interactive
+
+    def _wake(self) -> None:
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+
+        while self.remaining > 0 and (queue := self._next()):
+            self._take()
+            queue.popleft().set_result(None)
+
+        if any(self._waiters.values()) and not self._inflight:
+            # Nothing in flight will update the bucket, so the waiters
+            # need waking once it resets.
+            self._timer = asyncio.get_running_loop().call_later(
+                self.reset_after, self._wake
+            )
+
+    async def acquire(self, priority: Priority = Priority.INTERACTIVE) -> None:
+        """Waits until there is a point left in the bucket, and takes
+        it. Every call must be followed by a call to either `update` or
+        `release` once the request is done.
+
+        Parameters
+        ----------
+        priority : kasai.Priority
+            The priority of the request. Defaults to
+            `kasai.Priority.INTERACTIVE`.
+
+        Returns
+        -------
+        None
+        """
+
+        if not any(self._waiters.values()) and self._take():
+            return
+
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters[priority].append(fut)
+        self._wake()
+
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # The point was taken before the caller was cancelled,
+                # but the request was never sent, so it's given back.
+                self._remaining += 1
+                self.release()
+            elif fut in self._waiters[priority]:
+                self._waiters[priority].remove(fut)
+
+            raise
+
+    def update(self, headers: t.Mapping[str, str], *, retrying: bool = False) -> None:
+        """Updates the bucket from a response's headers, and gives back
+        the point taken by `acquire`.
+
+        Parameters
+        ----------
+        headers : Mapping[str, str]
+            The response's headers.
+
+        Other Parameters
+        ----------------
+        retrying : bool
+            Whether the request was rate limited and is about to be
+            retried. Defaults to `False`.
+
+        Returns
+        -------
+        None
+        """
+
+        self._inflight = max(self._inflight - 1, 0)
+        self._retries += retrying
+
+        try:
+            limit = int(headers["Ratelimit-Limit"])
+            remaining = int(headers["Ratelimit-Remaining"])
+            reset = float(headers["Ratelimit-Reset"])
+        except (KeyError, ValueError):
+            self._wake()
+            return
+
+        # The reset time is a Unix timestamp, so it's moved onto the
+        # monotonic clock here.
+        self._limit = limit
+        self._reset = time_.monotonic() + max(
+            reset - time_.utc_datetime().timestamp(), 0.0
+        )
+        self._remaining = max(remaining - self._inflight, 0)
+        self._wake()
+
+    def release(self) -> None:
+        """Gives back the point taken by `acquire` for a request that
+        never got a response.
+
+        Returns
+        -------
+        None
+        """
+
+        self._inflight = max(self._inflight - 1, 0)
+        self._wake()
+
+    def stop(self) -> None:
+        """Fails every request still waiting for a point.
+
+        Returns
+        -------
+        None
+        """
+
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+
+        for queue in self._waiters.values():
+            while queue:
+                if not (fut := queue.popleft()).done():
+                    fut.set_exception(errors.NotAlive("the API session was closed"))
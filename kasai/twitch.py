@@ -32,8 +32,12 @@ __all__ = ("TwitchClient",)
 
 import asyncio
 import datetime as dt
+import functools
 import logging
+import random
+import re
 import typing as t
+import zlib
 from hashlib import sha256
 from time import time
 
@@ -44,9 +48,31 @@ from hikari.internal.data_binding import JSONObject
 from hikari.internal.ux import TRACE
 
 import kasai
+from kasai import (
+    auth,
+    batching,
+    cache,
+    config,
+    connection,
+    irc,
+    membership,
+    ratelimits,
+    ux,
+    workers,
+)
 from kasai.errors import NotFound
 
 _log = logging.getLogger(__name__)
+_Line = t.Union[irc.Line, irctokens.line.Line]
+_RETRY_PATTERN = re.compile(r"(\d+) seconds?")
+_ANONYMOUS_IGNORED = frozenset(("USERSTATE", "GLOBALUSERSTATE", "NOTICE"))
+_ELEVATED_BADGES = frozenset(("broadcaster", "moderator", "vip"))
+_RequestKey = t.Tuple[
+    str,
+    t.Tuple[t.Tuple[str, t.Tuple[str, ...]], ...],
+    ratelimits.Priority,
+    t.Optional[auth.Credential],
+]
 
 
 class TwitchClient:
@@ -63,42 +89,152 @@ class TwitchClient:
         Your Twitch application's client ID.
     client_secret : str
         Your Twitch application's client secret.
+
+    Other Parameters
+    ----------------
+    settings : kasai.TwitchSettings | None
+        The settings to use for this client. If this is `None`, the
+        default settings are used. Defaults to `None`.
+
+        .. versionadded:: 0.11a
+    credentials : Iterable[tuple[str, str]]
+        Additional client ID and client secret pairs. Helix requests
+        are spread across all applications' tokens, each of which has
+        its own rate limit. Pairs whose client ID was already given
+        are ignored. Defaults to an empty tuple.
+
+        .. versionadded:: 0.11a
+    session : aiohttp.ClientSession | None
+        The HTTP session to make API requests with. If this is `None`,
+        one is created when the client starts, using the connection
+        settings in `settings`. A session passed here is not closed when
+        the client closes. Defaults to `None`.
+
+        .. versionadded:: 0.11a
     """
 
     __slots__ = (
         "_app",
+        "_settings",
         "_client_id",
         "_client_secret",
-        "_api_token",
+        "_credentials",
         "_session",
+        "_external_session",
+        "_inflight",
+        "_users",
+        "_user_batcher",
         "_me",
         "_irc_token",
         "_nickname",
-        "_channels",
-        "_reader",
-        "_writer",
-        "_task",
-        "_d",
+        "_membership",
+        "_rooms",
+        "_room_ids",
+        "_room_states",
+        "_badges",
+        "_global_badges",
+        "_shards",
+        "_sender",
+        "_shard_of",
+        "_join_limiter",
+        "_work",
+        "_messages",
     )
 
     def __init__(
-        self, app: kasai.GatewayBot, irc_token: str, client_id: str, client_secret: str
+        self,
+        app: kasai.GatewayBot,
+        irc_token: str,
+        client_id: str,
+        client_secret: str,
+        *,
+        settings: kasai.TwitchSettings | None = None,
+        credentials: t.Iterable[tuple[str, str]] = (),
+        session: aiohttp.ClientSession | None = None,
     ) -> None:
         self._app = app
+        self._settings = settings or config.TwitchSettings()
 
         self._client_id = client_id
         self._client_secret = client_secret
-        self._api_token: str | None = None
+        # The first secret given for each client ID is the one used, so
+        # extra credentials can never replace the primary one.
+        secrets: dict[str, str] = {}
+
+        for id, secret in ((client_id, client_secret), *credentials):
+            secrets.setdefault(id, secret)
+
+        self._credentials = [
+            auth.Credential(
+                id,
+                secret,
+                self._fetch_app_token,
+                margin=self._settings.token_refresh_margin,
+                background_share=self._settings.api_background_share,
+            )
+            for id, secret in secrets.items()
+        ]
         self._session: aiohttp.ClientSession | None = None
+        self._external_session = session
+        self._inflight: dict[_RequestKey, asyncio.Future[list[JSONObject]]] = {}
+        self._users = cache.UserCache(
+            self._settings.user_cache_size, self._settings.user_cache_ttl
+        )
+        self._user_batcher: batching.Batcher[JSONObject] | None = None
         self._me: kasai.User | None = None
 
+        if self._settings.user_batch_window > 0:
+            self._user_batcher = batching.Batcher(
+                self._fetch_user_payloads, self._settings.user_batch_window
+            )
+
         self._irc_token = irc_token
         self._nickname = sha256(f"{time()}".encode("utf-8")).hexdigest()[:7]
-        self._channels: list[str] = []
-        self._reader: asyncio.StreamReader | None = None
-        self._writer: asyncio.StreamWriter | None = None
-        self._task: asyncio.Task[None] | None = None
-        self._d = irctokens.stateful.StatefulDecoder()
+        self._rooms: cache.TTLCache[str, kasai.Channel] = cache.TTLCache(
+            None, self._settings.channel_refresh_interval
+        )
+        self._room_ids: dict[str, str] = {}
+        self._room_states: dict[str, dict[str, str]] = {}
+        self._badges: dict[str, dict[str, str]] = {}
+        self._global_badges: dict[str, str] = {}
+        self._shards: list[connection.Shard] = []
+        self._sender: connection.Shard | None = None
+        self._shard_of: dict[str, connection.Shard] = {}
+        self._join_limiter = ratelimits.WindowLimiter(
+            self._settings.join_limit, self._settings.join_period
+        )
+        self._work: workers.WorkQueue[_Line] = workers.WorkQueue(
+            self._handle_line,
+            workers=self._settings.worker_count,
+            max_size=self._settings.queue_size,
+            policy=self._settings.backpressure_policy,
+        )
+        self._messages = ratelimits.MessageScheduler(
+            self._send_payload,
+            limit=self._settings.message_limit,
+            elevated_limit=self._settings.elevated_message_limit,
+            period=self._settings.message_period,
+            channel_gap=self._settings.message_channel_gap,
+            is_elevated=self._is_elevated,
+            backoff=self._settings.message_backoff,
+        )
+        self._membership = membership.ChannelReconciler(
+            self._join,
+            self._part,
+            interval=self._settings.reconcile_interval,
+            source=self._settings.channel_source,
+        )
+
+        if self._settings.anonymous_reads:
+            # Channels are read anonymously, so sending needs its own
+            # connection.
+            self._sender = self._new_shard(0, self._irc_token, self._nickname)
+
+        # Automatic sharding adds shards as they're needed.
+        for _ in range(
+            1 if self._settings.channels_per_shard else self._settings.shard_count
+        ):
+            self._add_shard()
 
     @property
     def is_alive(self) -> bool:
@@ -113,7 +249,7 @@ class TwitchClient:
         """Whether the client is authorised to connect to the Twitch
         Helix API."""
 
-        return self._api_token is not None
+        return all(c.token.token is not None for c in self._credentials)
 
     @property
     def app(self) -> kasai.GatewayBot:
@@ -121,6 +257,130 @@ class TwitchClient:
 
         return self._app
 
+    @property
+    def settings(self) -> kasai.TwitchSettings:
+        """The settings this client is using.
+
+        .. versionadded:: 0.11a
+        """
+
+        return self._settings
+
+    @property
+    def user_cache(self) -> cache.UserCache:
+        """The cache of users fetched from the Twitch Helix API. This
+        can be used to inspect hit and miss counts, or to invalidate
+        entries.
+
+        .. versionadded:: 0.11a
+        """
+
+        return self._users
+
+    @property
+    def queue_depth(self) -> int:
+        """The number of received IRC lines waiting to be processed.
+
+        .. versionadded:: 0.11a
+        """
+
+        return self._work.depth
+
+    @property
+    def dropped_lines(self) -> int:
+        """The number of received IRC lines that were discarded because
+        the work queue was full.
+
+        .. versionadded:: 0.11a
+        """
+
+        return self._work.dropped
+
+    @property
+    def credentials(self) -> t.Sequence[auth.Credential]:
+        """The applications Helix requests are spread across. The first
+        is the one the client was created with. Use
+        `kasai.Credential.utilization` to check how much of each one's
+        rate limit is being used.
+
+        .. versionadded:: 0.11a
+        """
+
+        return tuple(self._credentials)
+
+    @property
+    def app_token(self) -> auth.AppToken:
+        """The app access token used to authorise Twitch Helix API
+        requests. This can be used to check when it expires. If there
+        are several credentials, this is the first one's token.
+
+        .. versionadded:: 0.11a
+        """
+
+        return self._credentials[0].token
+
+    @property
+    def api_ratelimit(self) -> ratelimits.HelixBucket:
+        """The Helix API rate limit bucket requests wait on. This can be
+        used to check the remaining budget, and how many requests are
+        queued. If there are several credentials, this is the first
+        one's bucket.
+
+        .. versionadded:: 0.11a
+        """
+
+        return self._credentials[0].bucket
+
+    @property
+    def message_scheduler(self) -> ratelimits.MessageScheduler:
+        """The scheduler outgoing chat messages are sent through. This
+        can be used to inspect how many messages are queued, and how
+        long they wait before being sent.
+
+        .. versionadded:: 0.11a
+        """
+
+        return self._messages
+
+    @property
+    def channels(self) -> membership.ChannelReconciler:
+        """The channels this client is in, or should be in. The joined
+        channels can be checked using `in`.
+
+        .. versionadded:: 0.11a
+        """
+
+        return self._membership
+
+    @property
+    def join_progress(self) -> ratelimits.JoinProgress:
+        """The progress of queued joins and parts across all shards.
+        This is useful when joining lots of channels at once, which can
+        take a while.
+
+        .. versionadded:: 0.11a
+        """
+
+        progress = [s.joins.progress for s in self.shards]
+        return ratelimits.JoinProgress(
+            queued=sum(p.queued for p in progress),
+            pending=sum(p.pending for p in progress),
+            confirmed=sum(p.confirmed for p in progress),
+            failed=sum(p.failed for p in progress),
+        )
+
+    @property
+    def shards(self) -> t.Sequence[connection.Shard]:
+        """The IRC connections this client uses. Use
+        `kasai.Shard.health` to check on each one. If
+        `kasai.TwitchSettings.anonymous_reads` is enabled, the first
+        shard is the one messages are sent through.
+
+        .. versionadded:: 0.11a
+        """
+
+        return ((self._sender,) if self._sender else ()) + tuple(self._shards)
+
     @staticmethod
     def _transform_tags(tags: str) -> dict[str, str]:
         return {(kv := tag.split("="))[0]: kv[1] for tag in tags[1:].split(";")}
@@ -133,6 +393,66 @@ class TwitchClient:
         auth: bool = False,
         options: dict[str, list[str]],
         data: dict[str, t.Any] | None = None,
+        priority: ratelimits.Priority = ratelimits.Priority.INTERACTIVE,
+        credential: auth.Credential | None = None,
+    ) -> list[JSONObject]:
+        if method != "GET" or auth or not self._settings.coalesce_requests:
+            return await self._send_request(
+                method,
+                route,
+                auth=auth,
+                options=options,
+                data=data,
+                priority=priority,
+                credential=credential,
+            )
+
+        # Identical GETs that are already in flight share a single
+        # request, so bursts of lookups for the same resource only hit
+        # the API once. Callers only share requests of the same
+        # priority, so interactive lookups never wait behind background
+        # ones.
+        key = (
+            route,
+            tuple(sorted((k, tuple(v)) for k, v in options.items())),
+            priority,
+            credential,
+        )
+
+        if (fut := self._inflight.get(key)) is None:
+            fut = asyncio.ensure_future(
+                self._send_request(
+                    method,
+                    route,
+                    options=options,
+                    data=data,
+                    priority=priority,
+                    credential=credential,
+                )
+            )
+            self._inflight[key] = fut
+
+            def cleanup(fut: asyncio.Future[list[JSONObject]]) -> None:
+                del self._inflight[key]
+                # Mark the exception as retrieved in case every caller
+                # was cancelled before the request finished.
+                if not fut.cancelled():
+                    fut.exception()
+
+            fut.add_done_callback(cleanup)
+
+        return await asyncio.shield(fut)
+
+    async def _send_request(
+        self,
+        method: str,
+        route: str,
+        *,
+        auth: bool = False,
+        options: dict[str, list[str]],
+        data: dict[str, t.Any] | None = None,
+        priority: ratelimits.Priority = ratelimits.Priority.INTERACTIVE,
+        credential: auth.Credential | None = None,
     ) -> list[JSONObject]:
         def stringify(headers: dict[str, str], body: dict[str, str]) -> str:
             string = "\n".join(
@@ -156,11 +476,12 @@ class TwitchClient:
             raise kasai.NotAlive("there is no active API session")
 
         if auth:
+            cred = credential or self._credentials[0]
             url = kasai.TWITCH_TOKEN_URI
             headers = {"Content-Type": "application/json"}
             data = {
-                "client_id": self._client_id,
-                "client_secret": self._client_secret,
+                "client_id": cred.client_id,
+                "client_secret": cred.client_secret,
                 "grant_type": "client_credentials",
             }
         else:
@@ -168,9 +489,10 @@ class TwitchClient:
                 "&".join(f"{key}={v}" for v in value) for key, value in options.items()
             )
             url = kasai.TWITCH_HELIX_URI + route + query
+            cred = credential or self._pick_credential()
             headers = {
-                "Authorization": f"Bearer {self._api_token}",
-                "Client-Id": self._client_id,
+                "Authorization": f"Bearer {cred.token.token}",
+                "Client-Id": cred.client_id,
                 "Content-Type": "application/json",
             }
             data = {"data": data} if data else {}
@@ -189,13 +511,54 @@ class TwitchClient:
             )
             start = time_.monotonic()
 
-        async with self._session.request(
-            method, url, headers=headers, json=data
-        ) as resp:
-            res = await resp.json()
+        attempt = 0
+        replayed = False
+
+        while True:
+            # Token requests don't go to Helix, so don't count towards
+            # its rate limit.
+            if not auth:
+                await cred.bucket.acquire(priority)
+                token = cred.token.token
+                headers["Authorization"] = f"Bearer {token}"
+                headers["Client-Id"] = cred.client_id
+
+            try:
+                async with self._session.request(
+                    method, url, headers=headers, json=data
+                ) as resp:
+                    res = await resp.json()
+            except BaseException:
+                if not auth:
+                    cred.bucket.release()
+                raise
+
+            if resp.status == 401 and not auth and not replayed:
+                # The token has expired or been revoked. Requests
+                # rejected together share one refresh.
+                cred.bucket.update(resp.headers)
+                replayed = True
+                _log.warning(f"app access token rejected on {route}, refreshing")
+                await cred.token.refresh(token)
+                continue
+
+            retrying = resp.status == 429 and attempt < self._settings.api_retries
+
+            if not auth:
+                cred.bucket.update(resp.headers, retrying=retrying)
+
+            if not retrying:
+                break
+
+            attempt += 1
+            _log.warning(f"rate limited on {route}, retrying (attempt {attempt})")
+
+            if not auth:
+                # Another application may have budget left.
+                cred = credential or self._pick_credential()
 
-            if not resp.ok:
-                raise kasai.RequestFailed(res["status"], res["message"])
+        if not resp.ok:
+            raise kasai.RequestFailed(res["status"], res["message"])
 
         if trace_enabled:
             time_taken = (time_.monotonic() - start) * 1_000
@@ -213,128 +576,276 @@ class TwitchClient:
             return [res]
         return t.cast(list[JSONObject], res["data"])
 
-    async def _listen(self) -> None:
-        assert self._reader
-        assert self._writer
-        _log.debug("starting IRC listener...")
+    async def _on_line(self, line: _Line) -> None:
+        if line.command == "PING":
+            self.app.dispatch(kasai.PingEvent(app=self.app))
+            return
 
-        while True:
-            payload = await self._reader.read(1_024)
-            _log.log(
-                TRACE, f"received IRC payload with size {len(payload)}\n    {payload!r}"
+        # Lines are keyed by channel so each channel's lines are handled
+        # in order without holding up other channels.
+        channel = line.params[0] if line.params else ""
+        await self._work.put(line, key=channel if channel.startswith("#") else None)
+
+    async def _on_anonymous_line(self, line: _Line) -> None:
+        # These describe the anonymous user rather than the bot, and
+        # would otherwise overwrite the bot's own state.
+        if line.command in _ANONYMOUS_IGNORED or line.command.isdigit():
+            return
+
+        await self._on_line(line)
+
+    def _new_shard(self, id: int, token: str | None, nickname: str) -> connection.Shard:
+        return connection.Shard(
+            id,
+            token,
+            nickname,
+            self._on_line if token else self._on_anonymous_line,
+            settings=self._settings,
+            join_limiter=self._join_limiter,
+            on_connect=self._on_shard_connect,
+            on_disconnect=self._on_shard_disconnect,
+        )
+
+    def _add_shard(self) -> connection.Shard:
+        id = len(self.shards)
+
+        if self._settings.anonymous_reads:
+            nickname = f"justinfan{random.randint(1, 99_999)}"  # nosec: B311
+            shard = self._new_shard(id, None, nickname)
+        else:
+            shard = self._new_shard(id, self._irc_token, self._nickname)
+
+        if self._is_connected:
+            # The client is already running, so this needs connecting
+            # straight away.
+            task = asyncio.get_running_loop().create_task(shard.connect())
+            task.add_done_callback(ux.log_failure(_log, "background task failed"))
+
+        self._shards.append(shard)
+        return shard
+
+    def _on_shard_connect(
+        self, shard: connection.Shard, downtime: float | None
+    ) -> None:
+        self.app.dispatch(
+            kasai.ShardConnectEvent(shard_id=shard.id, downtime=downtime, app=self.app)
+        )
+
+        if downtime is not None:
+            # Channels this shard was in are joined again.
+            _log.info(f"shard {shard.id} reconnected after {downtime:,.2f}s")
+            self._membership.reconcile()
+
+    def _on_shard_disconnect(self, shard: connection.Shard, requested: bool) -> None:
+        for channel in shard.channels:
+            self._membership.mark_parted(channel)
+
+        self.app.dispatch(
+            kasai.ShardDisconnectEvent(
+                shard_id=shard.id, requested=requested, app=self.app
             )
+        )
 
-            if not payload:
-                _log.warning("IRC socket closed unexpectedly, attempting to restart...")
-                await self._start_irc()
-                break
+    def _assign(self, channel: str) -> connection.Shard:
+        if shard := self._shard_of.get(channel):
+            return shard
+
+        if per_shard := self._settings.channels_per_shard:
+            shard = (
+                next((s for s in self._shards if len(s.channels) < per_shard), None)
+                or self._add_shard()
+            )
+        else:
+            # CRC32 is stable between runs, unlike hash().
+            shard = self._shards[zlib.crc32(channel.encode()) % len(self._shards)]
+
+        shard.channels.add(channel)
+        self._shard_of[channel] = shard
+        return shard
 
-            lines = self._d.push(payload)
-            assert lines
-
-            for line in lines:
-                if line.command == "PING":
-                    self._writer.write(b"PONG :tmi.twitch.tv\r\n")
-                    await self._writer.drain()
-                    _log.log(TRACE, "received PING, returned PONG")
-                    self.app.dispatch(kasai.PingEvent(app=self.app))
-                    continue
-
-                if line.command == "002" and not self._me:
-                    self._me = await self.fetch_user(line.params[0])
-                    continue
-
-                if line.command == "JOIN":
-                    self._channels.append(cn := line.params[0][1:])
-                    self.app.dispatch(kasai.JoinEvent(channel=cn, app=self.app))
-                    _log.info(f"joined #{cn}")
-                    continue
-
-                if line.command == "ROOMSTATE" and line.tags and len(line.tags) > 2:
-                    channel = await self.fetch_channel(line.tags["room-id"])
-                    self.app.dispatch(kasai.JoinRoomstateEvent(channel=channel))
-                    continue
-
-                if line.command == "PART":
-                    self._channels.remove(cn := line.params[0][1:])
-                    self.app.dispatch(kasai.PartEvent(channel=cn, app=self.app))
-                    _log.info(f"parted #{cn}")
-                    continue
-
-                if line.command == "CLEARCHAT":
-                    event: kasai.ClearEvent | kasai.BanEvent | kasai.TimeoutEvent
-                    assert line.tags
-
-                    keys = line.tags.keys()
-                    channel = await self.fetch_channel(line.tags["room-id"])
-                    created = dt.datetime.fromtimestamp(
-                        int(line.tags["tmi-sent-ts"]) / 1000
-                    )
-
-                    if "ban-duration" in keys:
-                        event = kasai.TimeoutEvent(
-                            channel=channel,
-                            created_at=created,
-                            user=await self.fetch_user(line.tags["target-user-id"]),
-                            duration=int(line.tags.get("ban-duration", 0)),
-                        )
-                    elif "target-user-id" in keys:
-                        event = kasai.BanEvent(
-                            channel=channel,
-                            created_at=created,
-                            user=await self.fetch_user(line.tags["target-user-id"]),
-                        )
-                    else:
-                        event = kasai.ClearEvent(channel=channel, created_at=created)
-
-                    self.app.dispatch(event)
-                    continue
-
-                if line.command != "PRIVMSG":
-                    continue
-
-                assert line.tags
-                result = self.app.entity_factory.deserialize_twitch_message(
-                    line.params[-1],
-                    line.tags,
-                    await self._fetch_viewer(line.tags["user-id"], tags=line.tags),
-                    await self.fetch_channel(line.tags["room-id"]),
+    def _join(self, channels: t.Iterable[str]) -> list[asyncio.Future[bool]]:
+        return [f for c in channels for f in self._assign(c).joins.join((c,))]
+
+    def _part(self, channels: t.Iterable[str]) -> list[asyncio.Future[bool]]:
+        return [
+            f
+            for c in channels
+            for f in self._shard_of.get(c, self._shards[0]).joins.part((c,))
+        ]
+
+    @property
+    def _is_connected(self) -> bool:
+        return any(s.is_connected for s in self.shards)
+
+    async def _handle_line(self, line: _Line) -> None:
+        if line.command == "002" and not self._me:
+            self._me = await self.fetch_user(line.params[0])
+            return
+
+        if line.command == "JOIN":
+            self._membership.mark_joined(cn := line.params[0][1:])
+            if shard := self._shard_of.get(cn):
+                shard.joins.confirm("JOIN", cn)
+            self.app.dispatch(kasai.JoinEvent(channel=cn, app=self.app))
+            _log.info(f"joined #{cn}")
+            return
+
+        if line.command == "ROOMSTATE" and line.tags and "slow" in line.tags:
+            # Slow mode changes arrive as ROOMSTATEs with only the
+            # changed tag, so they're checked for separately.
+            self._messages.set_slow_mode(line.params[0][1:], int(line.tags["slow"]))
+
+        if line.command == "ROOMSTATE" and line.tags and len(line.tags) > 2:
+            self._room_ids[cn := line.params[0][1:]] = line.tags["room-id"]
+            self._room_states[cn] = dict(line.tags)
+            channel = await self._fetch_room(line.tags["room-id"], force=True)
+            self.app.dispatch(kasai.JoinRoomstateEvent(channel=channel))
+            return
+
+        if line.command == "ROOMSTATE" and line.tags:
+            # Partial updates only hold the tags that changed, so they
+            # are merged into what's already known.
+            self._room_states.setdefault(line.params[0][1:], {}).update(line.tags)
+            return
+
+        if line.command == "USERSTATE" and line.tags:
+            # Twitch also sends these when a message is accepted.
+            self._badges[cn := line.params[0][1:]] = irc.parse_badges(
+                line.tags.get("badges", "")
+            )
+            self._messages.confirm(cn)
+            return
+
+        if line.command == "NOTICE" and line.tags and "msg-id" in line.tags:
+            match = _RETRY_PATTERN.search(line.params[-1])
+            retrying = self._messages.reject(
+                cn := line.params[0][1:],
+                line.tags["msg-id"],
+                retry_after=int(match.group(1)) if match else None,
+            )
+            if retrying:
+                _log.warning(
+                    f"message to #{cn} was rejected ({line.tags['msg-id']}), "
+                    "it will be sent again"
                 )
-                self.app.dispatch(kasai.MessageCreateEvent(message=result))
+            return
+
+        if line.command == "GLOBALUSERSTATE" and line.tags:
+            self._global_badges = irc.parse_badges(line.tags.get("badges", ""))
+            return
+
+        if line.command == "PART":
+            self._membership.mark_parted(cn := line.params[0][1:])
+            if shard := self._shard_of.pop(cn, None):
+                shard.channels.discard(cn)
+                shard.joins.confirm("PART", cn)
+            self._badges.pop(cn, None)
+            self._room_states.pop(cn, None)
+            if (room_id := self._room_ids.pop(cn, None)) is not None:
+                self._rooms.invalidate(room_id)
+            self.app.dispatch(kasai.PartEvent(channel=cn, app=self.app))
+            _log.info(f"parted #{cn}")
+            return
+
+        if line.command == "CLEARCHAT":
+            event: kasai.ClearEvent | kasai.BanEvent | kasai.TimeoutEvent
+            assert line.tags
+
+            keys = line.tags.keys()
+            channel = await self._fetch_room(line.tags["room-id"])
+            created = dt.datetime.fromtimestamp(int(line.tags["tmi-sent-ts"]) / 1000)
+
+            if "ban-duration" in keys:
+                event = kasai.TimeoutEvent(
+                    channel=channel,
+                    created_at=created,
+                    tags=line.tags,
+                    user=await self.fetch_user(line.tags["target-user-id"]),
+                    duration=int(line.tags.get("ban-duration", 0)),
+                )
+            elif "target-user-id" in keys:
+                event = kasai.BanEvent(
+                    channel=channel,
+                    created_at=created,
+                    tags=line.tags,
+                    user=await self.fetch_user(line.tags["target-user-id"]),
+                )
+            else:
+                event = kasai.ClearEvent(
+                    channel=channel, created_at=created, tags=line.tags
+                )
+
+            self.app.dispatch(event)
+            return
+
+        if line.command != "PRIVMSG":
+            return
+
+        assert line.tags
+        viewer: kasai.Viewer
+
+        if self._settings.partial_viewers:
+            viewer = self.app.entity_factory.deserialize_twitch_partial_viewer(
+                line.hostmask.nickname, line.tags
+            )
+        else:
+            viewer = await self._fetch_viewer(line.tags["user-id"], tags=line.tags)
+
+        result = self.app.entity_factory.deserialize_twitch_message(
+            line.params[-1],
+            line.tags,
+            viewer,
+            await self._fetch_room(line.tags["room-id"]),
+        )
+        self.app.dispatch(kasai.MessageCreateEvent(message=result))
+
+    def _pick_credential(self) -> auth.Credential:
+        # Queued requests will take points first, and an empty bucket
+        # that resets sooner is better than one that resets later.
+        return max(
+            self._credentials,
+            key=lambda c: (
+                c.bucket.remaining - c.bucket.depth,
+                -c.bucket.reset_after,
+            ),
+        )
+
+    async def _fetch_app_token(self, credential: auth.Credential) -> JSONObject:
+        res = await self._request(
+            "POST", "", auth=True, options={}, credential=credential
+        )
+        return res[0]
+
+    def _new_session(self) -> aiohttp.ClientSession:
+        settings = self._settings
+        connector = aiohttp.TCPConnector(
+            limit=settings.connection_limit,
+            limit_per_host=settings.connection_limit_per_host,
+            keepalive_timeout=settings.keepalive_timeout,
+            ttl_dns_cache=settings.dns_cache_ttl,
+        )
+        timeout = aiohttp.ClientTimeout(
+            total=settings.request_timeout,
+            connect=settings.connect_timeout,
+            sock_read=settings.read_timeout,
+        )
+        return aiohttp.ClientSession(connector=connector, timeout=timeout)
 
     async def _start_api(self) -> None:
         if self.is_alive:
             raise kasai.IsAlive("a client session is already alive")
 
-        self._session = aiohttp.ClientSession()
+        self._session = self._external_session or self._new_session()
+
+        await asyncio.gather(*(c.token.refresh() for c in self._credentials))
 
-        res = await self._request("POST", "", auth=True, options={})
-        self._api_token = res[0]["access_token"]
+        for credential in self._credentials:
+            credential.token.start()
         _log.info("api.twitch.tv/helix is ready")
 
     async def _start_irc(self) -> None:
-        self._reader, self._writer = await asyncio.open_connection(
-            "irc.chat.twitch.tv", 6667
-        )
-        _log.debug(f"connected to {self._writer.get_extra_info('peername')}")
-        self._writer.write(
-            (
-                f"PASS {self._irc_token}\r\nNICK {self._nickname}\r\n"
-                "CAP REQ :twitch.tv/commands twitch.tv/tags\r\n"
-            ).encode(),
-        )
-        await self._writer.drain()
-
-        def end_task(task: asyncio.Task[None]) -> None:
-            try:
-                task.result()
-            except asyncio.CancelledError:
-                ...
-
-        loop = asyncio.get_running_loop()
-        self._task = loop.create_task(self._listen())
-        self._task.add_done_callback(end_task)
-        _log.info("irc.chat.twitch.tv is ready")
+        await asyncio.gather(*(s.connect() for s in self.shards))
+        _log.info(f"irc.chat.twitch.tv is ready ({len(self.shards)} shard(s))")
 
     async def start(self) -> None:
         """Start all Twitch services. This is called automatically when
@@ -348,7 +859,10 @@ class TwitchClient:
         _log.info("starting Twitch services...")
 
         await self._start_api()
+        self._work.start()
         await self._start_irc()
+        self._messages.start()
+        self._membership.start()
 
         _log.info("successfully started all Twitch services!")
 
@@ -367,21 +881,32 @@ class TwitchClient:
             )
 
         assert self._session
-        assert self._writer
 
-        await self.part(*self._channels)
-        await self._session.close()
-        self._writer.close()
-        await self._writer.wait_closed()
+        await self._membership.stop()
+        await self._messages.stop()
+        for credential in self._credentials:
+            credential.bucket.stop()
+            await credential.token.stop()
+        if self._session is not self._external_session:
+            await self._session.close()
+
+        self._session = None
 
-        if self._task and not self._task.cancelled():
-            self._task.cancel()
+        joined = self._membership.joined
+        await asyncio.gather(*(s.close(part=s.channels & joined) for s in self.shards))
+
+        await self._work.stop()
 
         _log.info("successfully closed IRC websocket")
 
-    async def join(self, *channels: str) -> None:
+    async def join(self, *channels: str, wait: bool = False) -> None:
         """Joins the given Twitch channels' chats.
 
+        Channels are joined as quickly as Twitch's join rate limit
+        allows, so joining lots of channels can take a while. See
+        `kasai.TwitchSettings.join_limit` and
+        `kasai.TwitchClient.join_progress` for more information.
+
         Example
         -------
         ```py
@@ -400,22 +925,56 @@ class TwitchClient:
         *channels : str
             The login usernames of the channels to join.
 
+        Other Parameters
+        ----------------
+        wait : bool
+            Whether to wait until Twitch confirms each channel was
+            joined, or until `kasai.TwitchSettings.join_timeout`
+            passes. Defaults to `False`.
+
+            .. versionadded:: 0.11a
+
         Returns
         -------
         None
         """
 
-        if self._writer is None:
+        if not self._is_connected:
             raise kasai.NotAlive("there are no alive IRC websockets")
 
-        if not channels:
-            return
+        futs = self._membership.add(channels)
+
+        if wait and futs:
+            await asyncio.wait(futs)
+
+    def set_channels(self, channels: t.Iterable[str]) -> None:
+        """Sets the channels this client should be in. Channels that
+        aren't joined are joined, and joined channels that aren't given
+        are parted. Channels that fail to join are tried again every
+        `kasai.TwitchSettings.reconcile_interval` seconds.
+
+        Example
+        -------
+        ```py
+        >>> channels = Path("channels.txt").read_text().split()
+        >>> bot.twitch.set_channels(channels)
+        ```
+
+        Parameters
+        ----------
+        channels : Iterable[str]
+            The login usernames of the channels.
+
+        Returns
+        -------
+        None
+
+        .. versionadded:: 0.11a
+        """
 
-        payload = f"JOIN {','.join(f'#{c}' for c in channels)}\r\n".encode()
-        self._writer.write(payload)
-        await self._writer.drain()
+        self._membership.set_target(channels)
 
-    async def part(self, *channels: str) -> None:
+    async def part(self, *channels: str, wait: bool = False) -> None:
         """Parts (leaves) the given Twitch channels' chats.
 
         .. note::
@@ -440,26 +999,38 @@ class TwitchClient:
         *channels : str
             The login usernames of the channels to part.
 
+        Other Parameters
+        ----------------
+        wait : bool
+            Whether to wait until Twitch confirms each channel was
+            parted, or until `kasai.TwitchSettings.join_timeout`
+            passes. Defaults to `False`.
+
+            .. versionadded:: 0.11a
+
         Returns
         -------
         None
         """
 
-        if self._writer is None:
+        if not self._is_connected:
             raise kasai.NotAlive("there are no alive IRC websockets")
 
-        if not channels:
-            return
+        futs = self._membership.remove(channels)
 
-        payload = f"PART {','.join(f'#{c}' for c in channels)}\r\n".encode()
-        self._writer.write(payload)
-        await self._writer.drain()
+        if wait and futs:
+            await asyncio.wait(futs)
 
     async def create_message(
         self, channel: str, content: str, *, reply_to: str | None = None
     ) -> None:
         """Sends a message to a Twitch channel.
 
+        Messages are queued and sent as quickly as Twitch's rate limits
+        allow, so this may take a while to return when sending lots of
+        messages. See `kasai.TwitchSettings.message_limit` for more
+        information.
+
         Example
         -------
         ```py
@@ -499,20 +1070,69 @@ class TwitchClient:
         None
         """
 
-        if self._writer is None:
+        if not self._is_connected:
             raise kasai.NotAlive("there are no alive IRC websockets")
 
         channel = channel.strip("#")
 
-        if channel not in self._channels:
+        if channel not in self._membership:
             raise kasai.NotJoined("this client has not joined that channel")
 
         tag = f"@reply-parent-msg-id={reply_to} " if reply_to else ""
         payload = f"{tag}PRIVMSG #{channel} :{content}\r\n".encode("utf-8")
 
+        # Messages are queued rather than written straight away, as
+        # Twitch silently drops messages sent over the rate limit.
+        wait = await self._messages.send(channel, payload)
+
+        if wait >= 1:
+            _log.debug(f"message to #{channel} was queued for {wait:,.2f}s")
+
+    def _is_elevated(self, channel: str) -> bool:
+        if _ELEVATED_BADGES.intersection(self._badges.get(channel, ())):
+            return True
+
+        # USERSTATE may not have arrived yet, but the bot is always
+        # the broadcaster in its own channel.
+        return self._me is not None and self._me.username == channel
+
+    def get_badges(self, channel: str | None = None) -> dict[str, str]:
+        """Return the bot's chat badges, as last reported by Twitch.
+
+        Example
+        -------
+        ```py
+        >>> bot.twitch.get_badges("twitchdev")
+        {'moderator': '1'}
+        ```
+
+        Parameters
+        ----------
+        channel : str | None
+            The login username of the channel to get the badges for. If
+            this is `None`, the bot's global badges are returned
+            instead. Defaults to `None`.
+
+        Returns
+        -------
+        dict[str, str]
+            A mapping of badge names to versions. This is empty if
+            Twitch hasn't reported any badges yet.
+
+        .. versionadded:: 0.11a
+        """
+
+        if channel is None:
+            return dict(self._global_badges)
+
+        return dict(self._badges.get(channel.strip("#"), {}))
+
+    async def _send_payload(self, channel: str, payload: bytes) -> None:
+        if (shard := self._sender or self._shard_of.get(channel)) is None:
+            raise kasai.NotJoined("this client has not joined that channel")
+
         _log.log(TRACE, f"sending payload with size {len(payload)}\n    {payload!r}")
-        self._writer.write(payload)
-        await self._writer.drain()
+        await shard.send(payload)
 
     def get_me(self) -> kasai.User | None:
         """Return the bot user, if known. This should be available
@@ -537,7 +1157,79 @@ class TwitchClient:
 
         return self._me
 
-    async def fetch_user(self, user: str) -> kasai.User:
+    async def _fetch_user_payload(
+        self,
+        user: str,
+        *,
+        use_cache: bool,
+        priority: ratelimits.Priority = ratelimits.Priority.INTERACTIVE,
+    ) -> JSONObject:
+        if use_cache and (payload := self._users.get(user)) is not None:
+            return payload
+
+        key = user if user.isdigit() else user.lower()
+
+        if self._user_batcher:
+            payload = await self._user_batcher.get(key)
+        else:
+            payload = (await self._fetch_user_payloads([key], priority=priority)).get(
+                key
+            )
+
+        if payload is None:
+            raise NotFound(f"no user of ID or login '{user}' exists")
+
+        self._users.add(payload)
+        return payload
+
+    async def _fetch_user_payloads(
+        self,
+        users: list[str],
+        *,
+        priority: ratelimits.Priority = ratelimits.Priority.INTERACTIVE,
+    ) -> dict[str, JSONObject]:
+        options: dict[str, list[str]] = {}
+
+        for user in users:
+            options.setdefault("id" if user.isdigit() else "login", []).append(user)
+
+        res = await self._request("GET", "users", options=options, priority=priority)
+        payloads = {}
+
+        for payload in res:
+            payloads[payload["id"]] = payload
+            payloads[payload["login"]] = payload
+
+        return payloads
+
+    async def _fetch_chunked(
+        self,
+        keys: list[str],
+        fetch: t.Callable[[list[str]], t.Awaitable[dict[str, JSONObject]]],
+    ) -> dict[str, JSONObject]:
+        sem = asyncio.Semaphore(self._settings.bulk_concurrency)
+
+        async def fetch_chunk(chunk: list[str]) -> dict[str, JSONObject]:
+            async with sem:
+                return await fetch(chunk)
+
+        payloads: dict[str, JSONObject] = {}
+        chunks = await asyncio.gather(
+            *(fetch_chunk(keys[i : i + 100]) for i in range(0, len(keys), 100))
+        )
+
+        for chunk in chunks:
+            payloads.update(chunk)
+
+        return payloads
+
+    async def fetch_user(
+        self,
+        user: str,
+        *,
+        use_cache: bool = True,
+        priority: ratelimits.Priority = ratelimits.Priority.INTERACTIVE,
+    ) -> kasai.User:
         """Fetches a user from the Twitch Helix API.
 
         Example
@@ -555,21 +1247,111 @@ class TwitchClient:
             The login username or the ID of the user to fetch. Note that
             while Twitch user IDs are numerical, they are strings.
 
+        Other Parameters
+        ----------------
+        use_cache : bool
+            Whether to serve the user from the user cache if possible.
+            If this is `False`, the user is always fetched from the API,
+            and the cached entry is replaced. Defaults to `True`.
+
+            .. versionadded:: 0.11a
+        priority : kasai.Priority
+            How urgently the request should be sent. Lookups
+            collected by `kasai.TwitchSettings.user_batch_window` are
+            always interactive. Defaults to
+            `kasai.Priority.INTERACTIVE`.
+
+            .. versionadded:: 0.11a
+
         Returns
         -------
         kasai.User
             The fetched user.
         """
 
-        key = "id" if user.isdigit() else "login"
-        payload = await self._request("GET", "users", options={key: [user]})
+        payload = await self._fetch_user_payload(
+            user, use_cache=use_cache, priority=priority
+        )
+        return self.app.entity_factory.deserialize_twitch_user(payload)
 
-        if not payload:
-            raise NotFound(f"no user of ID or login '{user}' exists")
+    async def fetch_users(
+        self,
+        users: t.Iterable[str],
+        *,
+        use_cache: bool = True,
+        priority: ratelimits.Priority = ratelimits.Priority.BACKGROUND,
+    ) -> kasai.BulkResult[kasai.User]:
+        """Fetches multiple users from the Twitch Helix API. Users are
+        fetched in groups of 100, with several groups being fetched
+        concurrently (see `kasai.TwitchSettings.bulk_concurrency`).
+
+        Example
+        -------
+        ```py
+        >>> res = await bot.twitch.fetch_users(["twitchdev", "12826"])
+        >>> print(res["141981764"].username)
+        twitchdev
+        >>> res.missing
+        []
+        ```
 
-        return self.app.entity_factory.deserialize_twitch_user(payload[0])
+        Parameters
+        ----------
+        users : Iterable[str]
+            The login usernames or IDs of the users to fetch. These can
+            be mixed.
 
-    async def fetch_channel(self, channel: str) -> kasai.Channel:
+        Other Parameters
+        ----------------
+        use_cache : bool
+            Whether to serve users from the user cache if possible.
+            Defaults to `True`.
+        priority : kasai.Priority
+            How urgently the requests should be sent. Defaults to
+            `kasai.Priority.BACKGROUND`.
+
+        Returns
+        -------
+        kasai.BulkResult[kasai.User]
+            The fetched users keyed by ID, alongside the IDs and login
+            usernames of any users that could not be found.
+
+        .. versionadded:: 0.11a
+        """
+
+        keys = list(dict.fromkeys(u if u.isdigit() else u.lower() for u in users))
+        payloads: dict[str, JSONObject] = {}
+
+        for key in keys:
+            if use_cache and (payload := self._users.get(key)) is not None:
+                payloads[key] = payload
+
+        payloads.update(
+            await self._fetch_chunked(
+                [k for k in keys if k not in payloads],
+                functools.partial(self._fetch_user_payloads, priority=priority),
+            )
+        )
+        results = {}
+
+        for payload in payloads.values():
+            self._users.add(payload)
+            results[payload["id"]] = payload
+
+        return batching.BulkResult(
+            results={
+                k: self.app.entity_factory.deserialize_twitch_user(v)
+                for k, v in results.items()
+            },
+            missing=[k for k in keys if k not in payloads],
+        )
+
+    async def fetch_channel(
+        self,
+        channel: str,
+        *,
+        priority: ratelimits.Priority = ratelimits.Priority.INTERACTIVE,
+    ) -> kasai.Channel:
         """Fetches a channel from the Twitch Helix API.
 
         Example
@@ -587,6 +1369,14 @@ class TwitchClient:
             channel IDs are numerical, they are strings. A channel's ID
             is identical to the user ID of the channel.
 
+        Other Parameters
+        ----------------
+        priority : kasai.Priority
+            How urgently the request should be sent. Defaults to
+            `kasai.Priority.INTERACTIVE`.
+
+            .. versionadded:: 0.11a
+
         Returns
         -------
         kasai.Channel
@@ -594,7 +1384,7 @@ class TwitchClient:
         """
 
         payload = await self._request(
-            "GET", "channels", options={"broadcaster_id": [channel]}
+            "GET", "channels", options={"broadcaster_id": [channel]}, priority=priority
         )
 
         if not payload:
@@ -602,16 +1392,145 @@ class TwitchClient:
 
         return self.app.entity_factory.deserialize_twitch_channel(payload[0])
 
-    async def _fetch_viewer(self, user: str, *, tags: dict[str, str]) -> kasai.Viewer:
-        key = "id" if user.isdigit() else "login"
-        payload = await self._request("GET", "users", options={key: [user]})
+    async def _fetch_channel_payloads(
+        self,
+        channels: list[str],
+        *,
+        priority: ratelimits.Priority = ratelimits.Priority.INTERACTIVE,
+    ) -> dict[str, JSONObject]:
+        res = await self._request(
+            "GET", "channels", options={"broadcaster_id": channels}, priority=priority
+        )
+        return {payload["broadcaster_id"]: payload for payload in res}
 
-        if not payload:
-            raise NotFound(f"no user by ID or login '{user}' exists")
+    async def fetch_channels(
+        self,
+        channels: t.Iterable[str],
+        *,
+        priority: ratelimits.Priority = ratelimits.Priority.BACKGROUND,
+    ) -> kasai.BulkResult[kasai.Channel]:
+        """Fetches multiple channels from the Twitch Helix API. Channels
+        are fetched in groups of 100, with several groups being fetched
+        concurrently (see `kasai.TwitchSettings.bulk_concurrency`).
+
+        Example
+        -------
+        ```py
+        >>> ids = ["141981764", "12826"]
+        >>> res = await bot.twitch.fetch_channels(ids)
+        >>> print(res["141981764"].username)
+        twitchdev
+        ```
+
+        Parameters
+        ----------
+        channels : Iterable[str]
+            The IDs of the channels to fetch.
+
+        Other Parameters
+        ----------------
+        priority : kasai.Priority
+            How urgently the requests should be sent. Defaults to
+            `kasai.Priority.BACKGROUND`.
+
+        Returns
+        -------
+        kasai.BulkResult[kasai.Channel]
+            The fetched channels keyed by ID, alongside the IDs of any
+            channels that could not be found.
+
+        .. versionadded:: 0.11a
+        """
+
+        keys = list(dict.fromkeys(channels))
+        payloads = await self._fetch_chunked(
+            keys, functools.partial(self._fetch_channel_payloads, priority=priority)
+        )
+
+        return batching.BulkResult(
+            results={
+                k: self.app.entity_factory.deserialize_twitch_channel(v)
+                for k, v in payloads.items()
+            },
+            missing=[k for k in keys if k not in payloads],
+        )
+
+    def get_channel(self, channel: str) -> kasai.Channel | None:
+        """Gets a joined channel from the channel cache. Joined channels
+        are cached when Twitch sends their ROOMSTATE information, and
+        are periodically refreshed while the client receives messages
+        from them.
+
+        Example
+        -------
+        ```py
+        >>> channel = bot.twitch.get_channel("141981764")
+        >>> print(channel.username)
+        twitchdev
+        ```
+
+        Parameters
+        ----------
+        channel : str
+            The ID of the channel to get.
+
+        Returns
+        -------
+        kasai.Channel | None
+            The cached channel, or `None` if it is not cached.
+
+        .. versionadded:: 0.11a
+        """
 
-        return self.app.entity_factory.deserialize_twitch_viewer(payload[0], tags)
+        return self._rooms.peek(channel)
+
+    def get_room_state(self, channel: str) -> dict[str, str]:
+        """Return a joined channel's chat settings, as last reported by
+        Twitch in its ROOMSTATE information.
+
+        Example
+        -------
+        ```py
+        >>> bot.twitch.get_room_state("twitchdev")
+        {'emote-only': '0', 'followers-only': '-1', 'r9k': '0', ...}
+        ```
 
-    async def fetch_stream(self, user: str) -> kasai.Stream:
+        Parameters
+        ----------
+        channel : str
+            The login username of the channel.
+
+        Returns
+        -------
+        dict[str, str]
+            A mapping of ROOMSTATE tags to values. This is empty if
+            Twitch hasn't reported any yet.
+
+        .. versionadded:: 0.11a
+        """
+
+        return dict(self._room_states.get(channel.strip("#"), {}))
+
+    async def _fetch_room(self, room_id: str, *, force: bool = False) -> kasai.Channel:
+        if not force and (channel := self._rooms.get(room_id)) is not None:
+            return channel
+
+        channel = await self.fetch_channel(room_id)
+        self._rooms.set(room_id, channel)
+        return channel
+
+    async def _fetch_viewer(
+        self, user: str, *, tags: t.Mapping[str, str]
+    ) -> kasai.Viewer:
+        payload = await self._fetch_user_payload(user, use_cache=True)
+        return self.app.entity_factory.deserialize_twitch_viewer(payload, tags)
+
+    async def fetch_stream(
+        self,
+        user: str,
+        *,
+        priority: ratelimits.Priority = ratelimits.Priority.INTERACTIVE,
+    ) -> kasai.Stream:
         """Fetches a stream from the Twitch Helix API.
 
         Example
@@ -630,6 +1549,14 @@ class TwitchClient:
             want to fetch. Note that while Twitch user IDs are
             numerical, they are strings.
 
+        Other Parameters
+        ----------------
+        priority : kasai.Priority
+            How urgently the request should be sent. Defaults to
+            `kasai.Priority.INTERACTIVE`.
+
+            .. versionadded:: 0.11a
+
         Returns
         -------
         kasai.Stream
@@ -639,9 +1566,86 @@ class TwitchClient:
         """
 
         key = "user_id" if user.isdigit() else "user_login"
-        payload = await self._request("GET", "streams", options={key: [user]})
+        payload = await self._request(
+            "GET", "streams", options={key: [user]}, priority=priority
+        )
 
         if not payload:
             raise NotFound(f"no stream by a channel of ID or login '{user}' exists")
 
         return self.app.entity_factory.deserialize_twitch_stream(payload[0])
+
+    async def _fetch_stream_payloads(
+        self,
+        users: list[str],
+        *,
+        priority: ratelimits.Priority = ratelimits.Priority.INTERACTIVE,
+    ) -> dict[str, JSONObject]:
+        options: dict[str, list[str]] = {"first": ["100"]}
+
+        for user in users:
+            key = "user_id" if user.isdigit() else "user_login"
+            options.setdefault(key, []).append(user)
+
+        res = await self._request("GET", "streams", options=options, priority=priority)
+        payloads = {}
+
+        for payload in res:
+            payloads[payload["user_id"]] = payload
+            payloads[payload["user_login"]] = payload
+
+        return payloads
+
+    async def fetch_streams(
+        self,
+        users: t.Iterable[str],
+        *,
+        priority: ratelimits.Priority = ratelimits.Priority.BACKGROUND,
+    ) -> kasai.BulkResult[kasai.Stream]:
+        """Fetches multiple streams from the Twitch Helix API. Streams
+        are fetched in groups of 100, with several groups being fetched
+        concurrently (see `kasai.TwitchSettings.bulk_concurrency`).
+
+        Example
+        -------
+        ```py
+        >>> res = await bot.twitch.fetch_streams(["twitchdev", "12826"])
+        >>> for channel_id, stream in res.results.items():
+        ...     print(channel_id, stream.viewer_count)
+        ```
+
+        Parameters
+        ----------
+        users : Iterable[str]
+            The login usernames or IDs of the users whose streams you
+            want to fetch. These can be mixed.
+
+        Other Parameters
+        ----------------
+        priority : kasai.Priority
+            How urgently the requests should be sent. Defaults to
+            `kasai.Priority.BACKGROUND`.
+
+        Returns
+        -------
+        kasai.BulkResult[kasai.Stream]
+            The fetched streams keyed by the ID of the channel they are
+            being broadcast to, alongside the IDs and login usernames of
+            any users that are not live.
+
+        .. versionadded:: 0.11a
+        """
+
+        keys = list(dict.fromkeys(u if u.isdigit() else u.lower() for u in users))
+        payloads = await self._fetch_chunked(
+            keys, functools.partial(self._fetch_stream_payloads, priority=priority)
+        )
+        results = {v["user_id"]: v for v in payloads.values()}
+
+        return batching.BulkResult(
+            results={
+                k: self.app.entity_factory.deserialize_twitch_stream(v)
+                for k, v in results.items()
+            },
+            missing=[k for k in keys if k not in payloads],
+        )
@@ -37,6 +37,7 @@ import enum
 import attr
 from hikari.internal import attr_extensions
 
+import kasai
 from kasai import traits
 
 
@@ -194,6 +195,29 @@ class Viewer(User, abc.ABC):
     def is_broadcaster(self) -> bool:
         """Whether this user is the channel's broadcaster."""
 
+    async def fetch_profile(self) -> User:
+        """Fetches this viewer's full profile information from the
+        Twitch Helix API, if it has not been loaded already.
+
+        Example
+        -------
+        ```py
+        >>> user = await viewer.fetch_profile()
+        >>> user.description
+        'Supporting third-party developers building Twitch...'
+        ```
+
+        Returns
+        -------
+        kasai.User
+            The viewer's profile. For viewers that already have their
+            profile information available, this is the viewer itself.
+
+        .. versionadded:: 0.11a
+        """
+
+        return self
+
 
 @attr_extensions.with_copy
 @attr.define(hash=True, kw_only=True, weakref_slot=False)
@@ -230,3 +254,82 @@ class ViewerImpl(UserImpl, Viewer):
     is_subscriber: bool = attr.field(eq=False, hash=False, repr=True)
     is_turbo: bool = attr.field(eq=False, hash=False, repr=False)
     is_broadcaster: bool = attr.field(eq=False, hash=False, repr=True)
+
+
+@attr_extensions.with_copy
+@attr.define(hash=True, kw_only=True, weakref_slot=False)
+class PartialViewerImpl(Viewer):
+    """Implementation of viewer information built purely from IRC tags.
+
+    Profile information is loaded lazily, and is only available once
+    `PartialViewerImpl.fetch_profile` has been awaited. Accessing it
+    beforehand raises `kasai.NotLoaded`.
+
+    .. versionadded:: 0.11a
+    """
+
+    app: traits.TwitchAware = attr.field(
+        repr=False,
+        eq=False,
+        hash=False,
+        metadata={attr_extensions.SKIP_DEEP_COPY: True},
+    )
+    display_name: str = attr.field(eq=False, hash=False, repr=True)
+    id: str = attr.field(hash=True, repr=True)
+    username: str = attr.field(eq=False, hash=False, repr=False)
+    color: int = attr.field(eq=False, hash=False, repr=True)
+    is_mod: bool = attr.field(eq=False, hash=False, repr=True)
+    is_subscriber: bool = attr.field(eq=False, hash=False, repr=True)
+    is_turbo: bool = attr.field(eq=False, hash=False, repr=False)
+    is_broadcaster: bool = attr.field(eq=False, hash=False, repr=True)
+    _profile: User | None = attr.field(
+        default=None, init=False, eq=False, hash=False, repr=False
+    )
+
+    def __str__(self) -> str:
+        return self.username
+
+    @property
+    def is_loaded(self) -> bool:
+        """Whether this viewer's profile information has been loaded."""
+
+        return self._profile is not None
+
+    def _get_profile(self) -> User:
+        if self._profile is None:
+            raise kasai.NotLoaded(
+                "this viewer's profile has not been loaded — "
+                "use 'fetch_profile' to load it"
+            )
+
+        return self._profile
+
+    @property
+    def broadcaster_type(self) -> BroadcasterType:
+        return self._get_profile().broadcaster_type
+
+    @property
+    def description(self) -> str:
+        return self._get_profile().description
+
+    @property
+    def offline_image_url(self) -> str:
+        return self._get_profile().offline_image_url
+
+    @property
+    def profile_image_url(self) -> str:
+        return self._get_profile().profile_image_url
+
+    @property
+    def type(self) -> UserType:
+        return self._get_profile().type
+
+    @property
+    def created_at(self) -> dt.datetime:
+        return self._get_profile().created_at
+
+    async def fetch_profile(self) -> User:
+        if self._profile is None:
+            self._profile = await self.app.twitch.fetch_user(self.id)
+
+        return self._profile
@@ -30,8 +30,9 @@ from __future__ import annotations
 
 import sys
 
-__all__ = ("display_splash", "deprecated", "depr_warn")
+__all__ = ("display_splash", "deprecated", "depr_warn", "log_failure", "LazyEvent")
 
+import asyncio
 import logging
 import typing as t
 from functools import wraps
@@ -66,3 +67,38 @@ def deprecated(ver: str, resolution: str | None = None) -> t.Callable[[_FuncT],
         return wrapper
 
     return decorator
+
+
+def log_failure(
+    logger: logging.Logger, message: str
+) -> t.Callable[[asyncio.Future[t.Any]], None]:
+    def callback(task: asyncio.Future[t.Any]) -> None:
+        if not task.cancelled() and (exc := task.exception()):
+            logger.error(message, exc_info=exc)
+
+    return callback
+
+
+class LazyEvent:
+    # The event is created on first use so it belongs to the running
+    # loop, which isn't the case on Python 3.8 and 3.9 otherwise.
+
+    __slots__ = ("_event",)
+
+    def __init__(self) -> None:
+        self._event: asyncio.Event | None = None
+
+    def _get(self) -> asyncio.Event:
+        if self._event is None:
+            self._event = asyncio.Event()
+
+        return self._event
+
+    def set(self) -> None:
+        self._get().set()
+
+    def clear(self) -> None:
+        self._get().clear()
+
+    async def wait(self) -> None:
+        await self._get().wait()
@@ -0,0 +1,241 @@
+# Copyright (c) 2022-present, Ethan Henderson
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+from __future__ import annotations
+
+__all__ = ("BackpressurePolicy", "WorkQueue")
+
+import asyncio
+import enum
+import logging
+import typing as t
+
+_log = logging.getLogger(__name__)
+_T = t.TypeVar("_T")
+
+
+class BackpressurePolicy(enum.Enum):
+    """An enum representing what to do when a work queue is full.
+
+    .. versionadded:: 0.11a
+    """
+
+    BLOCK = "block"
+    """Wait for space to become available. This stops the client reading
+    from the socket until the queue has room."""
+
+    DROP_OLDEST = "drop_oldest"
+    """Discard the oldest queued item to make room for the new one."""
+
+    DROP_NEWEST = "drop_newest"
+    """Discard the new item."""
+
+
+class WorkQueue(t.Generic[_T]):
+    """A class representing a bounded queue of work, processed by a pool
+    of worker tasks.
+
+    The queue is split into lanes, each with its own worker. Items with
+    the same key always go to the same lane, so they are processed in
+    the order they were added, while items with different keys can be
+    processed concurrently. Items without a key all go to the first
+    lane.
+
+    Parameters
+    ----------
+    handler : Callable[[Any], Awaitable[None]]
+        The coroutine function used to process each item. Exceptions it
+        raises are logged, and do not stop the workers.
+
+    Other Parameters
+    ----------------
+    workers : int
+        The number of lanes (and therefore worker tasks) to process
+        items with. Defaults to `1`.
+    max_size : int
+        The maximum number of items that can be queued in each lane.
+        Defaults to `1_000`.
+    policy : BackpressurePolicy
+        What to do when the queue is full. Defaults to
+        `BackpressurePolicy.BLOCK`.
+
+    .. versionadded:: 0.11a
+    """
+
+    __slots__ = (
+        "_handler",
+        "_workers",
+        "_max_size",
+        "_policy",
+        "_queues",
+        "_tasks",
+        "_dropped",
+        "_overloaded_at",
+    )
+
+    def __init__(
+        self,
+        handler: t.Callable[[_T], t.Awaitable[None]],
+        *,
+        workers: int = 1,
+        max_size: int = 1_000,
+        policy: BackpressurePolicy = BackpressurePolicy.BLOCK,
+    ) -> None:
+        self._handler = handler
+        self._workers = workers
+        self._max_size = max_size
+        self._policy = policy
+        self._queues: list[asyncio.Queue[_T]] = []
+        self._tasks: list[asyncio.Task[None]] = []
+        self._dropped = 0
+        self._overloaded_at: int | None = None
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the workers are running."""
+
+        return bool(self._tasks)
+
+    @property
+    def depth(self) -> int:
+        """The number of items currently waiting to be processed."""
+
+        return sum(q.qsize() for q in self._queues)
+
+    @property
+    def lane_depths(self) -> list[int]:
+        """The number of items currently waiting to be processed in each
+        lane."""
+
+        return [q.qsize() for q in self._queues]
+
+    @property
+    def dropped(self) -> int:
+        """The number of items that have been discarded because the
+        queue was full."""
+
+        return self._dropped
+
+    def start(self) -> None:
+        """Starts the worker tasks. This must be called from within a
+        running event loop.
+
+        Returns
+        -------
+        None
+        """
+
+        loop = asyncio.get_running_loop()
+        self._tasks = [loop.create_task(self._work(q)) for q in self._get_queues()]
+        _log.debug(f"started {self._workers} worker(s)")
+
+    async def stop(self) -> None:
+        """Stops the worker tasks. Items still in the queue are kept,
+        and are processed if the workers are started again.
+
+        Returns
+        -------
+        None
+        """
+
+        for task in self._tasks:
+            task.cancel()
+
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def _get_queues(self) -> list[asyncio.Queue[_T]]:
+        # Queues are created lazily so they belong to the running loop.
+        if not self._queues:
+            self._queues = [asyncio.Queue(self._max_size) for _ in range(self._workers)]
+
+        return self._queues
+
+    async def put(self, item: _T, *, key: t.Hashable | None = None) -> None:
+        """Adds an item to the queue, applying the backpressure policy
+        if its lane is full.
+
+        Parameters
+        ----------
+        item : Any
+            The item to add.
+
+        Other Parameters
+        ----------------
+        key : Hashable | None
+            The key used to pick the item's lane. Items with the same
+            key are processed in order. Defaults to `None`.
+
+        Returns
+        -------
+        None
+        """
+
+        queues = self._get_queues()
+        queue = queues[hash(key) % len(queues) if key is not None else 0]
+
+        if self._policy == BackpressurePolicy.BLOCK:
+            await queue.put(item)
+            return
+
+        if not queue.full():
+            if self._overloaded_at is not None:
+                _log.info(
+                    "work queue has room again "
+                    f"({self._dropped - self._overloaded_at:,} item(s) dropped)"
+                )
+                self._overloaded_at = None
+
+            queue.put_nowait(item)
+            return
+
+        # Only the change is logged, as logging every dropped item
+        # would flood the log while the queue is overloaded. The
+        # `dropped` counter keeps the total.
+        if self._overloaded_at is None:
+            self._overloaded_at = self._dropped
+            which = (
+                "newest" if self._policy == BackpressurePolicy.DROP_NEWEST else "oldest"
+            )
+            _log.warning(f"work queue is full, dropping {which} items")
+
+        self._dropped += 1
+
+        if self._policy == BackpressurePolicy.DROP_OLDEST:
+            queue.get_nowait()
+            queue.put_nowait(item)
+
+    async def _work(self, queue: asyncio.Queue[_T]) -> None:
+        while True:
+            item = await queue.get()
+
+            try:
+                await self._handler(item)
+            except Exception:
+                _log.exception("failed to process item from the work queue")
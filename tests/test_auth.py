@@ -0,0 +1,86 @@
+# Copyright (c) 2022-present, Ethan Henderson
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+from __future__ import annotations
+
+import asyncio
+import typing as t
+
+import mock
+
+from kasai.auth import AppToken, Credential
+
+
+async def test_refreshes_are_coalesced() -> None:
+    fetch = mock.AsyncMock(return_value={"access_token": "new", "expires_in": 3600})
+    token = AppToken(fetch)
+
+    res = await asyncio.gather(*(token.refresh() for _ in range(10)))
+
+    fetch.assert_awaited_once()
+    assert res == ["new"] * 10
+    assert token.token == "new"
+    assert 3599 < t.cast(float, token.expires_in) <= 3600
+
+
+async def test_stale_refresh_is_skipped() -> None:
+    fetch = mock.AsyncMock(return_value={"access_token": "new", "expires_in": 3600})
+    token = AppToken(fetch)
+    await token.refresh()
+
+    assert await token.refresh("old") == "new"
+    fetch.assert_awaited_once()
+
+
+async def test_token_is_refreshed_before_expiry() -> None:
+    fetch = mock.AsyncMock(
+        side_effect=[
+            {"access_token": "first", "expires_in": 1},
+            {"access_token": "second", "expires_in": 3600},
+        ]
+    )
+    token = AppToken(fetch, margin=0.99)
+    await token.refresh()
+    token.start()
+    await asyncio.sleep(0.05)
+    await token.stop()
+
+    assert token.token == "second"
+
+
+async def test_credential_utilization() -> None:
+    fetch = mock.AsyncMock(return_value={"access_token": "new", "expires_in": 3600})
+    credential = Credential("client_id", "client_secret", fetch)
+
+    for _ in range(200):
+        await credential.bucket.acquire()
+
+    assert credential.utilization == 0.25
+    assert await credential.token.refresh() == "new"
+    fetch.assert_awaited_once_with(credential)
@@ -0,0 +1,72 @@
+# Copyright (c) 2022-present, Ethan Henderson
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+from __future__ import annotations
+
+import asyncio
+
+import mock
+
+from kasai.batching import Batcher
+
+
+async def test_lookups_are_batched() -> None:
+    fetch = mock.AsyncMock(return_value={"a": 1, "b": 2})
+    batcher: Batcher[int] = Batcher(fetch, 0.01)
+
+    results = await asyncio.gather(
+        batcher.get("a"), batcher.get("b"), batcher.get("a"), batcher.get("c")
+    )
+
+    assert results == [1, 2, 1, None]
+    fetch.assert_awaited_once_with(["a", "b", "c"])
+    assert batcher.pending == 0
+
+
+async def test_full_batch_is_flushed_immediately() -> None:
+    fetch = mock.AsyncMock(side_effect=lambda keys: {k: k for k in keys})
+    batcher: Batcher[str] = Batcher(fetch, 60.0, max_size=2)
+
+    results = await asyncio.wait_for(
+        asyncio.gather(batcher.get("a"), batcher.get("b")), timeout=1
+    )
+
+    assert results == ["a", "b"]
+    fetch.assert_awaited_once_with(["a", "b"])
+
+
+async def test_exceptions_are_fanned_out() -> None:
+    fetch = mock.AsyncMock(side_effect=RuntimeError("oops"))
+    batcher: Batcher[int] = Batcher(fetch, 0.01)
+
+    results = await asyncio.gather(
+        batcher.get("a"), batcher.get("b"), return_exceptions=True
+    )
+
+    assert all(isinstance(r, RuntimeError) for r in results)
@@ -0,0 +1,142 @@
+# Copyright (c) 2022-present, Ethan Henderson
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+from __future__ import annotations
+
+import typing as t
+
+import mock
+import pytest
+
+from kasai.cache import TTLCache, UserCache
+
+
+def test_get_hit_and_miss() -> None:
+    cache: TTLCache[str, int] = TTLCache(10, None)
+    cache.set("a", 1)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+
+def test_peek_does_not_count() -> None:
+    cache: TTLCache[str, int] = TTLCache(2, None)
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    assert cache.peek("a") == 1
+    assert cache.peek("c") is None
+    assert cache.hits == cache.misses == 0
+
+    # Peeking doesn't mark "a" as recently used, so it's still evicted.
+    cache.set("c", 3)
+    assert "a" not in cache
+
+
+def test_lru_eviction() -> None:
+    cache: TTLCache[str, int] = TTLCache(2, None)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert len(cache) == 2
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+
+
+def test_expiry() -> None:
+    cache: TTLCache[str, int] = TTLCache(None, 10.0)
+
+    with mock.patch("hikari.internal.time.monotonic", return_value=100.0):
+        cache.set("a", 1)
+
+    with mock.patch("hikari.internal.time.monotonic", return_value=105.0):
+        assert cache.get("a") == 1
+
+    with mock.patch("hikari.internal.time.monotonic", return_value=111.0):
+        assert cache.get("a") is None
+
+    assert len(cache) == 0
+
+
+def test_zero_size_disables_cache() -> None:
+    cache: TTLCache[str, int] = TTLCache(0, None)
+    cache.set("a", 1)
+    assert len(cache) == 0
+
+
+@pytest.fixture()
+def user_payload() -> dict[str, t.Any]:
+    return {"id": "141981764", "login": "twitchdev"}
+
+
+def test_user_cache_lookup_by_id_and_login(user_payload: dict[str, t.Any]) -> None:
+    cache = UserCache(10, None)
+    cache.add(user_payload)
+
+    assert cache.get("141981764") == user_payload
+    assert cache.get("twitchdev") == user_payload
+    assert cache.get("TwitchDev") == user_payload
+    assert cache.hits == 3
+
+
+def test_user_cache_invalidate_by_login(user_payload: dict[str, t.Any]) -> None:
+    cache = UserCache(10, None)
+    cache.add(user_payload)
+    cache.invalidate("twitchdev")
+
+    assert cache.get("141981764") is None
+    assert cache.get("twitchdev") is None
+    assert cache._logins == {}
+
+
+def test_user_cache_eviction_removes_login(user_payload: dict[str, t.Any]) -> None:
+    cache = UserCache(1, None)
+    cache.add(user_payload)
+    cache.add({"id": "12826", "login": "twitch"})
+
+    assert cache.get("twitchdev") is None
+    assert cache._logins == {"twitch": "12826"}
+
+
+def test_user_cache_rename_removes_old_login(user_payload: dict[str, t.Any]) -> None:
+    cache = UserCache(10, None)
+    cache.add(user_payload)
+    cache.add({**user_payload, "login": "twitchdev2"})
+
+    assert cache.get("twitchdev") is None
+    assert cache.get("twitchdev2") is not None
+    assert "twitchdev2" in cache
+    assert "TwitchDev2" in cache
+    assert "twitchdev" not in cache
+    assert user_payload["id"] in cache
@@ -0,0 +1,271 @@
+# Copyright (c) 2022-present, Ethan Henderson
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+from __future__ import annotations
+
+import asyncio
+
+import mock
+import pytest
+
+from kasai.config import TwitchSettings
+from kasai.connection import LineWriter, Shard
+
+
+@pytest.fixture()
+def stream() -> mock.Mock:
+    return mock.Mock(drain=mock.AsyncMock())
+
+
+async def test_lines_are_written_in_one_batch(stream: mock.Mock) -> None:
+    writer = LineWriter(stream)
+    writer.start()
+    await asyncio.gather(*(writer.send(f"{i}\r\n".encode()) for i in range(50)))
+    await writer.close()
+
+    stream.writelines.assert_called_once_with([f"{i}\r\n".encode() for i in range(50)])
+    stream.drain.assert_awaited_once()
+    assert writer.batches == 1
+    assert writer.written == 50
+
+
+async def test_full_batch_is_written_early(stream: mock.Mock) -> None:
+    writer = LineWriter(stream, interval=60.0, max_size=4)
+    writer.start()
+    await asyncio.wait_for(writer.send(b"abcd"), 1)
+    await writer.close()
+
+    assert writer.batches == 1
+
+
+async def test_close_writes_pending_lines(stream: mock.Mock) -> None:
+    writer = LineWriter(stream, interval=60.0)
+    writer.start()
+    fut = writer.write(b"a\r\n")
+    await writer.close()
+
+    assert fut.done()
+    stream.writelines.assert_called_once_with([b"a\r\n"])
+
+
+async def test_write_errors_are_passed_to_callers(stream: mock.Mock) -> None:
+    stream.drain.side_effect = ConnectionResetError()
+    writer = LineWriter(stream)
+    writer.start()
+
+    with pytest.raises(ConnectionResetError):
+        await writer.send(b"a\r\n")
+
+    await writer.close()
+    assert writer.pending == 0
+
+
+async def test_shard_listener_frames_split_lines() -> None:
+    # A tiny read size means most reads end part way through a line.
+    on_line = mock.AsyncMock()
+    shard = Shard(
+        0,
+        "irc_token",
+        "nickname",
+        on_line,
+        settings=TwitchSettings(read_buffer_size=16),
+    )
+    reader = asyncio.StreamReader()
+    reader.feed_data(b"@room-id=1 :tmi.twitch.tv ROOMSTATE #twitch")
+    reader.feed_data(b"dev\r\nPING :tmi.twitch.tv\r\n:tmi.twitch.tv 002 ")
+    reader.feed_data(b"twitchdev :Your host is tmi.twitch.tv\r\n")
+    reader.feed_eof()
+    shard._reader = reader
+    shard._out = mock.Mock()
+
+    assert not await shard._listen()
+
+    assert [c.args[0].command for c in on_line.await_args_list] == [
+        "ROOMSTATE",
+        "PING",
+        "002",
+    ]
+    shard._out.write.assert_called_once_with(b"PONG :tmi.twitch.tv\r\n")
+    assert shard.health.lines_received == 3
+    assert shard.health.last_received is not None
+
+
+async def test_shard_close_parts_channels(stream: mock.Mock) -> None:
+    shard = Shard(0, "irc_token", "nickname", mock.AsyncMock())
+    shard._reader = asyncio.StreamReader()
+    shard._writer = stream
+    stream.wait_closed = mock.AsyncMock()
+    shard._out = LineWriter(stream)
+    await shard.close(part=["twitch"])
+
+    stream.writelines.assert_called_once_with([b"PART #twitch\r\n"])
+    stream.close.assert_called_once()
+
+
+async def test_shard_listener_stops_on_reconnect() -> None:
+    on_line = mock.AsyncMock()
+    shard = Shard(0, "irc_token", "nickname", on_line)
+    shard._reader = asyncio.StreamReader()
+    shard._reader.feed_data(b":tmi.twitch.tv RECONNECT\r\n:tmi.twitch.tv 002 a\r\n")
+    shard._out = mock.Mock()
+
+    assert await shard._listen()
+    on_line.assert_not_awaited()
+
+
+def test_shard_backoff_is_capped() -> None:
+    shard = Shard(
+        0,
+        "irc_token",
+        "nickname",
+        mock.AsyncMock(),
+        settings=TwitchSettings(reconnect_delay=1.0, max_reconnect_delay=8.0),
+    )
+
+    assert all(0 <= shard._backoff(i) <= min(2**i, 8) for i in range(10))
+
+
+async def test_shard_supervisor_reconnects(stream: mock.Mock) -> None:
+    def connection(*data: bytes) -> tuple[asyncio.StreamReader, mock.Mock, mock.Mock]:
+        reader = asyncio.StreamReader()
+        for chunk in data:
+            reader.feed_data(chunk)
+        return reader, mock.Mock(wait_closed=mock.AsyncMock()), mock.AsyncMock()
+
+    on_connect = mock.Mock()
+    on_disconnect = mock.Mock()
+    shard = Shard(
+        0,
+        "irc_token",
+        "nickname",
+        mock.AsyncMock(),
+        settings=TwitchSettings(reconnect_delay=0.0),
+        on_connect=on_connect,
+        on_disconnect=on_disconnect,
+    )
+    first = connection(b":tmi.twitch.tv RECONNECT\r\n")
+    second = connection()
+    second[0].feed_eof()
+    third = connection()
+
+    with mock.patch.object(Shard, "_open", mock.AsyncMock(side_effect=[second, third])):
+        task = asyncio.create_task(shard._supervise(first))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    assert [c.args[1] is None for c in on_connect.call_args_list] == [
+        True,
+        False,
+        False,
+    ]
+    assert [c.args[1] for c in on_disconnect.call_args_list] == [True, False]
+    assert shard.health.reconnects == 2
+    first[2].close.assert_awaited_once()
+
+
+async def test_shard_reads_old_connection_until_rejoined() -> None:
+    def connection() -> tuple[asyncio.StreamReader, mock.Mock, mock.AsyncMock]:
+        writer = mock.Mock(wait_closed=mock.AsyncMock())
+        return asyncio.StreamReader(), writer, mock.AsyncMock()
+
+    def on_connect(shard: Shard, downtime: float | None) -> None:
+        if downtime is not None:
+            shard.joins.join(["twitchdev"])
+
+    on_line = mock.AsyncMock()
+    shard = Shard(0, "irc_token", "nickname", on_line, on_connect=on_connect)
+    first, second = connection(), connection()
+    first[0].feed_data(b":tmi.twitch.tv RECONNECT\r\n")
+
+    with mock.patch.object(Shard, "_open", mock.AsyncMock(return_value=second)):
+        task = asyncio.create_task(shard._supervise(first))
+        await asyncio.sleep(0.01)
+        first[0].feed_data(b":a!a@a.tmi.twitch.tv PRIVMSG #twitchdev :old\r\n")
+        await asyncio.sleep(0.01)
+        second[0].feed_data(b":me!me@me.tmi.twitch.tv JOIN #twitchdev\r\n")
+        await asyncio.sleep(0.01)
+        first[0].feed_data(b":a!a@a.tmi.twitch.tv PRIVMSG #twitchdev :dup\r\n")
+        await asyncio.sleep(0.01)
+        first[2].close.assert_not_awaited()
+
+        shard.joins.confirm("JOIN", "twitchdev")
+        await asyncio.sleep(0.01)
+        first[2].close.assert_awaited_once()
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    assert [
+        (c.args[0].command, c.args[0].params[-1]) for c in on_line.await_args_list
+    ] == [("PRIVMSG", "old"), ("JOIN", "#twitchdev")]
+
+
+async def test_shard_supervisor_survives_unexpected_errors() -> None:
+    on_connect = mock.Mock(side_effect=[RuntimeError("boom"), None])
+    shard = Shard(
+        0,
+        "irc_token",
+        "nickname",
+        mock.AsyncMock(),
+        settings=TwitchSettings(reconnect_delay=0.0),
+        on_connect=on_connect,
+    )
+    first = (
+        asyncio.StreamReader(),
+        mock.Mock(wait_closed=mock.AsyncMock()),
+        mock.AsyncMock(),
+    )
+    first[0].feed_eof()
+    second = asyncio.StreamReader(), mock.Mock(), mock.AsyncMock()
+    opened = mock.AsyncMock(side_effect=[RuntimeError("boom"), second])
+
+    with mock.patch.object(Shard, "_open", opened):
+        task = asyncio.create_task(shard._supervise(first))
+        await asyncio.sleep(0.01)
+        assert not task.done()
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    assert on_connect.call_count == 2
+    assert shard.health.reconnects == 1
+
+
+async def test_anonymous_shard_logs_in_without_token(stream: mock.Mock) -> None:
+    shard = Shard(0, None, "justinfan12345", mock.AsyncMock())
+
+    with mock.patch.object(
+        asyncio, "open_connection", mock.AsyncMock(return_value=(mock.Mock(), stream))
+    ):
+        _, _, out = await shard._open()
+        await out.close()
+
+    assert shard.is_anonymous
+    stream.writelines.assert_called_once_with(
+        [b"NICK justinfan12345\r\nCAP REQ :twitch.tv/commands twitch.tv/tags\r\n"]
+    )
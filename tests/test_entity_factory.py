@@ -36,7 +36,7 @@ from dateutil.tz import tzutc
 
 import kasai
 from kasai.entity_factory import TwitchEntityFactoryImpl
-from kasai.users import BroadcasterType, UserType
+from kasai.users import BroadcasterType, PartialViewerImpl, UserType
 
 
 @pytest.fixture()
@@ -148,6 +148,26 @@ def test_deserialise_viewer(
     assert viewer.is_broadcaster == True
 
 
+def test_deserialise_partial_viewer(
+    entity_factory: TwitchEntityFactoryImpl, tags: dict[str, str]
+) -> None:
+    viewer = entity_factory.deserialize_twitch_partial_viewer("lovingt3s", tags)
+    assert isinstance(viewer, kasai.Viewer)
+    assert isinstance(viewer, PartialViewerImpl)
+
+    assert isinstance(viewer.app, kasai.GatewayBot)
+    assert viewer.display_name == "lovingt3s"
+    assert viewer.id == "713936733"
+    assert viewer.username == "lovingt3s"
+    assert not viewer.is_loaded
+
+    assert viewer.color == 255
+    assert viewer.is_mod == False
+    assert viewer.is_subscriber == False
+    assert viewer.is_turbo == False
+    assert viewer.is_broadcaster == True
+
+
 @pytest.fixture()
 def channel_payload() -> dict[str, t.Any]:
     return {
@@ -0,0 +1,155 @@
+# Copyright (c) 2022-present, Ethan Henderson
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+from __future__ import annotations
+
+import irctokens
+import pytest
+
+from kasai.irc import Decoder, Line, Tags, parse_badges, unescape_tag
+
+LINES = (
+    "PING :tmi.twitch.tv",
+    ":tmi.twitch.tv 002 twitchdev :Your host is tmi.twitch.tv",
+    ":twitchdev!twitchdev@twitchdev.tmi.twitch.tv JOIN #twitchdev",
+    "@emote-only=0;followers-only=-1;r9k=0;room-id=141981764;slow=0;subs-only=0 "
+    ":tmi.twitch.tv ROOMSTATE #twitchdev",
+    "@room-id=12345678;target-user-id=87654321;tmi-sent-ts=1642715756806 "
+    ":tmi.twitch.tv CLEARCHAT #dallas :ronni",
+    "@badge-info=;badges=broadcaster/1;color=#0000FF;display-name=lovingt3s;"
+    "emotes=62835:0-10;id=885196de-cb67-427a-baa8-82f9b0fcd05f;mod=0;"
+    "room-id=713936733;subscriber=0;tmi-sent-ts=1643904084794;turbo=0;"
+    "user-id=713936733;user-type= "
+    ":lovingt3s!lovingt3s@lovingt3s.tmi.twitch.tv PRIVMSG #lovingt3s "
+    ":bleedPurple :) hello : there",
+    "@msg-id=msg_ratelimit :tmi.twitch.tv NOTICE #twitchdev :Your message was "
+    "not sent because you are sending messages too quickly.",
+    "@system-msg=ronni\\shas\\ssubscribed\\:\\sfor\\s6\\smonths! "
+    ":tmi.twitch.tv USERNOTICE #dallas",
+)
+
+
+@pytest.mark.parametrize("raw", LINES)
+def test_parse_matches_irctokens(raw: str) -> None:
+    line = Line.parse(raw)
+    expected = irctokens.tokenise(raw)
+
+    assert line.tags == expected.tags
+    assert line.source == expected.source
+    assert line.command == expected.command
+    assert line.params == expected.params
+
+
+def test_hostmask() -> None:
+    line = Line.parse(":twitchdev!twitchdev@twitchdev.tmi.twitch.tv JOIN #twitchdev")
+    assert line.hostmask.nickname == "twitchdev"
+
+
+def test_tags_are_parsed_lazily() -> None:
+    line = Line.parse("@room-id=1 :tmi.twitch.tv ROOMSTATE #twitchdev")
+    assert line._tags is None
+    assert line.tags == {"room-id": "1"}
+    assert Line.parse("PING :tmi.twitch.tv").tags is None
+
+
+@pytest.mark.parametrize(
+    "raw,expected",
+    [
+        ("plain", "plain"),
+        ("a\\sb", "a b"),
+        ("a\\:b", "a;b"),
+        ("a\\\\b", "a\\b"),
+        ("a\\r\\nb", "a\r\nb"),
+        ("a\\xb", "axb"),
+        ("trailing\\", "trailing"),
+    ],
+)
+def test_unescape_tag(raw: str, expected: str) -> None:
+    assert unescape_tag(raw) == expected
+
+
+def test_decoder_buffers_partial_lines() -> None:
+    decoder = Decoder()
+
+    assert decoder.push(b"") is None
+    assert decoder.push(b"PING :tmi.twitch.tv\r") == []
+    lines = decoder.push(b"\n:tmi.twitch.tv 002 twitchdev :Your host")
+
+    assert lines is not None
+    assert [line.command for line in lines] == ["PING"]
+    assert decoder.pending() == b":tmi.twitch.tv 002 twitchdev :Your host"
+
+
+def test_decoder_splits_on_bare_lf() -> None:
+    lines = Decoder().push(b"PING :a\n:tmi.twitch.tv 002 twitchdev :b\r\n")
+
+    assert lines is not None
+    assert [line.params for line in lines] == [["a"], ["twitchdev", "b"]]
+
+
+@pytest.mark.parametrize("raw", ["@a=b", ":tmi.twitch.tv", "@a=b :tmi.twitch.tv"])
+def test_parse_lines_without_command(raw: str) -> None:
+    line = Line.parse(raw)
+
+    assert line.command == ""
+    assert line.params == []
+
+
+def test_tags_lookup() -> None:
+    tags = Tags("badges=broadcaster/1;color=;display-name=a\\sb;emote-only;mod=0")
+
+    assert tags["badges"] == "broadcaster/1"
+    assert tags["color"] == ""
+    assert tags["display-name"] == "a b"
+    assert tags["emote-only"] == ""
+    assert tags["mod"] == "0"
+    assert tags.get("bits", "0") == "0"
+    assert "mod" in tags
+    assert "od" not in tags
+
+    with pytest.raises(KeyError):
+        tags["bits"]
+
+
+def test_tags_are_split_on_first_access() -> None:
+    tags = Tags("a=1;b=x\\sy;c=3")
+    assert tags._values is None
+
+    assert tags["b"] == "x y"
+    assert tags._values == {"a": "1", "b": "x\\sy", "c": "3"}
+    assert dict(tags) == {"a": "1", "b": "x y", "c": "3"}
+    assert len(tags) == 3
+
+
+def test_parse_badges() -> None:
+    assert parse_badges("moderator/1,subscriber/12") == {
+        "moderator": "1",
+        "subscriber": "12",
+    }
+    assert parse_badges("") == {}
@@ -0,0 +1,132 @@
+# Copyright (c) 2022-present, Ethan Henderson
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+from __future__ import annotations
+
+import asyncio
+import typing as t
+
+import pytest
+
+from kasai.membership import ChannelReconciler
+
+
+class FakeScheduler:
+    def __init__(self) -> None:
+        self.futures: dict[tuple[str, str], asyncio.Future[bool]] = {}
+
+    def _add(
+        self, command: str, channels: t.Iterable[str]
+    ) -> list[asyncio.Future[bool]]:
+        loop = asyncio.get_running_loop()
+        futs = []
+
+        for channel in channels:
+            futs.append(fut := loop.create_future())
+            self.futures[(command, channel)] = fut
+
+        return futs
+
+    def join(self, channels: t.Iterable[str]) -> list[asyncio.Future[bool]]:
+        return self._add("JOIN", channels)
+
+    def part(self, channels: t.Iterable[str]) -> list[asyncio.Future[bool]]:
+        return self._add("PART", channels)
+
+
+@pytest.fixture()
+def scheduler() -> FakeScheduler:
+    return FakeScheduler()
+
+
+@pytest.fixture()
+def reconciler(scheduler: FakeScheduler) -> ChannelReconciler:
+    return ChannelReconciler(scheduler.join, scheduler.part)
+
+
+async def test_reconcile_joins_and_parts_differences(
+    scheduler: FakeScheduler, reconciler: ChannelReconciler
+) -> None:
+    reconciler.mark_joined("a")
+    reconciler.mark_joined("b")
+    reconciler.set_target(["#b", "c"])
+    reconciler.reconcile()
+
+    assert set(scheduler.futures) == {("JOIN", "c"), ("PART", "a")}
+    assert reconciler.pending == {"a", "c"}
+
+
+async def test_reconcile_skips_pending_channels(
+    scheduler: FakeScheduler, reconciler: ChannelReconciler
+) -> None:
+    reconciler.add(["a"])
+    fut = scheduler.futures[("JOIN", "a")]
+    reconciler.reconcile()
+
+    assert scheduler.futures[("JOIN", "a")] is fut
+
+
+async def test_add_returns_pending_join(
+    scheduler: FakeScheduler, reconciler: ChannelReconciler
+) -> None:
+    reconciler.set_target(["a"])
+    reconciler.reconcile()
+
+    assert reconciler.add(["a"]) == [scheduler.futures[("JOIN", "a")]]
+
+
+async def test_failed_joins_are_retried(
+    scheduler: FakeScheduler, reconciler: ChannelReconciler
+) -> None:
+    reconciler.add(["a"])
+    scheduler.futures.pop(("JOIN", "a")).set_result(False)
+    await asyncio.sleep(0)
+
+    assert reconciler.failed == {"a"}
+    assert not reconciler.pending
+
+    reconciler.reconcile()
+    assert ("JOIN", "a") in scheduler.futures
+
+    reconciler.mark_joined("a")
+    assert not reconciler.failed
+    assert "a" in reconciler
+
+
+async def test_source_sets_target(scheduler: FakeScheduler) -> None:
+    async def source() -> list[str]:
+        return ["a", "b"]
+
+    reconciler = ChannelReconciler(scheduler.join, scheduler.part, source=source)
+    reconciler.start()
+    await asyncio.sleep(0.01)
+    await reconciler.stop()
+
+    assert reconciler.target == {"a", "b"}
+    assert set(scheduler.futures) == {("JOIN", "a"), ("JOIN", "b")}
@@ -0,0 +1,441 @@
+# Copyright (c) 2022-present, Ethan Henderson
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+from __future__ import annotations
+
+import asyncio
+
+import mock
+import pytest
+from hikari.internal import time as time_
+
+import kasai
+from kasai.ratelimits import (
+    HelixBucket,
+    JoinProgress,
+    JoinScheduler,
+    MessageScheduler,
+    Priority,
+    WindowLimiter,
+    _vary,
+    build_lines,
+)
+
+
+def test_window_limiter() -> None:
+    limiter = WindowLimiter(2, 10.0)
+    assert limiter.delay(0.0) == 0.0
+
+    limiter.hit(0.0)
+    limiter.hit(1.0)
+    assert limiter.remaining(1.0) == 0
+    assert limiter.delay(1.0) == 9.0
+    assert limiter.delay(10.0) == 0.0
+    assert limiter.remaining(10.5) == 1
+
+
+async def test_scheduler_sends_in_order() -> None:
+    sent: list[bytes] = []
+
+    async def send(channel: str, payload: bytes) -> None:
+        sent.append(payload)
+
+    scheduler = MessageScheduler(send, channel_gap=0.0)
+    scheduler.start()
+    await asyncio.gather(*(scheduler.send("a", bytes([i])) for i in range(5)))
+    await scheduler.stop()
+
+    assert sent == [bytes([i]) for i in range(5)]
+    assert scheduler.sent == 5
+    assert scheduler.depth == 0
+
+
+async def test_scheduler_queues_over_limit() -> None:
+    sent: list[bytes] = []
+
+    async def send(channel: str, payload: bytes) -> None:
+        sent.append(payload)
+
+    scheduler = MessageScheduler(send, limit=2, period=0.05, channel_gap=0.0)
+    scheduler.start()
+    waits = await asyncio.gather(*(scheduler.send("a", b"x") for _ in range(3)))
+    await scheduler.stop()
+
+    assert len(sent) == 3
+    assert max(waits[:2]) < 0.04
+    assert waits[2] >= 0.04
+    assert scheduler.max_wait == waits[2]
+
+
+async def test_scheduler_channel_gap_does_not_block_other_channels() -> None:
+    sent: list[bytes] = []
+
+    async def send(channel: str, payload: bytes) -> None:
+        sent.append(payload)
+
+    scheduler = MessageScheduler(send, channel_gap=0.05)
+    scheduler.start()
+    await asyncio.gather(
+        scheduler.send("a", b"a1"),
+        scheduler.send("a", b"a2"),
+        scheduler.send("b", b"b1"),
+    )
+    await scheduler.stop()
+
+    assert sent == [b"a1", b"b1", b"a2"]
+
+
+async def test_scheduler_elevated_channels_skip_normal_limit() -> None:
+    sent: list[bytes] = []
+
+    async def send(channel: str, payload: bytes) -> None:
+        sent.append(payload)
+
+    scheduler = MessageScheduler(
+        send, limit=1, period=60.0, is_elevated=lambda c: c == "mod"
+    )
+    scheduler.start()
+    await scheduler.send("a", b"a")
+    await asyncio.gather(*(scheduler.send("mod", b"m") for _ in range(3)))
+    await scheduler.stop()
+
+    assert sent == [b"a", b"m", b"m", b"m"]
+
+
+async def test_scheduler_stop_fails_queued_messages() -> None:
+    async def send(channel: str, payload: bytes) -> None:
+        ...
+
+    scheduler = MessageScheduler(send, limit=1, period=60.0)
+    scheduler.start()
+    await scheduler.send("a", b"a")
+    task = asyncio.create_task(scheduler.send("a", b"b"))
+    await asyncio.sleep(0)
+    await scheduler.stop()
+
+    with pytest.raises(kasai.NotAlive):
+        await task
+
+
+def test_vary_toggles_suffix() -> None:
+    varied = _vary(b"PRIVMSG #a :hi\r\n")
+    assert varied != b"PRIVMSG #a :hi\r\n"
+    assert varied.endswith(b"\r\n")
+    assert _vary(varied) == b"PRIVMSG #a :hi\r\n"
+
+
+async def test_scheduler_retries_rejected_messages_in_order() -> None:
+    sent: list[bytes] = []
+
+    async def send(channel: str, payload: bytes) -> None:
+        sent.append(payload)
+
+    scheduler = MessageScheduler(send, channel_gap=0.0, backoff=0.01)
+    scheduler.start()
+    await scheduler.send("a", b"1\r\n")
+    assert scheduler.reject("a", "msg_ratelimit")
+    await scheduler.send("a", b"2\r\n")
+    scheduler.confirm("a")
+    scheduler.confirm("a")
+    await scheduler.stop()
+
+    assert sent == [b"1\r\n", b"1\r\n", b"2\r\n"]
+    assert scheduler.retries == 1
+    assert not scheduler._unconfirmed
+
+
+async def test_scheduler_resends_back_to_back_rejections_in_order() -> None:
+    sent: list[bytes] = []
+
+    async def send(channel: str, payload: bytes) -> None:
+        sent.append(payload)
+
+    scheduler = MessageScheduler(send, channel_gap=0.0)
+    scheduler.start()
+    await asyncio.gather(*(scheduler.send("a", m) for m in (b"A\r\n", b"B\r\n")))
+    await scheduler.send("a", b"C\r\n")
+    assert scheduler.reject("a", "msg_slowmode", retry_after=0)
+    assert scheduler.reject("a", "msg_slowmode", retry_after=0)
+    await scheduler.send("a", b"D\r\n")
+    await scheduler.stop()
+
+    assert sent == [b"A\r\n", b"B\r\n", b"C\r\n", b"A\r\n", b"B\r\n", b"D\r\n"]
+    assert not scheduler._requeued
+
+
+async def test_scheduler_drops_messages_rejected_for_other_reasons() -> None:
+    sent: list[bytes] = []
+
+    async def send(channel: str, payload: bytes) -> None:
+        sent.append(payload)
+
+    scheduler = MessageScheduler(send, channel_gap=0.0, backoff=0.01)
+    scheduler.start()
+    await scheduler.send("a", b"A\r\n")
+    assert not scheduler.reject("a", "msg_followersonly")
+    await scheduler.send("a", b"B\r\n")
+    scheduler.confirm("a")
+    await scheduler.send("a", b"C\r\n")
+    assert scheduler.reject("a", "msg_ratelimit")
+    await scheduler.send("a", b"D\r\n")
+    await scheduler.stop()
+
+    assert sent == [b"A\r\n", b"B\r\n", b"C\r\n", b"C\r\n", b"D\r\n"]
+
+
+async def test_scheduler_varies_duplicate_messages() -> None:
+    sent: list[bytes] = []
+
+    async def send(channel: str, payload: bytes) -> None:
+        sent.append(payload)
+
+    scheduler = MessageScheduler(send, channel_gap=0.0)
+    scheduler.start()
+    await scheduler.send("a", b"hi\r\n")
+    assert scheduler.reject("a", "msg_duplicate")
+    await asyncio.sleep(0.01)
+    await scheduler.stop()
+
+    assert sent == [b"hi\r\n", _vary(b"hi\r\n")]
+
+
+async def test_scheduler_does_not_retry_other_notices() -> None:
+    async def send(channel: str, payload: bytes) -> None:
+        ...
+
+    scheduler = MessageScheduler(send)
+    scheduler.start()
+    await scheduler.send("a", b"hi\r\n")
+    assert not scheduler.reject("a", "msg_banned")
+    assert not scheduler.reject("b", "msg_ratelimit")
+    await scheduler.stop()
+
+
+def test_scheduler_slow_mode() -> None:
+    scheduler = MessageScheduler(mock.AsyncMock(), channel_gap=1.0)
+    scheduler.set_slow_mode("a", 30)
+    assert scheduler._slow == {"a": 30}
+    scheduler.set_slow_mode("a", 0)
+    assert scheduler._slow == {}
+
+
+def test_build_lines_splits_long_lists() -> None:
+    channels = [f"channel{i:04}" for i in range(100)]
+    lines = build_lines("JOIN", channels)
+
+    assert len(lines) > 1
+    assert all(len(line) <= 512 and line.endswith(b"\r\n") for line in lines)
+    assert b",".join(line[5:-2] for line in lines) == b",".join(
+        f"#{c}".encode() for c in channels
+    )
+    assert build_lines("PART", ()) == []
+
+
+async def test_join_scheduler_paces_joins() -> None:
+    sent: list[bytes] = []
+
+    async def send(line: bytes) -> None:
+        sent.append(line)
+
+    joins = JoinScheduler(send, limit=2, period=0.05)
+    joins.start()
+    futs = joins.join(("a", "b", "c"))
+    await asyncio.sleep(0.01)
+
+    assert sent == [b"JOIN #a,#b\r\n"]
+    assert joins.progress == JoinProgress(queued=1, pending=2, confirmed=0, failed=0)
+
+    await asyncio.sleep(0.06)
+    assert sent == [b"JOIN #a,#b\r\n", b"JOIN #c\r\n"]
+
+    for channel in "abc":
+        joins.confirm("JOIN", channel)
+
+    assert [f.result() for f in futs] == [True, True, True]
+    assert joins.progress.confirmed == 3
+    await joins.stop()
+
+
+async def test_join_scheduler_does_not_limit_parts() -> None:
+    sent: list[bytes] = []
+
+    async def send(line: bytes) -> None:
+        sent.append(line)
+
+    joins = JoinScheduler(send, limit=1, period=60.0)
+    joins.start()
+    joins.part(("a", "b", "c"))
+    await asyncio.sleep(0.01)
+    await joins.stop()
+
+    assert sent == [b"PART #a,#b,#c\r\n"]
+
+
+async def test_join_scheduler_times_out_unconfirmed_joins() -> None:
+    joins = JoinScheduler(mock.AsyncMock(), timeout=0.01)
+    joins.start()
+    (fut,) = joins.join(("a",))
+
+    assert not await fut
+    assert joins.progress.failed == 1
+    await joins.stop()
+
+
+async def test_join_scheduler_progress_skips_resolved_keys() -> None:
+    joins = JoinScheduler(mock.AsyncMock())
+    joins.join(("a", "b"))
+    joins.confirm("JOIN", "a")
+
+    assert joins.progress == JoinProgress(queued=1, pending=0, confirmed=1, failed=0)
+    await joins.stop()
+
+
+async def test_join_scheduler_reset_requeues_unconfirmed_joins() -> None:
+    joins = JoinScheduler(mock.AsyncMock())
+    joins.start()
+    join_futs = joins.join(("a", "b"))
+    (part_fut,) = joins.part(("c",))
+    await asyncio.sleep(0.01)
+    joins.confirm("JOIN", "a")
+    await joins.reset()
+
+    assert list(joins._queue) == [("JOIN", "b")]
+    assert part_fut.result()
+    assert join_futs[0].result()
+    assert not join_futs[1].done()
+    assert not joins.is_running
+    await joins.stop()
+
+
+def headers(remaining: int, reset_after: float) -> dict[str, str]:
+    reset = time_.utc_datetime().timestamp() + reset_after
+    return {
+        "Ratelimit-Limit": "800",
+        "Ratelimit-Remaining": f"{remaining}",
+        "Ratelimit-Reset": f"{reset}",
+    }
+
+
+async def test_helix_bucket_tracks_headers() -> None:
+    bucket = HelixBucket()
+    await bucket.acquire()
+    await bucket.acquire()
+    assert bucket.remaining == 798
+
+    bucket.update(headers(500, 60))
+    assert bucket.remaining == 499
+    assert 59 < bucket.reset_after <= 60
+
+
+async def test_helix_bucket_queues_until_reset() -> None:
+    bucket = HelixBucket()
+    await bucket.acquire()
+    bucket.update(headers(0, 0.05))
+
+    waiter = asyncio.create_task(bucket.acquire())
+    await asyncio.sleep(0)
+    assert bucket.depth == 1
+    assert not waiter.done()
+
+    await asyncio.wait_for(waiter, 1)
+    assert bucket.depth == 0
+    assert bucket.remaining == 799
+
+
+async def test_helix_bucket_returns_points_to_cancelled_callers() -> None:
+    bucket = HelixBucket(limit=1)
+    await bucket.acquire()
+
+    waiter = asyncio.create_task(bucket.acquire())
+    await asyncio.sleep(0)
+    bucket.release()
+    waiter.cancel()
+
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    assert bucket.remaining == 1
+    await asyncio.wait_for(bucket.acquire(), 1)
+
+
+async def test_helix_bucket_drops_cancelled_waiters() -> None:
+    bucket = HelixBucket(limit=1)
+    await bucket.acquire()
+
+    waiter = asyncio.create_task(bucket.acquire())
+    await asyncio.sleep(0)
+    waiter.cancel()
+
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    assert bucket.depth == 0
+    assert not any(bucket._waiters.values())
+
+
+async def test_helix_bucket_stop_fails_waiters() -> None:
+    bucket = HelixBucket()
+    await bucket.acquire()
+    bucket.update(headers(0, 60))
+
+    waiter = asyncio.create_task(bucket.acquire())
+    await asyncio.sleep(0)
+    bucket.stop()
+
+    with pytest.raises(kasai.NotAlive):
+        await waiter
+
+
+async def test_helix_bucket_prefers_interactive_requests() -> None:
+    bucket = HelixBucket(background_share=0.25)
+    await bucket.acquire()
+    bucket.update(headers(0, 60))
+    order: list[Priority] = []
+
+    async def acquire(priority: Priority) -> None:
+        await bucket.acquire(priority)
+        order.append(priority)
+
+    tasks = [
+        asyncio.create_task(acquire(p))
+        for p in [Priority.BACKGROUND] * 4 + [Priority.INTERACTIVE] * 8
+    ]
+    await asyncio.sleep(0)
+    assert bucket.queued(Priority.BACKGROUND) == 4
+    assert bucket.queued(Priority.INTERACTIVE) == 8
+
+    bucket.update(headers(8, 60))
+    await asyncio.sleep(0)
+
+    assert order == [Priority.INTERACTIVE] * 3 + [Priority.BACKGROUND] + [
+        Priority.INTERACTIVE
+    ] * 3 + [Priority.BACKGROUND]
+
+    bucket.stop()
+    await asyncio.gather(*tasks, return_exceptions=True)
@@ -28,16 +28,30 @@
 
 from __future__ import annotations
 
+import asyncio
 import re
+import typing as t
 
+import mock
 import pytest
 from irctokens.stateful import StatefulDecoder
 
 import kasai
+from kasai.connection import LineWriter
+from kasai.errors import NotFound
+from kasai.irc import Decoder, Line
 
 _NICK_PATTERN = re.compile(r"[a-f0-9]{7}")
 
 
+def connect(shard: kasai.Shard) -> mock.Mock:
+    writer = mock.Mock(drain=mock.AsyncMock(), is_closing=mock.Mock(return_value=False))
+    shard._writer = writer
+    shard._out = LineWriter(writer)
+    shard._out.start()
+    return writer
+
+
 @pytest.fixture()
 def client() -> kasai.TwitchClient:
     app = kasai.GatewayBot("token", "irc_token", "client_id", "client_secret")
@@ -48,14 +62,21 @@ def test_initial_attributes(client: kasai.TwitchClient) -> None:
     assert client._irc_token == "irc_token"
     assert client._client_id == "client_id"
     assert client._client_secret == "client_secret"
-    assert client._api_token is None
+    assert client.app_token.token is None
     assert client._session is None
     assert _NICK_PATTERN.match(client._nickname)
-    assert client._channels == []
-    assert client._reader is None
-    assert client._writer is None
-    assert client._task is None
-    assert isinstance(client._d, StatefulDecoder)
+    assert client.channels.joined == frozenset()
+    assert len(client.shards) == 1
+    assert not client.shards[0].is_connected
+    assert isinstance(client.shards[0]._d, StatefulDecoder)
+    assert client.queue_depth == 0
+    assert client.dropped_lines == 0
+    assert client.message_scheduler.depth == 0
+
+
+def test_settings_property(client: kasai.TwitchClient) -> None:
+    assert isinstance(client.settings, kasai.TwitchSettings)
+    assert not client.settings.partial_viewers
 
 
 def test_initial_is_alive_property(client: kasai.TwitchClient) -> None:
@@ -78,3 +99,578 @@ def test_transform_tags(client: kasai.TwitchClient) -> None:
         "target-user-id": "87654321",
         "tmi-sent-ts": "1642715756806",
     }
+
+
+@pytest.fixture()
+def user_payload() -> dict[str, t.Any]:
+    return {
+        "id": "141981764",
+        "login": "twitchdev",
+        "display_name": "TwitchDev",
+        "type": "",
+        "broadcaster_type": "partner",
+        "description": "Supporting third-party developers building Twitch integrations from chatbots to game integrations.",
+        "profile_image_url": "https://static-cdn.jtvnw.net/jtv_user_pictures/8a6381c7-d0c0-4576-b179-38bd5ce1d6af-profile_image-300x300.png",
+        "offline_image_url": "https://static-cdn.jtvnw.net/jtv_user_pictures/3f13ab61-ec78-4fe6-8481-8682cb3b0ac2-channel_offline_image-1920x1080.png",
+        "view_count": 5980557,
+        "created_at": "2016-12-14T20:32:28Z",
+    }
+
+
+async def test_fetch_user_uses_cache(
+    client: kasai.TwitchClient, user_payload: dict[str, t.Any]
+) -> None:
+    with mock.patch.object(
+        kasai.TwitchClient, "_request", mock.AsyncMock(return_value=[user_payload])
+    ) as request:
+        user1 = await client.fetch_user("141981764")
+        user2 = await client.fetch_user("twitchdev")
+        request.assert_awaited_once()
+
+    assert user1 == user2
+    assert client.user_cache.hits == 1
+    assert client.user_cache.misses == 1
+
+
+async def test_fetch_user_bypasses_cache(
+    client: kasai.TwitchClient, user_payload: dict[str, t.Any]
+) -> None:
+    with mock.patch.object(
+        kasai.TwitchClient, "_request", mock.AsyncMock(return_value=[user_payload])
+    ) as request:
+        await client.fetch_user("141981764")
+        await client.fetch_user("141981764", use_cache=False)
+        assert request.await_count == 2
+
+
+async def test_fetch_room_reuses_cached_channel(client: kasai.TwitchClient) -> None:
+    channel = mock.Mock(spec=kasai.Channel)
+
+    with mock.patch.object(
+        kasai.TwitchClient, "fetch_channel", mock.AsyncMock(return_value=channel)
+    ) as fetch_channel:
+        assert await client._fetch_room("141981764") is channel
+        assert await client._fetch_room("141981764") is channel
+        fetch_channel.assert_awaited_once_with("141981764")
+
+        await client._fetch_room("141981764", force=True)
+        assert fetch_channel.await_count == 2
+
+    assert client.get_channel("141981764") is channel
+    assert client.get_channel("12826") is None
+    assert client._rooms.hits == 1
+    assert client._rooms.misses == 1
+
+
+async def test_request_coalesces_identical_gets(client: kasai.TwitchClient) -> None:
+    async def send_request(*args: t.Any, **kwargs: t.Any) -> list[dict[str, str]]:
+        await asyncio.sleep(0.01)
+        return [{"id": "141981764"}]
+
+    with mock.patch.object(
+        kasai.TwitchClient, "_send_request", mock.AsyncMock(side_effect=send_request)
+    ) as send:
+        results = await asyncio.gather(
+            client._request("GET", "users", options={"id": ["141981764"]}),
+            client._request("GET", "users", options={"id": ["141981764"]}),
+            client._request("GET", "users", options={"id": ["12826"]}),
+        )
+        assert send.await_count == 2
+
+    assert results[0] == results[1] == [{"id": "141981764"}]
+    assert client._inflight == {}
+
+
+async def test_request_does_not_coalesce_across_priorities(
+    client: kasai.TwitchClient,
+) -> None:
+    async def send_request(*args: t.Any, **kwargs: t.Any) -> list[dict[str, str]]:
+        await asyncio.sleep(0.01)
+        return []
+
+    with mock.patch.object(
+        kasai.TwitchClient, "_send_request", mock.AsyncMock(side_effect=send_request)
+    ) as send:
+        await asyncio.gather(
+            client._request(
+                "GET", "users", options={}, priority=kasai.Priority.BACKGROUND
+            ),
+            client._request("GET", "users", options={}),
+        )
+
+    assert [c.kwargs["priority"] for c in send.await_args_list] == [
+        kasai.Priority.BACKGROUND,
+        kasai.Priority.INTERACTIVE,
+    ]
+
+
+async def test_request_does_not_coalesce_posts(client: kasai.TwitchClient) -> None:
+    with mock.patch.object(
+        kasai.TwitchClient, "_send_request", mock.AsyncMock(return_value=[])
+    ) as send:
+        await asyncio.gather(
+            client._request("POST", "", auth=True, options={}),
+            client._request("POST", "", auth=True, options={}),
+        )
+        assert send.await_count == 2
+
+
+async def test_fetch_user_batches_lookups(user_payload: dict[str, t.Any]) -> None:
+    app = kasai.GatewayBot("token", "irc_token", "client_id", "client_secret")
+    client = kasai.TwitchClient(
+        app,
+        "irc_token",
+        "client_id",
+        "client_secret",
+        settings=kasai.TwitchSettings(user_batch_window=0.01),
+    )
+
+    with mock.patch.object(
+        kasai.TwitchClient, "_request", mock.AsyncMock(return_value=[user_payload])
+    ) as request:
+        users = await asyncio.gather(
+            client.fetch_user("141981764"),
+            client.fetch_user("TwitchDev"),
+            client.fetch_user("nobody"),
+            return_exceptions=True,
+        )
+        request.assert_awaited_once_with(
+            "GET",
+            "users",
+            options={"id": ["141981764"], "login": ["twitchdev", "nobody"]},
+            priority=kasai.Priority.INTERACTIVE,
+        )
+
+    assert users[0] == users[1]
+    assert isinstance(users[2], NotFound)
+
+
+async def test_fetch_users_chunks_requests(client: kasai.TwitchClient) -> None:
+    ids = [str(i) for i in range(1, 251)]
+
+    def user_payload_for(i: str) -> dict[str, t.Any]:
+        return {
+            "display_name": f"User{i}",
+            "type": "",
+            "broadcaster_type": "",
+            "description": "",
+            "profile_image_url": "",
+            "offline_image_url": "",
+            "created_at": "2016-12-14T20:32:28Z",
+        }
+
+    async def request(
+        *args: t.Any, options: dict[str, list[str]], priority: kasai.Priority
+    ) -> t.Any:
+        assert priority is kasai.Priority.BACKGROUND
+        return [
+            {**user_payload_for(i), "id": i, "login": f"user{i}"}
+            for i in options["id"]
+            if i != "7"
+        ]
+
+    with mock.patch.object(
+        kasai.TwitchClient, "_request", mock.AsyncMock(side_effect=request)
+    ) as req:
+        res = await client.fetch_users([*ids, "1"])
+        assert req.await_count == 3
+
+    assert len(res) == 249
+    assert res["250"].username == "user250"
+    assert res.missing == ["7"]
+    assert client.user_cache.get("user1") is not None
+
+
+async def test_fetch_streams_reports_offline_channels(
+    client: kasai.TwitchClient,
+) -> None:
+    payload = {
+        "id": "40944942733",
+        "user_id": "67931625",
+        "user_login": "amar",
+        "user_name": "Amar",
+        "game_id": "33214",
+        "game_name": "Fortnite",
+        "type": "live",
+        "title": "Stream",
+        "viewer_count": 14944,
+        "started_at": "2021-03-09T16:59:39Z",
+        "language": "de",
+        "thumbnail_url": "",
+        "is_mature": False,
+    }
+
+    with mock.patch.object(
+        kasai.TwitchClient, "_request", mock.AsyncMock(return_value=[payload])
+    ) as req:
+        res = await client.fetch_streams(["Amar", "twitchdev"])
+        req.assert_awaited_once_with(
+            "GET",
+            "streams",
+            options={"first": ["100"], "user_login": ["amar", "twitchdev"]},
+            priority=kasai.Priority.BACKGROUND,
+        )
+
+    assert res["67931625"].viewer_count == 14944
+    assert res.missing == ["twitchdev"]
+
+
+async def test_on_line_keys_lines_by_channel(client: kasai.TwitchClient) -> None:
+    with mock.patch.object(kasai.WorkQueue, "put", mock.AsyncMock()) as put:
+        with mock.patch.object(kasai.GatewayBot, "dispatch") as dispatch:
+            await client._on_line(Line.parse("@room-id=1 ROOMSTATE #twitchdev"))
+            await client._on_line(Line.parse("PING :tmi.twitch.tv"))
+            await client._on_line(Line.parse(":tmi.twitch.tv 002 twitchdev :hi"))
+
+    assert [c.args[0].command for c in put.await_args_list] == ["ROOMSTATE", "002"]
+    assert put.await_args_list[0].kwargs == {"key": "#twitchdev"}
+    assert put.await_args_list[1].kwargs == {"key": None}
+    assert isinstance(dispatch.call_args.args[0], kasai.PingEvent)
+
+
+def test_fast_irc_parser_setting() -> None:
+    app = kasai.GatewayBot("token", "irc_token", "client_id", "client_secret")
+    client = kasai.TwitchClient(
+        app,
+        "irc_token",
+        "client_id",
+        "client_secret",
+        settings=kasai.TwitchSettings(fast_irc_parser=True),
+    )
+    assert isinstance(client.shards[0]._d, Decoder)
+
+
+async def test_create_message_goes_through_scheduler(
+    client: kasai.TwitchClient,
+) -> None:
+    writer = connect(client.shards[0])
+    client._assign("twitchdev")
+    client._membership.mark_joined("twitchdev")
+    client.message_scheduler.start()
+    await client.create_message("#twitchdev", "hello", reply_to="abc")
+    await client.message_scheduler.stop()
+    await client.shards[0]._out.close()
+
+    writer.writelines.assert_called_once_with(
+        [b"@reply-parent-msg-id=abc PRIVMSG #twitchdev :hello\r\n"]
+    )
+    assert client.message_scheduler.sent == 1
+
+
+async def test_create_message_requires_joined_channel(
+    client: kasai.TwitchClient,
+) -> None:
+    connect(client.shards[0])
+
+    with pytest.raises(kasai.NotJoined):
+        await client.create_message("twitchdev", "hello")
+
+
+async def test_userstate_tracks_elevated_channels(client: kasai.TwitchClient) -> None:
+    await client._handle_line(
+        Line.parse("@badges=moderator/1;mod=1 :tmi.twitch.tv USERSTATE #twitchdev")
+    )
+    await client._handle_line(
+        Line.parse("@badges=subscriber/6 :tmi.twitch.tv USERSTATE #twitch")
+    )
+    await client._handle_line(
+        Line.parse("@badges=glhf-pledge/1 :tmi.twitch.tv GLOBALUSERSTATE")
+    )
+
+    assert client._is_elevated("twitchdev")
+    assert not client._is_elevated("twitch")
+    assert client.get_badges("#twitchdev") == {"moderator": "1"}
+    assert client.get_badges() == {"glhf-pledge": "1"}
+
+
+async def test_notice_rejects_last_message(client: kasai.TwitchClient) -> None:
+    with mock.patch.object(
+        kasai.MessageScheduler, "reject", mock.Mock(return_value=True)
+    ) as reject:
+        await client._handle_line(
+            Line.parse(
+                "@msg-id=msg_slowmode :tmi.twitch.tv NOTICE #twitchdev :This room "
+                "is in slow mode and you are sending messages too quickly. You "
+                "will be able to talk again in 5 seconds."
+            )
+        )
+
+    reject.assert_called_once_with("twitchdev", "msg_slowmode", retry_after=5)
+
+
+async def test_roomstate_sets_slow_mode(client: kasai.TwitchClient) -> None:
+    await client._handle_line(
+        Line.parse("@room-id=12345;slow=10 :tmi.twitch.tv ROOMSTATE #twitchdev")
+    )
+
+    assert client.message_scheduler._slow == {"twitchdev": 10}
+
+
+async def test_partial_roomstate_is_merged(client: kasai.TwitchClient) -> None:
+    with mock.patch.object(kasai.TwitchClient, "_fetch_room", mock.AsyncMock()):
+        with mock.patch.object(kasai.GatewayBot, "dispatch"):
+            await client._handle_line(
+                Line.parse(
+                    "@emote-only=0;room-id=12345;slow=0;subs-only=0 "
+                    ":tmi.twitch.tv ROOMSTATE #twitchdev"
+                )
+            )
+    await client._handle_line(
+        Line.parse("@room-id=12345;subs-only=1 :tmi.twitch.tv ROOMSTATE #twitchdev")
+    )
+
+    assert client.get_room_state("#twitchdev") == {
+        "emote-only": "0",
+        "room-id": "12345",
+        "slow": "0",
+        "subs-only": "1",
+    }
+
+
+async def test_join_goes_through_scheduler(client: kasai.TwitchClient) -> None:
+    connect(client.shards[0])
+    client._membership.mark_joined("twitch")
+
+    await client.join("#twitch", "twitchdev")
+
+    assert list(client.shards[0].joins._queue) == [("JOIN", "twitchdev")]
+    assert client.channels.target == {"twitch", "twitchdev"}
+
+
+async def test_join_confirms_scheduled_join(client: kasai.TwitchClient) -> None:
+    client._assign("twitch")
+
+    with mock.patch.object(kasai.JoinScheduler, "confirm", mock.Mock()) as confirm:
+        await client._handle_line(Line.parse(":me!me@me.tmi.twitch.tv JOIN #twitch"))
+
+    confirm.assert_called_once_with("JOIN", "twitch")
+    assert "twitch" in client.channels
+
+
+def test_fixed_shard_count_spreads_channels() -> None:
+    app = kasai.GatewayBot("token", "irc_token", "client_id", "client_secret")
+    client = kasai.TwitchClient(
+        app,
+        "irc_token",
+        "client_id",
+        "client_secret",
+        settings=kasai.TwitchSettings(shard_count=4),
+    )
+    shards = {client._assign(f"channel{i}") for i in range(100)}
+
+    assert len(client.shards) == 4
+    assert len(shards) == 4
+    assert client._assign("channel0") is client._assign("channel0")
+    assert sum(s.health.channels for s in client.shards) == 100
+
+
+def test_automatic_shards_are_added_when_full() -> None:
+    app = kasai.GatewayBot("token", "irc_token", "client_id", "client_secret")
+    client = kasai.TwitchClient(
+        app,
+        "irc_token",
+        "client_id",
+        "client_secret",
+        settings=kasai.TwitchSettings(channels_per_shard=10, shard_count=50),
+    )
+    for i in range(25):
+        client._assign(f"channel{i}")
+
+    assert [len(s.channels) for s in client.shards] == [10, 10, 5]
+
+
+async def test_shard_reconnect_rejoins_channels(client: kasai.TwitchClient) -> None:
+    shard = client.shards[0]
+    client.set_channels(["twitch"])
+    client._assign("twitch")
+    client._membership.mark_joined("twitch")
+
+    with mock.patch.object(kasai.GatewayBot, "dispatch") as dispatch:
+        client._on_shard_disconnect(shard, False)
+        assert "twitch" not in client.channels
+
+        client._on_shard_connect(shard, 1.5)
+
+    assert list(shard.joins._queue) == [("JOIN", "twitch")]
+    events = [c.args[0] for c in dispatch.call_args_list]
+    assert isinstance(events[0], kasai.ShardDisconnectEvent)
+    assert isinstance(events[1], kasai.ShardConnectEvent)
+    assert events[1].downtime == 1.5
+
+
+async def test_anonymous_reads_send_through_own_shard() -> None:
+    app = kasai.GatewayBot("token", "irc_token", "client_id", "client_secret")
+    client = kasai.TwitchClient(
+        app,
+        "irc_token",
+        "client_id",
+        "client_secret",
+        settings=kasai.TwitchSettings(anonymous_reads=True, shard_count=2),
+    )
+    sender, *readers = client.shards
+    writer = connect(sender)
+
+    assert not sender.is_anonymous
+    assert all(s.is_anonymous for s in readers)
+    assert client._assign("twitchdev") in readers
+
+    await client._send_payload("twitchdev", b"PRIVMSG #twitchdev :hello\r\n")
+    await sender._out.close()
+
+    writer.writelines.assert_called_once_with([b"PRIVMSG #twitchdev :hello\r\n"])
+
+
+async def test_anonymous_lines_do_not_overwrite_state(
+    client: kasai.TwitchClient,
+) -> None:
+    with mock.patch.object(kasai.TwitchClient, "_on_line") as on_line:
+        await client._on_anonymous_line(
+            Line.parse("@badges= :tmi.twitch.tv USERSTATE #twitchdev")
+        )
+        await client._on_anonymous_line(Line.parse(":tmi.twitch.tv 002 justinfan1 :x"))
+        await client._on_anonymous_line(
+            Line.parse(":me!me@me.tmi.twitch.tv PRIVMSG #twitchdev :hi")
+        )
+
+    on_line.assert_awaited_once()
+
+
+def response(status: int, body: dict[str, t.Any]) -> mock.MagicMock:
+    resp = mock.Mock(
+        status=status,
+        ok=status < 400,
+        headers={
+            "Ratelimit-Limit": "800",
+            "Ratelimit-Remaining": "0" if status == 429 else "799",
+            "Ratelimit-Reset": "0",
+        },
+        json=mock.AsyncMock(return_value=body),
+    )
+    ctx = mock.MagicMock()
+    ctx.__aenter__.return_value = resp
+    return ctx
+
+
+async def test_send_request_retries_when_rate_limited(
+    client: kasai.TwitchClient,
+) -> None:
+    client._session = mock.Mock(
+        request=mock.Mock(
+            side_effect=[
+                response(429, {"status": 429, "message": "Too Many Requests"}),
+                response(200, {"data": [{"id": "141981764"}]}),
+            ]
+        )
+    )
+
+    res = await client._send_request("GET", "users", options={})
+
+    assert res == [{"id": "141981764"}]
+    assert client.api_ratelimit.retries == 1
+    assert client.api_ratelimit.remaining == 799
+
+
+async def test_rejected_token_is_refreshed_once(client: kasai.TwitchClient) -> None:
+    client._session = mock.Mock(
+        request=mock.Mock(
+            side_effect=[
+                response(401, {"status": 401, "message": "Invalid OAuth token"}),
+                response(401, {"status": 401, "message": "Invalid OAuth token"}),
+                response(200, {"data": [{"id": "141981764"}]}),
+                response(200, {"data": [{"id": "12826"}]}),
+            ]
+        )
+    )
+
+    with mock.patch.object(
+        client.app_token,
+        "_fetch",
+        mock.AsyncMock(return_value={"access_token": "new", "expires_in": 3600}),
+    ) as fetch:
+        res = await asyncio.gather(
+            client._send_request("GET", "users", options={"id": ["141981764"]}),
+            client._send_request("GET", "users", options={"id": ["12826"]}),
+        )
+
+    fetch.assert_awaited_once()
+    assert res == [[{"id": "141981764"}], [{"id": "12826"}]]
+    headers = client._session.request.call_args.kwargs["headers"]
+    assert headers["Authorization"] == "Bearer new"
+
+
+async def test_requests_are_spread_across_credentials() -> None:
+    app = kasai.GatewayBot("token", "irc_token", "client_id", "client_secret")
+    client = kasai.TwitchClient(
+        app,
+        "irc_token",
+        "client_id",
+        "client_secret",
+        credentials=[("client_id", "client_secret"), ("other_id", "other_secret")],
+    )
+    first, second = client.credentials
+    client._session = mock.Mock(
+        request=mock.Mock(side_effect=lambda *a, **kw: response(200, {"data": []}))
+    )
+
+    await first.bucket.acquire()
+    await client._send_request("GET", "users", options={})
+
+    headers = client._session.request.call_args.kwargs["headers"]
+    assert headers["Client-Id"] == "other_id"
+    assert first.utilization > 0
+    assert second.bucket.remaining == 799
+
+
+async def test_duplicate_credentials_keep_the_first_secret() -> None:
+    app = kasai.GatewayBot("token", "irc_token", "client_id", "client_secret")
+    client = kasai.TwitchClient(
+        app,
+        "irc_token",
+        "client_id",
+        "client_secret",
+        credentials=[("client_id", "other_secret"), ("other_id", "other_secret")],
+    )
+
+    assert [(c.client_id, c.client_secret) for c in client.credentials] == [
+        ("client_id", "client_secret"),
+        ("other_id", "other_secret"),
+    ]
+
+
+async def test_new_session_uses_connection_settings() -> None:
+    app = kasai.GatewayBot("token", "irc_token", "client_id", "client_secret")
+    client = kasai.TwitchClient(
+        app,
+        "irc_token",
+        "client_id",
+        "client_secret",
+        settings=kasai.TwitchSettings(connection_limit=10, request_timeout=5.0),
+    )
+    session = client._new_session()
+
+    try:
+        assert session.connector is not None
+        assert session.connector.limit == 10
+        assert session.timeout.total == 5.0
+        assert session.timeout.connect == 10.0
+    finally:
+        await session.close()
+
+
+async def test_injected_session_is_not_closed() -> None:
+    session = mock.Mock(closed=False, close=mock.AsyncMock())
+    app = kasai.GatewayBot("token", "irc_token", "client_id", "client_secret")
+    client = kasai.TwitchClient(
+        app, "irc_token", "client_id", "client_secret", session=session
+    )
+
+    with mock.patch.object(kasai.AppToken, "refresh", mock.AsyncMock()):
+        with mock.patch.object(kasai.AppToken, "start"):
+            await client._start_api()
+
+    assert client._session is session
+    client._work.start()
+    await client.close()
+
+    session.close.assert_not_awaited()
+    assert not client.is_alive
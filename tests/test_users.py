@@ -30,11 +30,12 @@ from __future__ import annotations
 
 import datetime as dt
 
+import mock
 import pytest
 from dateutil.tz import tzutc
 
 import kasai
-from kasai.users import BroadcasterType, UserImpl, UserType
+from kasai.users import BroadcasterType, PartialViewerImpl, UserImpl, UserType
 
 
 @pytest.fixture()
@@ -60,3 +61,40 @@ def test_str(user: kasai.User) -> None:
 
 def test_login_property(user: kasai.User) -> None:
     assert user.login == "twitchdev"
+
+
+@pytest.fixture()
+def partial_viewer(user: kasai.User) -> PartialViewerImpl:
+    return PartialViewerImpl(
+        app=user.app,
+        display_name="TwitchDev",
+        id="141981764",
+        username="twitchdev",
+        color=255,
+        is_mod=False,
+        is_subscriber=False,
+        is_turbo=False,
+        is_broadcaster=True,
+    )
+
+
+def test_partial_viewer_not_loaded(partial_viewer: PartialViewerImpl) -> None:
+    assert not partial_viewer.is_loaded
+
+    with pytest.raises(kasai.NotLoaded):
+        partial_viewer.description
+
+
+async def test_partial_viewer_fetch_profile(
+    user: kasai.User, partial_viewer: PartialViewerImpl
+) -> None:
+    with mock.patch.object(
+        kasai.TwitchClient, "fetch_user", mock.AsyncMock(return_value=user)
+    ) as fetch_user:
+        assert await partial_viewer.fetch_profile() == user
+        assert await partial_viewer.fetch_profile() == user
+        fetch_user.assert_awaited_once_with("141981764")
+
+    assert partial_viewer.is_loaded
+    assert partial_viewer.description == user.description
+    assert partial_viewer.created_at == user.created_at
@@ -0,0 +1,157 @@
+# Copyright (c) 2022-present, Ethan Henderson
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+from __future__ import annotations
+
+import asyncio
+import logging
+
+import pytest
+
+from kasai.workers import BackpressurePolicy, WorkQueue
+
+
+async def test_items_are_processed() -> None:
+    processed: list[int] = []
+
+    async def handler(item: int) -> None:
+        processed.append(item)
+
+    work: WorkQueue[int] = WorkQueue(handler)
+    work.start()
+
+    for i in range(5):
+        await work.put(i)
+
+    await asyncio.sleep(0)
+    await work.stop()
+
+    assert processed == [0, 1, 2, 3, 4]
+    assert work.depth == 0
+    assert not work.is_running
+
+
+async def test_handler_errors_do_not_stop_workers() -> None:
+    processed: list[int] = []
+
+    async def handler(item: int) -> None:
+        if item == 0:
+            raise RuntimeError("oops")
+        processed.append(item)
+
+    work: WorkQueue[int] = WorkQueue(handler)
+    work.start()
+    await work.put(0)
+    await work.put(1)
+    await asyncio.sleep(0)
+    await work.stop()
+
+    assert processed == [1]
+
+
+@pytest.mark.parametrize(
+    "policy,expected",
+    [
+        (BackpressurePolicy.DROP_OLDEST, [1, 2]),
+        (BackpressurePolicy.DROP_NEWEST, [0, 1]),
+    ],
+)
+async def test_drop_policies(policy: BackpressurePolicy, expected: list[int]) -> None:
+    processed: list[int] = []
+
+    async def handler(item: int) -> None:
+        processed.append(item)
+
+    work: WorkQueue[int] = WorkQueue(handler, max_size=2, policy=policy)
+
+    for i in range(3):
+        await work.put(i)
+
+    assert work.depth == 2
+    assert work.dropped == 1
+
+    work.start()
+    await asyncio.sleep(0)
+    await work.stop()
+
+    assert processed == expected
+
+
+async def test_keys_are_ordered_but_not_blocking() -> None:
+    processed: list[str] = []
+    slow = asyncio.Event()
+
+    async def handler(item: str) -> None:
+        if item == "a1":
+            await slow.wait()
+        processed.append(item)
+
+    work: WorkQueue[str] = WorkQueue(handler, workers=8)
+    work.start()
+
+    # Integers hash to themselves, so these keys use different lanes.
+    for key, item in ((0, "a1"), (0, "a2"), (1, "b1"), (1, "b2")):
+        await work.put(item, key=key)
+
+    await asyncio.sleep(0.01)
+    assert processed == ["b1", "b2"]
+
+    slow.set()
+    await asyncio.sleep(0.01)
+    await work.stop()
+
+    assert processed == ["b1", "b2", "a1", "a2"]
+    assert len(work.lane_depths) == 8
+
+
+async def test_drops_are_logged_once_per_overload(
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    async def handler(item: int) -> None:
+        ...
+
+    caplog.set_level(logging.INFO, "kasai.workers")
+    work: WorkQueue[int] = WorkQueue(
+        handler, max_size=1, policy=BackpressurePolicy.DROP_NEWEST
+    )
+
+    for i in range(100):
+        await work.put(i)
+
+    work.start()
+    await asyncio.sleep(0)
+    await work.put(100)
+    await work.stop()
+
+    messages = [r.getMessage() for r in caplog.records]
+    assert messages == [
+        "work queue is full, dropping newest items",
+        "work queue has room again (99 item(s) dropped)",
+    ]
+    assert work.dropped == 99